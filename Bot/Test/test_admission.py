@@ -0,0 +1,130 @@
+import pytest
+import os
+import sys
+import threading
+import time
+
+# Adicionar o diretório Bot ao path para importar o controle de admissão
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from admission import AdmissionController, Overloaded, SingleFlight
+
+class TestAdmissionController:
+    """Testes para o limite de queries pesadas simultâneas"""
+
+    def test_limita_execucoes_simultaneas(self):
+        """Nunca há mais execuções ao mesmo tempo que o limite"""
+        admissao = AdmissionController(max_running=2, max_queued=10, queue_timeout=5)
+        simultaneas, maximo = [0], [0]
+        lock = threading.Lock()
+
+        def trabalho():
+            with admissao.slot():
+                with lock:
+                    simultaneas[0] += 1
+                    maximo[0] = max(maximo[0], simultaneas[0])
+                time.sleep(0.02)
+                with lock:
+                    simultaneas[0] -= 1
+
+        threads = [threading.Thread(target=trabalho) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert maximo[0] == 2
+        assert admissao.stats()["admitidas"] == 8
+        assert admissao.stats()["em_execucao"] == 0
+
+    def test_fila_cheia_recusa_com_429(self):
+        """Sem vaga e com a fila cheia, a query é recusada na hora"""
+        admissao = AdmissionController(max_running=1, max_queued=0, queue_timeout=5)
+        with admissao.slot():
+            with pytest.raises(Overloaded) as erro:
+                with admissao.slot():
+                    pass
+        assert erro.value.status == 429
+
+    def test_espera_esgotada_recusa_com_503(self):
+        """Quem espera na fila além do limite recebe 503"""
+        admissao = AdmissionController(max_running=1, max_queued=1, queue_timeout=0.05)
+        with admissao.slot():
+            with pytest.raises(Overloaded) as erro:
+                with admissao.slot():
+                    pass
+        assert erro.value.status == 503
+        assert admissao.stats()["na_fila"] == 0
+
+class TestSingleFlight:
+    """Testes para a execução única de chamadas idênticas simultâneas"""
+
+    def test_chamadas_identicas_compartilham_a_execucao(self):
+        """Chamadas concorrentes com a mesma chave executam a função uma vez"""
+        voo = SingleFlight()
+        execucoes = []
+        iniciou, liberar = threading.Event(), threading.Event()
+
+        def calculo():
+            execucoes.append(1)
+            iniciou.set()
+            liberar.wait(5)
+            return "resultado"
+
+        resultados = []
+        lider = threading.Thread(target=lambda: resultados.append(voo.do('q', calculo)))
+        lider.start()
+        iniciou.wait(5)
+
+        seguidores = [threading.Thread(target=lambda: resultados.append(voo.do('q', calculo))) for _ in range(5)]
+        for thread in seguidores:
+            thread.start()
+        # Dá tempo para os seguidores encontrarem a execução em andamento
+        time.sleep(0.1)
+        liberar.set()
+        for thread in [lider] + seguidores:
+            thread.join()
+
+        assert execucoes == [1]
+        assert sorted(resultados) == [("resultado", False)] + [("resultado", True)] * 5
+        assert voo.in_flight() == 0
+
+    def test_excecao_repassada_a_todos(self):
+        """Uma falha da execução em andamento chega a quem esperava por ela"""
+        voo = SingleFlight()
+        iniciou, liberar = threading.Event(), threading.Event()
+
+        def falha():
+            iniciou.set()
+            liberar.wait(5)
+            raise ValueError("falhou")
+
+        erros = []
+
+        def chamar():
+            try:
+                voo.do('q', falha)
+            except ValueError as e:
+                erros.append(str(e))
+
+        lider = threading.Thread(target=chamar)
+        lider.start()
+        iniciou.wait(5)
+        seguidor = threading.Thread(target=chamar)
+        seguidor.start()
+        time.sleep(0.05)
+        liberar.set()
+        lider.join()
+        seguidor.join()
+
+        assert erros == ["falhou", "falhou"]
+
+    def test_chaves_diferentes_executam_separadamente(self):
+        """Chaves diferentes não são combinadas e nada fica guardado após a execução"""
+        voo = SingleFlight()
+        assert voo.do('a', lambda: 1) == (1, False)
+        assert voo.do('b', lambda: 2) == (2, False)
+        assert voo.do('a', lambda: 3) == (3, False)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,108 @@
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import AGGREGATE_SPECS, MaterializedAggregates, compute_full, segment_totals
+from dataset_cache import DATASET, DatasetSnapshot
+from synthetic import SyntheticDataset
+
+class DatasetFixo:
+    """Substituto do cache que devolve o snapshot definido pelo teste"""
+
+    def __init__(self, frames):
+        self.versao = 0
+        self.trocar(frames)
+
+    def trocar(self, frames):
+        self.versao += 1
+        self.snapshot = DatasetSnapshot(dict(frames), f"v{self.versao}", 0, 0, 0)
+
+    def get(self):
+        return self.snapshot
+
+@pytest.fixture
+def tabelas():
+    """Cópia editável das tabelas do conjunto de dados"""
+    return {aba: df.copy() for aba, df in DATASET.get().frames.items()}
+
+class TestAgregadosMaterializados:
+    """Testes para os agregados materializados das queries de negócio"""
+
+    @pytest.mark.parametrize("tipo_query", list(AGGREGATE_SPECS))
+    def test_igual_ao_recalculo_completo(self, tipo_query):
+        """O resultado materializado é igual ao merge + groupby"""
+        agregados = MaterializedAggregates()
+        esperado = compute_full(DATASET.get(), tipo_query)
+
+        assert agregados.result(tipo_query).to_dict() == esperado.to_dict()
+
+    def test_linhas_acrescentadas(self, tabelas):
+        """Compras novas entram como delta nos totais"""
+        dataset = DatasetFixo(tabelas)
+        agregados = MaterializedAggregates(dataset)
+        antes = agregados.result("vendas_por_pagamento")
+
+        novas = tabelas['purchase'].tail(2).assign(purchase_id=[1001, 1002], total_value=[100.0, 50.0])
+        tabelas['purchase'] = pd.concat([tabelas['purchase'], novas], ignore_index=True)
+        dataset.trocar(tabelas)
+
+        depois = agregados.result("vendas_por_pagamento")
+        assert depois.sum() == pytest.approx(antes.sum() + 150.0)
+        assert agregados.verify() == {}
+
+    def test_linhas_alteradas_e_removidas(self, tabelas):
+        """Alterações e remoções são subtraídas e reaplicadas nos grupos"""
+        dataset = DatasetFixo(tabelas)
+        agregados = MaterializedAggregates(dataset)
+        agregados.sync()
+
+        stay = tabelas['stay'].copy()
+        stay.loc[0, 'stay_cost'] = 10.0
+        stay.loc[1, 'pet_id'] = 3
+        tabelas['stay'] = stay.drop(index=2)
+        tabelas['purchase'] = tabelas['purchase'][tabelas['purchase']['product_id'] != 1]
+        dataset.trocar(tabelas)
+
+        assert agregados.verify() == {}
+        assert "Bolinha de pelúcia" not in agregados.result("produtos_mais_vendidos")
+
+class TestSegmentTotals:
+    """Testes para a soma por chave com np.bincount"""
+
+    @pytest.mark.parametrize("chaves", [
+        np.array([3, 1, 3, 2, 1, 3]),
+        np.array([10**9, -5, 10**9, 7, -5, 7]),
+        np.array([3.0, np.nan, 3.0, 2.0, 1.0, np.nan])
+    ])
+    def test_igual_ao_groupby(self, chaves):
+        """Chaves densas, esparsas e com ausentes dão o mesmo resultado do groupby"""
+        valores = np.array([0.1, 0.2, np.nan, 1e16, 1.0, 0.3])
+        esperado = pd.Series(valores).groupby(chaves).agg(['sum', 'size'])
+
+        obtidas, somas, contagens = segment_totals(chaves, valores)
+        assert obtidas.tolist() == esperado.index.astype(np.int64).tolist()
+        assert somas.tolist() == esperado['sum'].tolist()
+        assert contagens.tolist() == esperado['size'].tolist()
+
+    def test_soma_de_inteiros_continua_inteira(self):
+        _, somas, _ = segment_totals(np.array([1, 1, 2]), np.array([3, 4, 5]))
+        assert somas.dtype == np.int64
+        assert somas.tolist() == [7, 5]
+
+    @pytest.mark.parametrize("tipo_query", list(AGGREGATE_SPECS))
+    def test_identico_ao_merge_em_dados_sinteticos(self, tipo_query):
+        """Valores e ordem idênticos ao merge + groupby com milhares de linhas"""
+        dataset = SyntheticDataset(scale=0.02, seed=3)
+        esperado = compute_full(dataset.get(), tipo_query)
+
+        pd.testing.assert_series_equal(MaterializedAggregates(dataset).result(tipo_query), esperado,
+                                       check_exact=True)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -143,6 +143,21 @@ class TestChatbotAPI:
         data = json.loads(response.data)
         assert "erro" in data or ("resultado" in data and "erro" in data["resultado"])
     
+    def test_execute_query_tipo_nao_texto(self, client):
+        """Testa se um tipo_query que não é texto recebe o resultado de tipo não reconhecido"""
+        for tipo in (["x"], {"a": 1}, 3):
+            response = client.post('/execute-query',
+                                 data=json.dumps({"tipo_query": tipo}),
+                                 content_type='application/json')
+            
+            assert response.status_code == 200
+            assert json.loads(response.data)["resultado"] == {"erro": "Tipo de query não reconhecido"}
+        
+        response = client.post('/execute-query',
+                             data=json.dumps({"tipo_query": ["x"], "limit": 2}),
+                             content_type='application/json')
+        assert response.status_code == 400
+    
     def test_execute_query_endpoint_sem_tipo(self, client):
         """Testa o endpoint de execução de query sem o campo tipo_query"""
         payload = {}
@@ -156,6 +171,564 @@ class TestChatbotAPI:
         data = json.loads(response.data)
         assert "erro" in data
     
+    def test_execute_sql_endpoint_pergunta_valida(self, client):
+        """Testa a execução da query SQL retornada para uma pergunta válida"""
+        payload = {
+            "pergunta": "Qual o total de vendas de produtos por tipo de pagamento?"
+        }
+        
+        response = client.post('/execute-sql', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "sucesso"
+        assert data["colunas"] == ["tipo_pagamento", "total_vendas"]
+        assert len(data["linhas"]) > 0
+    
+    def test_execute_sql_endpoint_pergunta_invalida(self, client):
+        """Testa a execução SQL com pergunta que não está no catálogo"""
+        payload = {
+            "pergunta": "Qual é a cor do céu?"
+        }
+        
+        response = client.post('/execute-sql', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "falha"
+        assert "linhas" not in data
+    
+    def test_ask_endpoint_retorna_query_e_dados(self, client):
+        """Testa o endpoint combinado que devolve a query e o resultado juntos"""
+        payload = {
+            "pergunta": "Qual o custo total das estadias por pet?"
+        }
+        
+        response = client.post('/ask', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "sucesso"
+        assert data["tipo_query"] == "estadias_por_pet"
+        assert data["query"] is not None
+        assert data["pergunta_da_query"] is not None
+        assert len(data["resultado"]) > 0
+    
+    def test_ask_endpoint_sem_dados(self, client):
+        """Testa o endpoint combinado com include_data=false"""
+        payload = {
+            "pergunta": "Qual o custo total das estadias por pet?",
+            "include_data": False
+        }
+        
+        response = client.post('/ask', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["tipo_query"] == "estadias_por_pet"
+        assert "resultado" not in data
+    
+    def test_ask_endpoint_erro_na_execucao(self, client, monkeypatch):
+        """Testa que uma falha na execução mantém a intenção encontrada na resposta"""
+        import Bot.chatbot_api as api
+        
+        def falha(intent):
+            raise RuntimeError("banco indisponível")
+        
+        monkeypatch.setattr(api, 'execute_intent', falha)
+        response = client.post('/ask',
+                             data=json.dumps({"pergunta": "Qual o custo total das estadias por pet?"}),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "sucesso"
+        assert data["tipo_query"] == "estadias_por_pet"
+        assert data["query"] is not None
+        assert "banco indisponível" in data["resultado"]["erro"]
+        
+    def test_ask_endpoint_pergunta_invalida(self, client):
+        """Testa o endpoint combinado com pergunta fora do catálogo"""
+        payload = {
+            "pergunta": "Qual é a cor do céu?"
+        }
+        
+        response = client.post('/ask', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "falha"
+        assert "resultado" not in data
+    
+    def test_chat_batch_endpoint(self, client):
+        """Testa o envio de várias perguntas em uma única chamada"""
+        payload = {
+            "perguntas": [
+                "Qual o total de vendas de produtos por tipo de pagamento?",
+                "Qual é a cor do céu?",
+                42
+            ]
+        }
+        
+        response = client.post('/chat/batch', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["total"] == 3
+        assert [item["status"] for item in data["resultados"]] == ["sucesso", "falha", "erro"]
+    
+    def test_execute_query_batch_endpoint(self, client):
+        """Testa a execução de várias queries sobre a mesma versão dos dados"""
+        payload = {
+            "tipos_query": ["vendas_por_pagamento", "tipo_inexistente", "vendas_por_pagamento", "estadias_por_pet"]
+        }
+        
+        response = client.post('/execute-query/batch', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        resultados = data["resultados"]
+        assert "versao_dados" in data
+        assert [item["status"] for item in resultados] == ["sucesso", "erro", "sucesso", "sucesso"]
+        assert resultados[0]["resultado"] == resultados[2]["resultado"]
+    
+    def test_batch_sem_lista(self, client):
+        """Testa os endpoints em lote sem a lista de itens"""
+        for rota, campo in [('/chat/batch', 'perguntas'), ('/execute-query/batch', 'tipos_query')]:
+            response = client.post(rota, 
+                                 data=json.dumps({campo: "não é lista"}),
+                                 content_type='application/json')
+            
+            assert response.status_code == 400
+            assert "erro" in json.loads(response.data)
+    
+    def test_execute_query_paginado(self, client):
+        """Testa a paginação com limit e o cursor da próxima página"""
+        payload = {"tipo_query": "produtos_mais_vendidos", "limit": 3}
+        
+        response = client.post('/execute-query', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        
+        primeira = json.loads(response.data)
+        assert len(primeira["resultado"]) == 3
+        assert primeira["paginacao"]["total"] == 8
+        
+        payload = {"tipo_query": "produtos_mais_vendidos", "cursor": primeira["paginacao"]["proximo_cursor"]}
+        response = client.post('/execute-query', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        segunda = json.loads(response.data)
+        assert segunda["paginacao"]["offset"] == 3
+        assert not set(segunda["resultado"]) & set(primeira["resultado"])
+    
+    def test_execute_query_cursor_fora_dos_limites(self, client):
+        """Testa se um cursor montado com offset negativo ou limit fora dos limites é recusado"""
+        from pagination import decode_cursor, encode_cursor
+        
+        primeira = json.loads(client.post('/execute-query',
+                                          data=json.dumps({"tipo_query": "produtos_mais_vendidos", "limit": 3}),
+                                          content_type='application/json').data)
+        query_type, _, _, version = decode_cursor(primeira["paginacao"]["proximo_cursor"])
+        
+        for offset, limit in ((-3, 3), (0, 0), (0, 10**6)):
+            cursor = encode_cursor(query_type, offset, limit, version)
+            response = client.post('/execute-query',
+                                   data=json.dumps({"tipo_query": "produtos_mais_vendidos", "cursor": cursor}),
+                                   content_type='application/json')
+            assert response.status_code == 400
+    
+    def test_execute_query_numeros_nao_inteiros(self, client):
+        """Testa se Infinity, NaN e números fracionários no corpo ou no cursor são recusados com 400"""
+        from pagination import decode_cursor, encode_cursor
+        
+        for valor in ('Infinity', '-Infinity', 'NaN', '2.5'):
+            corpo = '{"tipo_query": "produtos_mais_vendidos", "limit": %s}' % valor
+            response = client.post('/execute-query', data=corpo, content_type='application/json')
+            assert response.status_code == 400
+        
+        primeira = json.loads(client.post('/execute-query',
+                                          data=json.dumps({"tipo_query": "produtos_mais_vendidos", "limit": 3}),
+                                          content_type='application/json').data)
+        query_type, _, _, version = decode_cursor(primeira["paginacao"]["proximo_cursor"])
+        for offset, limit in ((float('inf'), 3), (0, float('inf')), (0, float('nan')), (1.5, 3)):
+            cursor = encode_cursor(query_type, offset, limit, version)
+            response = client.post('/execute-query',
+                                   data=json.dumps({"tipo_query": "produtos_mais_vendidos", "cursor": cursor}),
+                                   content_type='application/json')
+            assert response.status_code == 400
+    
+    def test_execute_query_limit_zero(self, client):
+        """Testa se limit menor que 1 é recusado (a próxima página nunca avançaria)"""
+        for limit in (0, -1):
+            response = client.post('/execute-query',
+                                   data=json.dumps({"tipo_query": "produtos_mais_vendidos", "limit": limit}),
+                                   content_type='application/json')
+            assert response.status_code == 400
+    
+    def test_execute_query_cursor_invalido(self, client):
+        """Testa a paginação com um cursor inválido"""
+        payload = {"tipo_query": "produtos_mais_vendidos", "cursor": "invalido"}
+        
+        response = client.post('/execute-query', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 400
+        assert "erro" in json.loads(response.data)
+    
+    def test_execute_query_ndjson(self, client):
+        """Testa a entrega do resultado como NDJSON, uma linha por item"""
+        payload = {"tipo_query": "estadias_por_pet", "formato": "ndjson"}
+        
+        response = client.post('/execute-query', 
+                             data=json.dumps(payload),
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        
+        linhas = [json.loads(linha) for linha in response.data.decode().splitlines()]
+        assert len(linhas) == int(response.headers["X-Total-Count"])
+        assert set(linhas[0]) == {"rotulo", "valor"}
+    
+    def test_execute_query_etag_e_304(self, client):
+        """Testa o ETag do resultado e a resposta 304 para requisições condicionais"""
+        payload = json.dumps({"tipo_query": "vendas_por_pagamento"})
+        
+        response = client.post('/execute-query', 
+                             data=payload,
+                             content_type='application/json')
+        
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert response.headers["Last-Modified"]
+        
+        condicional = client.post('/execute-query', 
+                                data=payload,
+                                content_type='application/json',
+                                headers={"If-None-Match": etag})
+        
+        assert condicional.status_code == 304
+        assert condicional.headers["ETag"] == etag
+        assert condicional.data == b""
+    
+    def test_execute_query_304_sem_sincronizar(self, client, monkeypatch):
+        """Testa que o 304 vem da versão do snapshot carregado, sem sync() nem vaga na admissão"""
+        import Bot.chatbot_api as api
+        from admission import AdmissionController
+        from aggregates import MaterializedAggregates
+        
+        payload = json.dumps({"tipo_query": "produtos_mais_vendidos"})
+        etag = client.post('/execute-query', data=payload, content_type='application/json').headers["ETag"]
+        
+        # Agregados por calcular e nenhuma vaga: só a resposta completa precisaria deles
+        agregados = MaterializedAggregates(api.DATA.DATASET)
+        monkeypatch.setitem(api.DATA.load(), 'AGGREGATES', agregados)
+        monkeypatch.setattr(api, 'ADMISSION', AdmissionController(max_running=0, max_queued=0))
+        
+        condicional = client.post('/execute-query', data=payload, content_type='application/json',
+                                  headers={"If-None-Match": etag})
+        assert condicional.status_code == 304
+        assert agregados.current() is None
+        
+        response = client.post('/execute-query', data=payload, content_type='application/json')
+        assert response.status_code == 429
+    
+    def test_cache_de_resultados(self, client):
+        """Testa se repetições da mesma query são servidas pelo cache"""
+        payload = json.dumps({"tipo_query": "estadias_por_pet", "limit": 2})
+        antes = json.loads(client.get('/cache').data)
+        
+        primeira = client.post('/execute-query', data=payload, content_type='application/json')
+        segunda = client.post('/execute-query', data=payload, content_type='application/json')
+        
+        depois = json.loads(client.get('/cache').data)
+        assert primeira.data == segunda.data
+        assert depois["acertos"] >= antes["acertos"] + 1
+        assert depois["entradas"] >= 1
+    
+    def test_execute_query_com_filtros(self, client):
+        """Testa filtros de data e de dimensão no /execute-query"""
+        response = client.post('/execute-query',
+                               data=json.dumps({"tipo_query": "estadias_por_pet",
+                                                "data_fim": "2025-01-10", "tipo_pet": "gato"}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "sucesso"
+        assert data["filtros"] == {"fim": "2025-01-11T00:00:00", "tipo_pet": ["gato"]}
+        assert 0 < len(data["resultado"]) < 10
+        
+        vazio = client.post('/execute-query',
+                            data=json.dumps({"tipo_query": "vendas_por_pagamento", "mes": "2030-01"}),
+                            content_type='application/json')
+        assert json.loads(vazio.data)["resultado"] == {}
+    
+    def test_execute_query_filtro_invalido(self, client):
+        """Testa que filtros inválidos ou que não se aplicam retornam 400"""
+        for corpo in ({"tipo_query": "vendas_por_pagamento", "tipo_pet": "gato"},
+                      {"tipo_query": "vendas_por_pagamento", "data_inicio": "ontem"}):
+            response = client.post('/execute-query', data=json.dumps(corpo),
+                                   content_type='application/json')
+            assert response.status_code == 400
+            assert "erro" in json.loads(response.data)
+    
+    def test_dataset_memoria_endpoint(self, client):
+        """Testa o relatório de memória por tabela com os tipos do esquema"""
+        response = client.get('/dataset/memoria')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["bytes_total"] > 0
+        assert data["violacoes_esquema"] == []
+        assert data["tabelas"]["payment_method_type"]["colunas"]["nome"]["tipo"] == "category"
+    
+    def test_metrics_endpoint(self, client):
+        """Testa se /metrics expõe latências por rota, etapas e intenções"""
+        client.post('/chat', data=json.dumps({"pergunta": "pergunta sem resposta"}),
+                    content_type='application/json')
+        client.post('/execute-query', data=json.dumps({"tipo_query": "vendas_por_pagamento"}),
+                    content_type='application/json')
+        
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        
+        text = response.get_data(as_text=True)
+        assert 'hotel_http_request_duration_seconds_count{rota="/chat",metodo="POST",status="200"}' in text
+        assert 'hotel_http_request_duration_seconds_bucket{rota="/execute-query"' in text
+        assert 'hotel_query_stage_duration_seconds_count{etapa="serializacao"}' in text
+        assert 'hotel_chatbot_intents_total{resultado="falha"}' in text
+    
+    def test_metrica_de_intencoes_em_todas_as_rotas(self, client):
+        """Testa que /ask e /chat/batch também contam acertos e falhas da busca de intenções"""
+        from metrics import INTENT_MATCHES
+        
+        acertos, falhas = INTENT_MATCHES.value('acerto'), INTENT_MATCHES.value('falha')
+        client.post('/ask', data=json.dumps({"pergunta": "Qual é a cor do céu?"}),
+                    content_type='application/json')
+        client.post('/chat/batch', data=json.dumps({"perguntas": ["Quais são os produtos mais vendidos?",
+                                                                  "Qual é a cor do céu?"]}),
+                    content_type='application/json')
+        
+        assert INTENT_MATCHES.value('acerto') == acertos + 1
+        assert INTENT_MATCHES.value('falha') == falhas + 2
+        
+    def test_job_assincrono(self, client):
+        """Testa o envio de um job e a consulta do resultado pelo job_id"""
+        response = client.post('/jobs', data=json.dumps({"tipo_query": "vendas_por_pagamento", "aguardar": 10}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data["status"] == "concluido"
+        assert response.headers['Location'].endswith(f"/jobs/{data['job_id']}")
+        
+        direto = json.loads(client.post('/execute-query', data=json.dumps({"tipo_query": "vendas_por_pagamento"}),
+                                        content_type='application/json').data)
+        assert data["resultado"] == direto["resultado"]
+        
+        consulta = client.get(f"/jobs/{data['job_id']}")
+        assert consulta.status_code == 200
+        assert json.loads(consulta.data)["resultado"] == direto["resultado"]
+    
+    def test_job_repetido_reaproveitado(self, client):
+        """Testa se o mesmo pedido sobre a mesma versão dos dados recebe o mesmo job"""
+        payload = json.dumps({"tipo_query": "estadias_por_pet", "mes": "2025-01", "aguardar": 10})
+        primeiro = json.loads(client.post('/jobs', data=payload, content_type='application/json').data)
+        segundo = json.loads(client.post('/jobs', data=payload, content_type='application/json').data)
+        
+        assert segundo["job_id"] == primeiro["job_id"]
+        assert segundo["novo"] is False
+        assert segundo["filtros"] == primeiro["filtros"]
+    
+    def test_job_apos_alterar_planilha(self, client, monkeypatch, tmp_path):
+        """Testa se, depois de a planilha mudar, o mesmo pedido gera um job novo com a nova versão"""
+        import shutil
+        from openpyxl import load_workbook
+        import Bot.chatbot_api as api
+        from aggregates import MaterializedAggregates
+        from colstore import EXCEL_FILE, file_hash
+        from dataset_cache import DatasetCache
+        
+        planilha = str(tmp_path / "dados.xlsx")
+        shutil.copy(EXCEL_FILE, planilha)
+        cache = DatasetCache(planilha, check_interval=0, store_dir=str(tmp_path / "sem_armazenamento"))
+        monkeypatch.setitem(api.DATA.load(), 'DATASET', cache)
+        monkeypatch.setitem(api.DATA.load(), 'AGGREGATES', MaterializedAggregates(cache))
+        
+        payload = json.dumps({"tipo_query": "estadias_por_pet", "aguardar": 10})
+        primeiro = json.loads(client.post('/jobs', data=payload, content_type='application/json').data)
+        assert primeiro["novo"] is True
+        
+        workbook = load_workbook(planilha)
+        workbook['stay']['H2'] = workbook['stay']['H2'].value + 100
+        workbook.save(planilha)
+        
+        # O primeiro envio após a mudança dispara a recarga em segundo plano
+        client.post('/jobs', data=payload, content_type='application/json')
+        cache.wait_reload(timeout=30)
+        
+        depois = json.loads(client.post('/jobs', data=payload, content_type='application/json').data)
+        assert depois["novo"] is True
+        assert depois["job_id"] != primeiro["job_id"]
+        assert depois["versao_dados"] == file_hash(planilha)[:16] != primeiro["versao_dados"]
+    
+    def test_job_invalido_e_inexistente(self, client):
+        """Testa os erros de envio e de consulta de jobs"""
+        response = client.post('/jobs', data=json.dumps({"tipo_query": "inexistente"}),
+                               content_type='application/json')
+        assert response.status_code == 400
+        
+        response = client.post('/jobs', data=json.dumps({"tipo_query": "vendas_por_pagamento", "tipo_pet": "Gato"}),
+                               content_type='application/json')
+        assert response.status_code == 400
+        
+        assert client.get('/jobs/naoexiste').status_code == 404
+    
+    def test_job_fila_cheia(self, client, monkeypatch):
+        """Testa a resposta 503 com Retry-After quando a fila de jobs está cheia"""
+        import Bot.chatbot_api as api
+        from jobs import JobManager
+        monkeypatch.setattr(api, 'JOBS', JobManager(workers=1, max_pending=0))
+        
+        response = client.post('/jobs', data=json.dumps({"tipo_query": "produtos_mais_vendidos"}),
+                               content_type='application/json')
+        assert response.status_code == 503
+        assert response.headers['Retry-After']
+    
+    def test_execute_query_sobrecarga(self, client, monkeypatch):
+        """Testa as respostas 429 (fila cheia) e 503 (espera esgotada) da admissão"""
+        import Bot.chatbot_api as api
+        from admission import AdmissionController
+        from result_cache import RESULT_CACHE
+        
+        RESULT_CACHE.clear()
+        payload = json.dumps({"tipo_query": "vendas_por_pagamento"})
+        
+        monkeypatch.setattr(api, 'ADMISSION', AdmissionController(max_running=0, max_queued=0))
+        response = client.post('/execute-query', data=payload, content_type='application/json')
+        assert response.status_code == 429
+        assert response.headers['Retry-After']
+        
+        monkeypatch.setattr(api, 'ADMISSION', AdmissionController(max_running=0, max_queued=1, queue_timeout=0.01))
+        response = client.post('/execute-query', data=payload, content_type='application/json')
+        assert response.status_code == 503
+        
+        response = client.post('/execute-query/batch', data=json.dumps({"tipos_query": ["vendas_por_pagamento"]}),
+                               content_type='application/json')
+        assert response.status_code == 503
+
+    def test_sincronizacao_e_sql_passam_pela_admissao(self, client, monkeypatch):
+        """Testa que a carga dos agregados e o SQL de /execute-sql e /ask respeitam a admissão"""
+        import Bot.chatbot_api as api
+        from admission import AdmissionController
+        from aggregates import MaterializedAggregates
+        from result_cache import RESULT_CACHE
+        
+        RESULT_CACHE.clear()
+        monkeypatch.setattr(api, 'ADMISSION', AdmissionController(max_running=0, max_queued=0))
+        
+        # Agregados ainda não calculados: a sincronização é recusada, não empilhada
+        monkeypatch.setitem(api.DATA.load(), 'AGGREGATES', MaterializedAggregates(api.DATA.DATASET))
+        response = client.post('/execute-query', data=json.dumps({"tipo_query": "vendas_por_pagamento"}),
+                               content_type='application/json')
+        assert response.status_code == 429
+        
+        pergunta = json.dumps({"pergunta": "Quais são os produtos mais vendidos?", "include_data": True})
+        response = client.post('/execute-sql', data=pergunta, content_type='application/json')
+        assert response.status_code == 429
+        response = client.post('/ask', data=pergunta, content_type='application/json')
+        assert response.status_code == 429
+    
+    def test_execute_query_formato_colunar(self, client):
+        """Testa o JSON colunar pedido pelo Accept, com os mesmos dados do formato original"""
+        payload = json.dumps({"tipo_query": "estadias_por_pet"})
+        
+        original = client.post('/execute-query', data=payload, content_type='application/json')
+        colunar = client.post('/execute-query', data=payload, content_type='application/json',
+                              headers={'Accept': 'application/vnd.hotel.columnar+json'})
+        
+        assert colunar.status_code == 200
+        assert colunar.mimetype == 'application/vnd.hotel.columnar+json'
+        assert 'Accept' in colunar.headers['Vary']
+        assert colunar.headers['ETag'] != original.headers['ETag']
+        
+        resultado = json.loads(colunar.data)["resultado"]
+        assert dict(zip(resultado["labels"], resultado["values"])) == json.loads(original.data)["resultado"]
+        assert resultado["values"] == sorted(resultado["values"], reverse=True)
+    
+    def test_execute_query_colunar_paginado(self, client):
+        """Testa a paginação no JSON colunar"""
+        response = client.post('/execute-query', data=json.dumps({"tipo_query": "produtos_mais_vendidos", "limit": 2}),
+                               content_type='application/json',
+                               headers={'Accept': 'application/vnd.hotel.columnar+json'})
+        
+        data = json.loads(response.data)
+        assert len(data["resultado"]["labels"]) == 2
+        assert data["paginacao"]["limit"] == 2
+    
+    def test_execute_query_arrow(self, client):
+        """Testa o Arrow IPC, ou 406 quando o pyarrow não está instalado"""
+        from serializers import _pyarrow
+        
+        headers = {'Accept': 'application/vnd.apache.arrow.stream'}
+        payload = json.dumps({"tipo_query": "vendas_por_pagamento"})
+        response = client.post('/execute-query', data=payload, content_type='application/json', headers=headers)
+        
+        pyarrow = _pyarrow()
+        if pyarrow is None:
+            assert response.status_code == 406
+            # Com uma alternativa aceita no Accept, a resposta cai para ela
+            headers['Accept'] += ', application/json;q=0.5'
+            response = client.post('/execute-query', data=payload, content_type='application/json', headers=headers)
+            assert response.status_code == 200
+            assert response.mimetype == 'application/json'
+            return
+        
+        table = pyarrow.ipc.open_stream(response.data).read_all()
+        original = json.loads(client.post('/execute-query', data=payload, content_type='application/json').data)
+        assert dict(zip(table.column('rotulo').to_pylist(), table.column('valor').to_pylist())) == original["resultado"]
+    
+    def test_execute_query_batch_colunar(self, client):
+        """Testa o lote no JSON colunar"""
+        response = client.post('/execute-query/batch',
+                               data=json.dumps({"tipos_query": ["vendas_por_pagamento", "tipo_inexistente"]}),
+                               content_type='application/json',
+                               headers={'Accept': 'application/vnd.hotel.columnar+json'})
+        
+        assert response.status_code == 200
+        resultados = json.loads(response.data)["resultados"]
+        assert set(resultados[0]["resultado"]) == {"labels", "values"}
+        assert resultados[1]["status"] == "erro"
+    
     def test_cors_headers(self, client):
         """Testa se os headers CORS estão configurados corretamente"""
         response = client.get('/')
@@ -0,0 +1,102 @@
+import pytest
+import json
+import os
+import shutil
+import sys
+
+# Adicionar o diretório Bot ao path para importar o módulo do catálogo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import CATALOG_FILE, CatalogHolder, load_catalog
+
+@pytest.fixture
+def arquivo_catalogo(tmp_path):
+    """Cópia temporária do catálogo de intenções"""
+    destino = tmp_path / "catalogo.json"
+    shutil.copy(CATALOG_FILE, destino)
+    return str(destino)
+
+def gravar(caminho, dados, mtime):
+    """Grava o catálogo e força um novo mtime"""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+    os.utime(caminho, (mtime, mtime))
+
+class TestCatalogo:
+    """Testes para o catálogo declarativo de intenções"""
+
+    def test_catalogo_compilado(self):
+        """O catálogo do projeto expõe perguntas, tipos de query e o índice de busca"""
+        catalogo = load_catalog()
+
+        assert catalogo.tipos_query == ("vendas_por_pagamento", "produtos_mais_vendidos", "estadias_por_pet")
+        assert len(catalogo.questions) == 3
+        assert catalogo.match("Quanto cada pet gastou em estadias?")["tipo_query"] == "estadias_por_pet"
+
+    def test_catalogo_imutavel(self):
+        """As intenções compiladas não podem ser alteradas"""
+        catalogo = load_catalog()
+
+        with pytest.raises(TypeError):
+            catalogo.intents[0]["query"] = "DROP TABLE purchase"
+
+    def test_recarrega_nova_intencao(self, arquivo_catalogo):
+        """Uma intenção adicionada ao arquivo passa a valer sem reiniciar"""
+        holder = CatalogHolder(arquivo_catalogo, check_interval=0)
+        antigo = holder.current()
+
+        with open(arquivo_catalogo, encoding='utf-8') as f:
+            dados = json.load(f)
+        dados["intencoes"].append({
+            "tipo_query": "total_de_pets",
+            "pergunta": "Quantos pets estão cadastrados?",
+            "query": "SELECT COUNT(*) AS total_pets FROM pet;",
+            "pergunta_da_query": "Qual o número de pets cadastrados?"
+        })
+        gravar(arquivo_catalogo, dados, antigo.mtime + 10)
+
+        # O catálogo antigo continua sendo servido enquanto o novo é compilado
+        assert holder.current() is antigo
+        holder.wait_reload(timeout=10)
+
+        novo = holder.current()
+        assert "total_de_pets" in novo.tipos_query
+        assert novo.match("quantos pets estao cadastrados")["tipo_query"] == "total_de_pets"
+        assert "total_de_pets" not in antigo.tipos_query
+
+    def test_arquivo_invalido_mantem_catalogo(self, arquivo_catalogo):
+        """Uma edição inválida não derruba o catálogo em uso"""
+        holder = CatalogHolder(arquivo_catalogo, check_interval=0)
+        antigo = holder.current()
+
+        gravar(arquivo_catalogo, {"intencoes": [{"tipo_query": "sem_query"}]}, antigo.mtime + 10)
+        holder.current()
+        holder.wait_reload(timeout=10)
+
+        assert holder.current() is antigo
+        assert holder.last_error is not None
+
+    def test_arquivo_invalido_nao_e_recompilado(self, arquivo_catalogo):
+        """A mesma versão inválida não é recompilada a cada verificação, só depois de nova edição"""
+        holder = CatalogHolder(arquivo_catalogo, check_interval=0)
+        antigo = holder.current()
+        with open(arquivo_catalogo, encoding='utf-8') as f:
+            dados = json.load(f)
+
+        gravar(arquivo_catalogo, {"intencoes": []}, antigo.mtime + 10)
+        holder.current()
+        holder.wait_reload(timeout=10)
+        tentativa = holder._reload_thread
+
+        holder.current()
+        assert holder._reload_thread is tentativa
+
+        gravar(arquivo_catalogo, dados, antigo.mtime + 20)
+        holder.current()
+        holder.wait_reload(timeout=10)
+        assert holder._reload_thread is not tentativa
+        assert holder.current().mtime == antigo.mtime + 20
+        assert holder.last_error is None
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -85,6 +85,22 @@ class TestChatbot:
         assert resposta["pergunta_do_usuario"] == pergunta
         assert resposta["query"] is not None
     
+    def test_pergunta_sem_interrogacao(self):
+        """Testa pergunta conhecida escrita sem o ponto de interrogação"""
+        pergunta = "Qual o custo total das estadias por pet"
+        resposta = chatbot_response(pergunta)
+        
+        assert resposta["status"] == "sucesso"
+        assert "stay" in resposta["query"]
+    
+    def test_pergunta_com_acentos_e_variacao(self):
+        """Testa pergunta com acentos e pequenas variações de escrita"""
+        pergunta = "Qual é o total das vendas de produtos por tipo de pagamento"
+        resposta = chatbot_response(pergunta)
+        
+        assert resposta["status"] == "sucesso"
+        assert "payment_method_type" in resposta["query"]
+    
     def test_estrutura_resposta_sucesso(self):
         """Testa se a estrutura da resposta de sucesso está correta"""
         pergunta = "Qual o total de vendas de produtos por tipo de pagamento?"
@@ -0,0 +1,89 @@
+import pytest
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar o módulo do armazenamento
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import colstore
+from dataset_cache import DatasetCache
+from schema import apply_schema
+
+@pytest.fixture
+def planilha(tmp_path):
+    """Cópia temporária da planilha de dados"""
+    destino = tmp_path / "dados.xlsx"
+    shutil.copy(colstore.EXCEL_FILE, destino)
+    return str(destino)
+
+@pytest.fixture
+def armazenamento(planilha, tmp_path):
+    """Armazenamento colunar gerado a partir da planilha temporária"""
+    destino = str(tmp_path / "colstore")
+    colstore.ingest(planilha, destino)
+    return destino
+
+class TestColstore:
+    """Testes para o armazenamento colunar da planilha"""
+
+    def test_tabelas_iguais_a_planilha(self, planilha, armazenamento):
+        """Cada aba lida do armazenamento é igual à lida da planilha com o esquema aplicado"""
+        for aba in colstore.SHEETS:
+            esperado, _ = apply_schema(aba, pd.read_excel(planilha, aba))
+            obtido = colstore.load_table(aba, store_dir=armazenamento)
+            pd.testing.assert_frame_equal(obtido.copy(), esperado)
+
+    def test_le_apenas_colunas_pedidas_com_mmap(self, armazenamento):
+        """Colunas numéricas são abertas com memory mapping e só as pedidas são lidas"""
+        purchase = colstore.load_table('purchase', ['payment_method', 'total_value'], armazenamento)
+
+        assert list(purchase.columns) == ['payment_method', 'total_value']
+        assert isinstance(purchase['total_value'].to_numpy().base, np.memmap)
+
+    def test_esquema_explicito(self, armazenamento):
+        """O esquema registra tipo e dicionário de cada coluna"""
+        esquema = colstore.read_schema(armazenamento)
+        colunas = esquema["tables"]["payment_method_type"]["columns"]
+
+        assert colunas["payment_method_type_id"]["dtype"] == "int8"
+        assert colunas["nome"]["dtype"] == colstore.STRING
+        assert colunas["nome"]["categorical"]
+        assert "Pix" in colunas["nome"]["categories"]
+
+    def test_atualizacao_da_planilha(self, planilha, armazenamento):
+        """O armazenamento deixa de ser usado quando a planilha muda"""
+        assert colstore.is_fresh(planilha, armazenamento)
+
+        with open(planilha, 'ab') as f:
+            f.write(b'\0')
+
+        assert not colstore.is_fresh(planilha, armazenamento)
+
+    def test_cache_usa_armazenamento(self, planilha, armazenamento):
+        """O cache do conjunto de dados lê do armazenamento quando ele está atualizado"""
+        snapshot = DatasetCache(planilha, store_dir=armazenamento).get()
+
+        assert snapshot.source == 'colstore'
+        assert len(snapshot['purchase']) == 21
+
+    def test_carga_nao_repete_a_validacao(self, planilha, armazenamento, monkeypatch):
+        """As violações ficam no schema.json da ingestão e a carga do armazenamento não valida de novo"""
+        import dataset_cache
+
+        assert colstore.read_schema(armazenamento)["violations"] == []
+
+        def validar(tabelas):
+            raise AssertionError("apply_all chamado na carga do armazenamento")
+
+        monkeypatch.setattr(dataset_cache, 'apply_all', validar)
+        snapshot = DatasetCache(planilha, store_dir=armazenamento).get()
+
+        assert snapshot.source == 'colstore'
+        assert snapshot.violations == ()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,108 @@
+import pytest
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar o módulo do cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_cache import DatasetCache, EXCEL_FILE, SHEETS
+
+@pytest.fixture
+def planilha(tmp_path):
+    """Cópia temporária da planilha de dados"""
+    destino = tmp_path / "dados.xlsx"
+    shutil.copy(EXCEL_FILE, destino)
+    return str(destino)
+
+@pytest.fixture
+def armazenamento(tmp_path):
+    """Diretório temporário para o armazenamento colunar"""
+    return str(tmp_path / "colstore")
+
+class TestDatasetCache:
+    """Testes para o cache compartilhado do conjunto de dados"""
+
+    def test_carrega_todas_as_abas_uma_vez(self, planilha, armazenamento):
+        """O primeiro uso carrega todas as abas e os seguintes reaproveitam o snapshot"""
+        cache = DatasetCache(planilha, store_dir=armazenamento)
+        snapshot = cache.get()
+
+        assert set(snapshot.frames) == set(SHEETS)
+        assert cache.get() is snapshot
+
+    def test_dataframes_somente_leitura(self, planilha, armazenamento):
+        """Os DataFrames entregues não podem ser alterados"""
+        snapshot = DatasetCache(planilha, store_dir=armazenamento).get()
+
+        with pytest.raises(ValueError):
+            snapshot['purchase'].loc[0, 'total_value'] = 0
+
+    def test_recarrega_quando_arquivo_muda(self, planilha, armazenamento):
+        """Uma alteração no arquivo gera um novo snapshot com nova versão"""
+        cache = DatasetCache(planilha, check_interval=0, store_dir=armazenamento)
+        antigo = cache.get()
+
+        frames = {aba: df.copy() for aba, df in antigo.frames.items()}
+        frames['purchase'] = frames['purchase'].iloc[:5]
+        with pd.ExcelWriter(planilha) as writer:
+            for aba, df in frames.items():
+                df.to_excel(writer, sheet_name=aba, index=False)
+        os.utime(planilha, (antigo.mtime + 10, antigo.mtime + 10))
+
+        # O leitor continua com o snapshot antigo até a troca
+        assert cache.get() is antigo
+        cache.wait_reload(timeout=30)
+
+        novo = cache.get()
+        assert novo.version != antigo.version
+        assert len(novo['purchase']) == 5
+        assert len(antigo['purchase']) == 21
+
+    def test_arquivo_invalido_lido_uma_vez(self, planilha, armazenamento, monkeypatch):
+        """Uma planilha inválida é lida uma única vez, e de novo só depois de outra alteração"""
+        import dataset_cache
+
+        cache = DatasetCache(planilha, check_interval=0, store_dir=armazenamento)
+        antigo = cache.get()
+
+        leituras = []
+        carregar = dataset_cache.load_snapshot
+        monkeypatch.setattr(dataset_cache, 'load_snapshot',
+                            lambda *args, **kwargs: leituras.append(1) or carregar(*args, **kwargs))
+
+        with open(planilha, 'wb') as f:
+            f.write(b"nao e uma planilha")
+        os.utime(planilha, (antigo.mtime + 10, antigo.mtime + 10))
+        for _ in range(5):
+            assert cache.get() is antigo
+            cache.wait_reload(timeout=30)
+
+        assert len(leituras) == 1
+        assert cache.stats()["ultimo_erro"]
+
+        shutil.copy(EXCEL_FILE, planilha)
+        os.utime(planilha, (antigo.mtime + 20, antigo.mtime + 20))
+        cache.get()
+        cache.wait_reload(timeout=30)
+        # Conteúdo igual ao do snapshot: só o mtime é atualizado, sem nova leitura
+        assert len(leituras) == 1
+        assert cache.get().mtime == antigo.mtime + 20
+        assert cache.stats()["ultimo_erro"] is None
+
+    def test_estatisticas(self, planilha, armazenamento):
+        """As estatísticas informam tempo de carga e memória"""
+        cache = DatasetCache(planilha, store_dir=armazenamento)
+        assert cache.stats()["carregado"] is False
+
+        cache.get()
+        stats = cache.stats()
+        assert stats["carregado"] is True
+        assert stats["memoria_bytes"] > 0
+        assert stats["tempo_carga_segundos"] > 0
+        assert stats["linhas_por_tabela"]["purchase"] == 21
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,79 @@
+import pytest
+import os
+import subprocess
+import sys
+
+# Adicionar o diretório Bot ao path para importar a pilha de dados
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BOT_DIR)
+
+from datastack import DataStack
+from startup_profile import check
+
+class TestDataStack:
+    """Testes para a importação sob demanda dos módulos de dados"""
+
+    def test_importa_no_primeiro_acesso(self):
+        """Os módulos só são importados quando um nome é usado, e uma única vez"""
+        pilha = DataStack({'json': ('dumps',), 'statistics': ('median',)})
+        assert not pilha.loaded()
+
+        assert pilha.median([1, 2, 3]) == 2
+        assert pilha.loaded()
+        assert set(pilha.stats()["import_segundos"]) == {'json', 'statistics'}
+        assert pilha.load() is pilha.load()
+
+    def test_nome_desconhecido(self):
+        """Nomes fora das exportações levantam AttributeError"""
+        pilha = DataStack({'json': ('dumps',)})
+        with pytest.raises(AttributeError):
+            pilha.loads
+
+    def test_aquecimento_em_segundo_plano(self):
+        """O aquecimento roda uma vez e registra a falha sem derrubar o processo"""
+        pilha = DataStack({'modulo_que_nao_existe': ('X',)})
+        thread = pilha.warm_up()
+        assert pilha.warm_up() is thread
+        thread.join(5)
+
+        assert not pilha.loaded()
+        assert "modulo_que_nao_existe" in pilha.stats()["erro_aquecimento"]
+
+    def test_rotas_sem_dados_nao_importam_pandas(self):
+        """/health, /perguntas e /chat respondem sem importar pandas"""
+        codigo = (
+            "import sys, chatbot_api\n"
+            "c = chatbot_api.app.test_client()\n"
+            "assert c.get('/health').json['dados_carregados'] is False\n"
+            "assert c.get('/perguntas').status_code == 200\n"
+            "assert c.post('/chat', json={'pergunta': 'Quais são os produtos mais vendidos?'}).status_code == 200\n"
+            "assert 'pandas' not in sys.modules, 'pandas importado'\n"
+            "c.post('/execute-query', json={'tipo_query': 'produtos_mais_vendidos'})\n"
+            "assert 'pandas' in sys.modules\n"
+        )
+        env = dict(os.environ, PYTHONPATH=BOT_DIR, HOTEL_STARTUP='lazy')
+        resultado = subprocess.run([sys.executable, '-c', codigo], cwd=BOT_DIR, env=env,
+                                   capture_output=True, text=True)
+        assert resultado.returncode == 0, resultado.stderr
+
+class TestStartupProfile:
+    """Testes para a verificação do relatório de início a frio"""
+
+    def _relatorio(self, saudavel, pandas=False):
+        return {
+            "resultados": {"primeira_resposta_saudavel_s": {"mediana_s": saudavel, "maximo_s": saudavel}},
+            "pandas_apos_health": pandas,
+            "pandas_apos_chat": False
+        }
+
+    def test_dentro_do_limite(self):
+        """Relatório rápido e sem pandas não aponta problemas"""
+        assert check(self._relatorio(0.03), limit=0.1) == []
+
+    def test_aponta_lentidao_e_pandas(self):
+        """/health acima do limite e pandas importado cedo são apontados"""
+        problemas = check(self._relatorio(0.3, pandas=True), limit=0.1)
+        assert len(problemas) == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,176 @@
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar a exportação dos extratos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extracts
+from aggregates import AGGREGATE_SPECS, compute_full
+from extracts import export, read_manifest, verify
+from synthetic import generate
+
+def escrever_planilha(frames, caminho):
+    """Grava só as colunas usadas pelos extratos"""
+    with pd.ExcelWriter(caminho) as writer:
+        for tabela, colunas in extracts._source_columns().items():
+            frames[tabela][colunas].to_excel(writer, sheet_name=tabela, index=False)
+    return caminho
+
+def ler_extrato(destino, nome):
+    manifesto = read_manifest(destino)
+    arquivos = [os.path.join(destino, info["arquivo"])
+                for info in manifesto["extratos"][nome]["particoes"].values()]
+    return pd.concat([pd.read_csv(arquivo) for arquivo in arquivos], ignore_index=True)
+
+def conteudo(destino):
+    """Bytes de cada partição, por caminho relativo"""
+    manifesto = read_manifest(destino)
+    arquivos = {}
+    for extrato in manifesto["extratos"].values():
+        for info in extrato["particoes"].values():
+            with open(os.path.join(destino, info["arquivo"]), 'rb') as f:
+                arquivos[info["arquivo"]] = f.read()
+    return arquivos
+
+@pytest.fixture
+def frames():
+    return generate(scale=0.002, seed=5)
+
+@pytest.fixture
+def ambiente(tmp_path):
+    """Caminhos da planilha, do destino e de um armazenamento colunar vazio"""
+    return str(tmp_path / "dados.xlsx"), str(tmp_path / "extratos"), str(tmp_path / "sem_armazenamento")
+
+class TestExportacao:
+    """Testes para a exportação dos extratos particionados"""
+
+    def test_totais_iguais_aos_das_queries(self, frames, ambiente):
+        """Somando todas as partições, os totais por rótulo são os do merge + groupby"""
+        planilha, destino, armazenamento = ambiente
+        escrever_planilha(frames, planilha)
+        relatorio = export(planilha, destino, armazenamento)
+
+        assert not relatorio["sem_alteracoes"]
+        for nome, spec in AGGREGATE_SPECS.items():
+            extrato = ler_extrato(destino, nome)
+            totais = extrato.groupby(spec.label)[spec.value].sum()
+            esperado = compute_full(frames, nome)
+            pd.testing.assert_series_equal(totais.sort_index(), esperado.sort_index(),
+                                           check_names=False, check_dtype=False)
+            assert extrato["linhas"].sum() == len(frames[spec.fact])
+        assert verify(destino) == []
+
+    def test_reescreve_so_as_particoes_alteradas(self, frames, ambiente, tmp_path):
+        """Linhas novas e alteradas reescrevem só as suas partições; o resultado é igual ao da exportação completa"""
+        planilha, destino, armazenamento = ambiente
+        escrever_planilha(frames, planilha)
+        export(planilha, destino, armazenamento)
+        antes = conteudo(destino)
+
+        # Uma compra nova em um dia novo e uma estadia existente alterada
+        purchase = frames['purchase']
+        nova = purchase.iloc[[0]].copy()
+        nova['purchase_id'] = purchase['purchase_id'].max() + 1
+        nova['created_at'] = nova['updated_at'] = purchase['created_at'].max() + pd.Timedelta(days=3)
+        frames['purchase'] = pd.concat([purchase, nova], ignore_index=True)
+        stay = frames['stay']
+        stay.loc[10, 'stay_cost'] += 100
+        stay.loc[10, 'updated_at'] = stay['updated_at'].max() + pd.Timedelta(hours=1)
+        escrever_planilha(frames, planilha)
+
+        relatorio = export(planilha, destino, armazenamento)
+        assert relatorio["extratos"]["vendas_por_pagamento"]["escritas"] == 1
+        assert relatorio["extratos"]["produtos_mais_vendidos"]["escritas"] == 1
+        assert relatorio["extratos"]["estadias_por_pet"]["escritas"] == 1
+        assert relatorio["extratos"]["estadias_por_pet"]["linhas_agregadas"] < len(stay)
+
+        depois = conteudo(destino)
+        alterados = {arquivo for arquivo in depois if antes.get(arquivo) != depois[arquivo]}
+        dia_estadia = stay.loc[10, 'check_in_date'].strftime('%Y-%m-%d')
+        assert f"estadias_por_pet/{dia_estadia}.csv" in alterados
+        assert len(alterados) == 3
+
+        completo = str(tmp_path / "completo")
+        export(planilha, completo, armazenamento)
+        assert conteudo(completo) == depois
+
+    def test_linha_com_o_mesmo_updated_at_da_marca(self, frames, ambiente, tmp_path):
+        """Uma linha alterada depois da exportação com o updated_at da marca d'água não se perde"""
+        planilha, destino, armazenamento = ambiente
+        escrever_planilha(frames, planilha)
+        export(planilha, destino, armazenamento)
+
+        # Estadia de outro dia alterada com o mesmo updated_at da última linha exportada
+        stay = frames['stay']
+        marca = stay['updated_at'].max()
+        dias = stay['check_in_date'].dt.strftime('%Y-%m-%d')
+        alterada = np.flatnonzero((~dias.isin(dias[stay['updated_at'] == marca])).to_numpy())[0]
+        stay.loc[alterada, 'stay_cost'] += 100
+        stay.loc[alterada, 'updated_at'] = marca
+        escrever_planilha(frames, planilha)
+
+        relatorio = export(planilha, destino, armazenamento)["extratos"]
+        assert relatorio["estadias_por_pet"]["escritas"] == 1
+        assert relatorio["vendas_por_pagamento"]["escritas"] == 0
+
+        completo = str(tmp_path / "completo")
+        export(planilha, completo, armazenamento)
+        assert conteudo(completo) == conteudo(destino)
+
+    def test_linhas_removidas(self, frames, ambiente):
+        """Partições sem linhas são apagadas e as que perderam linhas são reescritas"""
+        planilha, destino, armazenamento = ambiente
+        escrever_planilha(frames, planilha)
+        export(planilha, destino, armazenamento)
+
+        stay = frames['stay']
+        dias = stay['check_in_date'].dt.strftime('%Y-%m-%d')
+        dia_apagado, dia_reduzido = dias.unique()[:2]
+        apagar = (dias == dia_apagado).to_numpy()
+        apagar[np.flatnonzero((dias == dia_reduzido).to_numpy())[0]] = True
+        frames['stay'] = stay[~apagar]
+        escrever_planilha(frames, planilha)
+
+        relatorio = export(planilha, destino, armazenamento)["extratos"]["estadias_por_pet"]
+        assert relatorio["removidas"] == 1
+        assert relatorio["escritas"] == 1
+        particoes = read_manifest(destino)["extratos"]["estadias_por_pet"]["particoes"]
+        assert dia_apagado not in particoes
+        assert not os.path.exists(os.path.join(destino, "estadias_por_pet", f"{dia_apagado}.csv"))
+
+    def test_planilha_inalterada_e_verificacao(self, frames, ambiente):
+        """Sem mudança na planilha nada é lido nem escrito; arquivos adulterados são apontados"""
+        planilha, destino, armazenamento = ambiente
+        escrever_planilha(frames, planilha)
+        export(planilha, destino, armazenamento)
+
+        relatorio = export(planilha, destino, armazenamento)
+        assert relatorio["sem_alteracoes"]
+        assert relatorio["bytes_escritos"] == 0
+
+        info = next(iter(read_manifest(destino)["extratos"]["vendas_por_pagamento"]["particoes"].values()))
+        with open(os.path.join(destino, info["arquivo"]), 'a', encoding='utf-8') as f:
+            f.write("adulterado\n")
+        assert len(verify(destino)) == 1
+
+    def test_rotulo_alterado_reescreve_o_extrato(self, frames, ambiente):
+        """Um rótulo novo na dimensão reescreve todas as partições do extrato que o usa"""
+        planilha, destino, armazenamento = ambiente
+        escrever_planilha(frames, planilha)
+        export(planilha, destino, armazenamento)
+        total = len(read_manifest(destino)["extratos"]["vendas_por_pagamento"]["particoes"])
+
+        frames['payment_method_type'].loc[0, 'nome'] = "Boleto"
+        escrever_planilha(frames, planilha)
+        relatorio = export(planilha, destino, armazenamento)["extratos"]
+
+        assert relatorio["vendas_por_pagamento"]["escritas"] == total
+        assert relatorio["produtos_mais_vendidos"]["escritas"] == 0
+        assert "Boleto" in set(ler_extrato(destino, "vendas_por_pagamento")["nome"])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
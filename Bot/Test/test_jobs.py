@@ -0,0 +1,112 @@
+import pytest
+import os
+import sys
+import threading
+
+# Adicionar o diretório Bot ao path para importar a fila de jobs
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobs import DONE, FAILED, JobManager, JobQueueFull, JobStore
+
+class TestJobManager:
+    """Testes para a fila de jobs em segundo plano"""
+
+    def test_executa_e_guarda_o_resultado(self):
+        """O job roda em segundo plano e o resultado fica disponível pelo id"""
+        jobs = JobManager(workers=1)
+        job, novo = jobs.submit('a', lambda: {"total": 42}, {"tipo_query": "teste"})
+
+        assert novo
+        assert job.wait(5)
+        assert job.status == DONE
+        assert jobs.get(job.id).result == {"total": 42}
+        assert job.to_dict()["tipo_query"] == "teste"
+
+    def test_pedido_repetido_recebe_o_mesmo_job(self):
+        """Com a mesma chave, o trabalho é feito uma vez, em andamento ou concluído"""
+        liberar = threading.Event()
+        execucoes = []
+
+        def lento():
+            execucoes.append(1)
+            liberar.wait(5)
+            return 1
+
+        jobs = JobManager(workers=2)
+        primeiro, _ = jobs.submit('mesma', lento)
+        segundo, novo = jobs.submit('mesma', lento)
+        liberar.set()
+        assert primeiro.wait(5)
+        terceiro, _ = jobs.submit('mesma', lento)
+
+        assert segundo is primeiro and terceiro is primeiro
+        assert not novo
+        assert execucoes == [1]
+        assert jobs.stats()["reaproveitados"] == 2
+
+    def test_job_com_erro_pode_ser_repetido(self):
+        """Um job que falhou registra o erro e não é reaproveitado"""
+        def falha():
+            raise RuntimeError("planilha corrompida")
+
+        jobs = JobManager(workers=1)
+        job, _ = jobs.submit('x', falha)
+        assert job.wait(5)
+        assert job.status == FAILED
+        assert job.to_dict()["erro"] == "planilha corrompida"
+
+        novo_job, novo = jobs.submit('x', lambda: 1)
+        assert novo and novo_job is not job
+
+    def test_limite_de_jobs_pendentes(self):
+        """Acima do limite de pendentes o envio é recusado"""
+        liberar = threading.Event()
+        jobs = JobManager(workers=1, max_pending=2)
+        jobs.submit(1, lambda: liberar.wait(5))
+        jobs.submit(2, lambda: liberar.wait(5))
+
+        with pytest.raises(JobQueueFull):
+            jobs.submit(3, lambda: None)
+        liberar.set()
+        assert jobs.stats()["recusados"] == 1
+
+    def test_jobs_concluidos_expiram(self):
+        """Jobs concluídos saem da fila depois do tempo de retenção"""
+        jobs = JobManager(workers=1, ttl=0)
+        job, _ = jobs.submit('a', lambda: 1)
+        assert job.wait(5)
+
+        jobs.submit('b', lambda: 2)
+        assert jobs.get(job.id) is None
+
+    def test_job_consultado_por_outro_processo(self, tmp_path):
+        """Com o arquivo compartilhado, outro gerenciador (outro worker) acompanha o job até o resultado"""
+        arquivo = str(tmp_path / "jobs.sqlite3")
+        liberar = threading.Event()
+        worker_a = JobManager(workers=1, store=JobStore(arquivo))
+        worker_b = JobManager(workers=1, store=JobStore(arquivo))
+
+        job, _ = worker_a.submit('a', lambda: liberar.wait(5) and {"total": 42}, {"tipo_query": "teste"})
+        visto = worker_b.get(job.id)
+        assert visto is not None and not visto.finished()
+        assert not visto.wait(0.1)
+
+        liberar.set()
+        assert visto.wait(5)
+        assert visto.status == DONE
+        assert visto.result == {"total": 42}
+        assert visto.to_dict()["tipo_query"] == "teste"
+        assert worker_b.get("inexistente") is None
+
+    def test_job_compartilhado_expira(self, tmp_path):
+        """Jobs concluídos também saem do arquivo depois do tempo de retenção"""
+        arquivo = str(tmp_path / "jobs.sqlite3")
+        worker_a = JobManager(workers=1, ttl=0, store=JobStore(arquivo))
+        worker_b = JobManager(workers=1, ttl=0, store=JobStore(arquivo))
+
+        job, _ = worker_a.submit('a', lambda: 1)
+        assert job.wait(5)
+        assert worker_b.get(job.id) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
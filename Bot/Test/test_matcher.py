@@ -0,0 +1,46 @@
+import pytest
+import os
+import sys
+
+# Adicionar o diretório Bot ao path para importar o módulo do matcher
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matcher import QuestionMatcher, normalize
+
+class TestMatcher:
+    """Testes para o índice de busca de perguntas"""
+
+    def test_normalizacao(self):
+        """Acentos, pontuação, maiúsculas e espaços extras são removidos"""
+        assert normalize("  Qual é o CUSTO das estadias?! ") == "qual e o custo das estadias"
+
+    def test_pergunta_proxima(self):
+        """Perguntas parecidas encontram a entrada mais próxima"""
+        matcher = QuestionMatcher([("qual o custo total das estadias por pet?", "estadias"),
+                                   ("quais os produtos mais vendidos?", "produtos")])
+
+        resposta, similaridade = matcher.match("qual o custo total de estadias por pet")
+        assert resposta == "estadias"
+        assert similaridade >= matcher.threshold
+
+    def test_limite_de_confianca(self):
+        """Perguntas sem relação com o catálogo ficam abaixo do limite"""
+        matcher = QuestionMatcher([("qual o custo total das estadias por pet?", "estadias")])
+
+        resposta, similaridade = matcher.match("qual é a cor do céu?")
+        assert resposta is None
+        assert similaridade < matcher.threshold
+
+    def test_catalogo_grande(self):
+        """Com milhares de intenções cada busca compara no máximo max_candidates perguntas"""
+        for tamanho in (5000, 20000):
+            entradas = [(f"qual o total de vendas do produto {i} na loja {i * 7}", i) for i in range(tamanho)]
+            matcher = QuestionMatcher(entradas)
+
+            for i in (0, 1234, tamanho - 1):
+                pergunta = f"total de vendas do produto {i} na loja {i * 7}"
+                assert len(matcher.candidates(pergunta)) <= matcher.max_candidates == 512
+                assert matcher.match(pergunta)[0] == i
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,50 @@
+import pytest
+import os
+import sys
+
+# Adicionar o diretório Bot ao path para importar o módulo de métricas
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Counter, Histogram, Registry
+
+class TestMetrics:
+    """Testes para os histogramas, contadores e o formato do Prometheus"""
+
+    def test_histograma_acumula_buckets(self):
+        """Cada observação conta no seu bucket e nos seguintes"""
+        histogram = Histogram('teste_segundos', 'teste', ('rota',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, '/chat')
+        histogram.observe(0.5, '/chat')
+        histogram.observe(5.0, '/chat')
+
+        samples = {(name, labels): value for name, labels, value in histogram.samples()}
+        assert samples[('teste_segundos_bucket', '{rota="/chat",le="0.1"}')] == 1
+        assert samples[('teste_segundos_bucket', '{rota="/chat",le="1.0"}')] == 2
+        assert samples[('teste_segundos_bucket', '{rota="/chat",le="+Inf"}')] == 3
+        assert samples[('teste_segundos_count', '{rota="/chat"}')] == 3
+        assert samples[('teste_segundos_sum', '{rota="/chat"}')] == pytest.approx(5.55)
+
+    def test_timer_registra_duracao(self):
+        """O context manager registra uma observação por bloco"""
+        histogram = Histogram('teste_segundos', 'teste', ('etapa',))
+        with histogram.time('merge'):
+            pass
+        assert histogram.count('merge') == 1
+
+    def test_render_formato_prometheus(self):
+        """O texto traz HELP, TYPE e as amostras com rótulos escapados"""
+        registry = Registry()
+        counter = registry.register(Counter('teste_total', 'Contador de teste', ('resultado',)))
+        counter.inc('acerto')
+        counter.inc('com "aspas"')
+        registry.gauge_callback('teste_gauge', 'Gauge de teste', lambda: 7)
+
+        text = registry.render()
+        assert '# TYPE teste_total counter' in text
+        assert 'teste_total{resultado="acerto"} 1' in text
+        assert 'teste_total{resultado="com \\"aspas\\""} 1' in text
+        assert 'teste_gauge 7' in text
+        assert text.endswith('\n')
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,97 @@
+import pytest
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import AGGREGATE_SPECS, MaterializedAggregates, compute_full, query_totals
+from parallel import ParallelExecutor, SharedArrays
+from synthetic import SyntheticDataset
+
+@pytest.fixture(scope='module')
+def dataset():
+    return SyntheticDataset(scale=0.005, seed=2)
+
+@pytest.fixture(scope='module')
+def executor():
+    """Executor com dois processos e partições pequenas, paralelo mesmo com poucas linhas"""
+    executor = ParallelExecutor(workers=2, min_rows=0, partition_rows=700)
+    yield executor
+    executor.close()
+
+class TestExecutorParalelo:
+    """Testes para o executor paralelo sobre partições de linhas"""
+
+    def test_particoes_de_tamanho_fixo(self):
+        """As partições cobrem todas as linhas e não dependem do número de processos"""
+        assert ParallelExecutor(2, partition_rows=4).partitions(10) == [(0, 4), (4, 8), (8, 10)]
+        assert ParallelExecutor(8, partition_rows=4).partitions(10) == [(0, 4), (4, 8), (8, 10)]
+        assert ParallelExecutor(2, partition_rows=4).partitions(0) == [(0, 0)]
+
+    def test_entrada_pequena_executa_no_proprio_processo(self, dataset):
+        """Com poucas linhas (ou um só processo) o pool nem é criado"""
+        executor = ParallelExecutor(workers=4, min_rows=10**9)
+        snapshot = dataset.get()
+
+        paralelo = query_totals(snapshot, AGGREGATE_SPECS, executor)
+        serial = query_totals(snapshot, AGGREGATE_SPECS, ParallelExecutor(workers=1))
+
+        assert executor._pool is None
+        for tipo_query in AGGREGATE_SPECS:
+            for obtido, esperado in zip(paralelo[tipo_query], serial[tipo_query]):
+                np.testing.assert_array_equal(obtido, esperado)
+
+    def test_totais_iguais_a_execucao_serial(self, dataset, executor):
+        """Os parciais combinados dão as mesmas chaves, contagens e somas da execução serial"""
+        snapshot = dataset.get()
+        paralelo = query_totals(snapshot, AGGREGATE_SPECS, executor)
+        serial = query_totals(snapshot, AGGREGATE_SPECS, ParallelExecutor(workers=1))
+
+        for tipo_query in AGGREGATE_SPECS:
+            chaves, somas, contagens = paralelo[tipo_query]
+            np.testing.assert_array_equal(chaves, serial[tipo_query][0])
+            np.testing.assert_array_equal(contagens, serial[tipo_query][2])
+            np.testing.assert_allclose(somas, serial[tipo_query][1], rtol=1e-12)
+
+    def test_resultado_nao_depende_do_numero_de_processos(self, dataset, executor):
+        """Com partições de tamanho fixo, três processos dão exatamente o mesmo que dois"""
+        snapshot = dataset.get()
+        tres = ParallelExecutor(workers=3, min_rows=0, partition_rows=700)
+        try:
+            esperado = query_totals(snapshot, AGGREGATE_SPECS, executor)
+            obtido = query_totals(snapshot, AGGREGATE_SPECS, tres)
+        finally:
+            tres.close()
+
+        for tipo_query in AGGREGATE_SPECS:
+            np.testing.assert_array_equal(obtido[tipo_query][1], esperado[tipo_query][1])
+
+    def test_agregados_materializados_em_paralelo(self, dataset, executor):
+        """A construção dos agregados pelo executor paralelo confere com o merge + groupby"""
+        agregados = MaterializedAggregates(dataset, executor)
+        snapshot = dataset.get()
+
+        for tipo_query in AGGREGATE_SPECS:
+            esperado = compute_full(snapshot, tipo_query)
+            pd.testing.assert_series_equal(agregados.result(tipo_query), esperado, check_dtype=False, rtol=1e-12)
+        assert agregados.verify() == {}
+
+    def test_memoria_compartilhada_copiada_uma_vez_e_liberada(self):
+        """A mesma coluna pedida duas vezes ocupa um só bloco, removido ao final"""
+        valores = np.arange(1000, dtype=np.int64)
+        with SharedArrays() as compartilhados:
+            primeiro = compartilhados.share(valores)
+            segundo = compartilhados.share(valores[:])
+            assert primeiro == segundo
+            assert len(compartilhados._blocks) == 1
+
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=primeiro[0])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,42 @@
+import pytest
+import os
+import sys
+
+# Adicionar o diretório Bot ao path para importar o módulo do cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache, make_etag
+
+class TestResultCache:
+    """Testes para o cache LRU de resultados"""
+
+    def test_acertos_e_falhas(self):
+        """Consultas contam acertos e falhas"""
+        cache = ResultCache()
+        assert cache.get("a") is None
+        cache.put("a", b"123")
+
+        assert cache.get("a") == b"123"
+        assert cache.stats()["acertos"] == 1
+        assert cache.stats()["falhas"] == 1
+
+    def test_remove_menos_usado_ao_atingir_limite(self):
+        """O limite de memória remove as entradas usadas há mais tempo"""
+        cache = ResultCache(max_bytes=10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+        cache.put("c", b"cccc")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.stats()["bytes"] <= 10
+        assert cache.stats()["remocoes"] == 1
+
+    def test_etag_muda_com_a_versao(self):
+        """O ETag depende da versão dos dados e dos parâmetros"""
+        assert make_etag("vendas_por_pagamento", None, "v1") != make_etag("vendas_por_pagamento", None, "v2")
+        assert make_etag("vendas_por_pagamento", [0, 10], "v1") != make_etag("vendas_por_pagamento", None, "v1")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
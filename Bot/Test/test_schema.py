@@ -0,0 +1,98 @@
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar o módulo do esquema
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_cache import DATASET, freeze_frame
+from schema import apply_all, apply_schema, check_foreign_keys, memory_report, narrowest_int
+
+def tabela_produtos(**colunas):
+    """Aba product mínima, com colunas substituíveis pelo teste"""
+    dados = {
+        'product_id': [1, 2, 3],
+        'name': ['Coleira', 'Petisco', 'Coleira'],
+        'brand': ['Hotel', 'Patas', 'Hotel'],
+        'type': ['OWN_PRODUCT', 'SUPPLIER_PRODUCT', 'OWN_PRODUCT'],
+        'created_at': pd.to_datetime(['2025-01-01'] * 3),
+        'updated_at': ['2025-01-01', '2025-01-02', '2025-01-03'],
+        'created_by': [1, 1, 1],
+        'updated_by': [1, 1, 1]
+    }
+    dados.update(colunas)
+    return pd.DataFrame(dados)
+
+class TestSchema:
+    """Testes para o esquema declarado das abas da planilha"""
+
+    def test_menor_inteiro(self):
+        assert narrowest_int(np.array([1, 100])) == np.int8
+        assert narrowest_int(np.array([-1, 40000])) == np.int32
+        assert narrowest_int(np.array([11938475621])) == np.int64
+
+    def test_converte_para_os_tipos_declarados(self):
+        """Ids estreitos, textos categóricos e datas convertidas"""
+        tabela, violacoes = apply_schema('product', tabela_produtos())
+
+        assert violacoes == []
+        assert tabela['product_id'].dtype == np.int8
+        assert isinstance(tabela['name'].dtype, pd.CategoricalDtype)
+        assert list(tabela['name'].cat.categories) == ['Coleira', 'Petisco']
+        assert pd.api.types.is_datetime64_any_dtype(tabela['updated_at'])
+
+    def test_float_compacto_apenas_sem_perda(self):
+        """weight vira float32 só quando nenhum valor muda"""
+        pet = DATASET.get()['pet'].copy()
+        exato, _ = apply_schema('pet', pet.assign(weight=[1.5] * len(pet)))
+        inexato, _ = apply_schema('pet', pet.assign(weight=[0.1] * len(pet)))
+
+        assert exato['weight'].dtype == np.float32
+        assert inexato['weight'].dtype == np.float64
+
+    def test_violacoes_reportadas(self):
+        """Ausentes, valores inválidos, chave repetida e coluna faltando são reportados"""
+        tabela = tabela_produtos(product_id=[1, 1, 2], created_by=[1, 'x', 1]).drop(columns=['brand'])
+        tabela.loc[0, 'name'] = None
+
+        _, violacoes = apply_schema('product', tabela)
+        texto = '\n'.join(violacoes)
+        assert "product.name: 1 valores ausentes" in texto
+        assert "product.created_by: 1 valores não numéricos" in texto
+        assert "product.product_id: chave primária com valores repetidos" in texto
+        assert "product.brand: coluna ausente" in texto
+
+    def test_chaves_estrangeiras_sem_correspondencia(self):
+        frames = {aba: df for aba, df in DATASET.get().frames.items()}
+        frames['purchase'] = frames['purchase'].assign(product_id=999)
+
+        violacoes = check_foreign_keys(frames)
+        assert any(v.startswith("purchase.product_id:") for v in violacoes)
+
+    def test_planilha_sem_violacoes(self):
+        """A planilha do projeto segue o esquema e os rótulos são categóricos"""
+        snapshot = DATASET.get()
+
+        assert snapshot.violations == ()
+        assert isinstance(snapshot['payment_method_type']['nome'].dtype, pd.CategoricalDtype)
+        assert snapshot['purchase']['purchase_id'].dtype == np.int8
+
+    def test_congelamento_mantem_categoricas(self):
+        """freeze_frame preserva a categórica e deixa os códigos somente leitura"""
+        tabela, _ = apply_all([('product', tabela_produtos())])
+        congelada = freeze_frame(tabela['product'])
+
+        assert isinstance(congelada['name'].dtype, pd.CategoricalDtype)
+        assert not congelada['name'].array.codes.flags.writeable
+
+    def test_relatorio_de_memoria(self):
+        relatorio = memory_report({'product': tabela_produtos()})
+
+        assert relatorio["bytes_total"] == relatorio["tabelas"]["product"]["bytes"]
+        assert relatorio["tabelas"]["product"]["colunas"]["product_id"]["tipo"] == "int64"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
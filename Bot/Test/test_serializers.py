@@ -0,0 +1,88 @@
+import pytest
+import json
+import os
+import sys
+
+import pandas as pd
+from flask import Flask, jsonify
+from werkzeug.datastructures import MIMEAccept
+
+# Adicionar o diretório Bot ao path para importar os serializadores
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serializers import COLUMNAR, JSON, NotAcceptable, _pyarrow, negotiate
+
+RESULTADO = pd.Series([30.5, 12.0, 7.25], index=['Rex', 'Bidu', 'Mel'])
+
+class TestNegociacao:
+    """Testes para a escolha do serializador pelo cabeçalho Accept"""
+
+    def test_padrao_e_json_original(self):
+        """Sem Accept, com */* ou com tipos desconhecidos o formato é o original"""
+        for accept in ([], [('*/*', 1)], [('text/html', 1)], [('application/json', 1)]):
+            assert negotiate(MIMEAccept(accept)) is JSON
+
+    def test_colunar(self):
+        """O JSON colunar é escolhido quando tem a maior preferência"""
+        accept = MIMEAccept([('application/vnd.hotel.columnar+json', 1), ('application/json', 0.5)])
+        assert negotiate(accept) is COLUMNAR
+
+    def test_arrow_sem_pyarrow(self):
+        """Pedir só Arrow sem o pyarrow instalado é recusado"""
+        if _pyarrow() is not None:
+            pytest.skip("pyarrow instalado")
+        with pytest.raises(NotAcceptable):
+            negotiate(MIMEAccept([('application/vnd.apache.arrow.stream', 1)]))
+
+class TestSerializadores:
+    """Testes para os corpos gerados por cada formato"""
+
+    def test_json_igual_ao_jsonify(self):
+        """O formato original mantém o corpo de antes: objeto {rótulo: valor}, chaves ordenadas"""
+        corpo = JSON.query({"tipo_query": "t", "status": "sucesso"}, RESULTADO)
+        with Flask(__name__).app_context():
+            esperado = jsonify({"tipo_query": "t", "status": "sucesso", "resultado": RESULTADO.to_dict()}).data
+        assert corpo == esperado
+
+    def test_colunar_mantem_a_ordem(self):
+        """Rótulos e valores saem em listas paralelas, na ordem do resultado"""
+        corpo = json.loads(COLUMNAR.query({"tipo_query": "t"}, RESULTADO))
+        assert corpo["resultado"] == {"labels": ['Rex', 'Bidu', 'Mel'], "values": [30.5, 12.0, 7.25]}
+
+    def test_lote_com_erros(self):
+        """Itens com erro passam sem alteração e os demais são convertidos"""
+        itens = [{"tipo_query": "t", "resultado": RESULTADO, "status": "sucesso"},
+                 {"tipo_query": "x", "status": "erro", "erro": "Tipo de query não reconhecido"}]
+        corpo = json.loads(COLUMNAR.batch({"total": 2}, itens))
+        assert corpo["resultados"][0]["resultado"]["labels"] == ['Rex', 'Bidu', 'Mel']
+        assert corpo["resultados"][1] == itens[1]
+
+class TestArrow:
+    """Testes de ida e volta do Arrow IPC (só com o pyarrow instalado)"""
+
+    def test_query(self):
+        """Rótulos e valores voltam na ordem do resultado e o envelope vem nos metadados"""
+        pyarrow = pytest.importorskip("pyarrow")
+        serializador = negotiate(MIMEAccept([('application/vnd.apache.arrow.stream', 1)]))
+
+        tabela = pyarrow.ipc.open_stream(serializador.query({"tipo_query": "t"}, RESULTADO)).read_all()
+        assert tabela.column_names == ['rotulo', 'valor']
+        assert tabela.column('rotulo').to_pylist() == ['Rex', 'Bidu', 'Mel']
+        assert tabela.column('valor').to_pylist() == [30.5, 12.0, 7.25]
+        assert json.loads(tabela.schema.metadata[b'envelope']) == {"tipo_query": "t"}
+
+    def test_lote_com_erros(self):
+        """O lote vira uma tabela longa por tipo_query e os itens com erro vão nos metadados"""
+        pyarrow = pytest.importorskip("pyarrow")
+        serializador = negotiate(MIMEAccept([('application/vnd.apache.arrow.stream', 1)]))
+        itens = [{"tipo_query": "t", "resultado": RESULTADO, "status": "sucesso"},
+                 {"tipo_query": "x", "status": "erro", "erro": "Tipo de query não reconhecido"}]
+
+        tabela = pyarrow.ipc.open_stream(serializador.batch({"total": 2}, itens)).read_all()
+        assert tabela.column('tipo_query').to_pylist() == ['t', 't', 't']
+        assert tabela.column('valor').to_pylist() == [30.5, 12.0, 7.25]
+        envelope = json.loads(tabela.schema.metadata[b'envelope'])
+        assert envelope["erros"] == [{"posicao": 1, **itens[1]}]
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
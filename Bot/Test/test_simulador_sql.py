@@ -0,0 +1,103 @@
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar o simulador
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import colstore
+import simulador_sql
+from parallel import ParallelExecutor
+from simulador_sql import COLUNAS, CONSULTAS, SomaPorRotulo
+from synthetic import generate
+
+@pytest.fixture(scope='module')
+def planilha(tmp_path_factory):
+    """Planilha sintética só com as colunas das queries, com chaves e valores ausentes"""
+    frames = generate(scale=0.002, seed=3)
+    frames['purchase'].loc[5, 'product_id'] = np.nan
+    frames['purchase'].loc[7, 'total_value'] = np.nan
+    # Chave sem correspondência na dimensão: a linha não entra em nenhum grupo
+    frames['stay'].loc[11, 'pet_id'] = frames['pet']['pet_id'].max() + 1
+
+    destino = str(tmp_path_factory.mktemp("simulador") / "dados.xlsx")
+    with pd.ExcelWriter(destino) as writer:
+        for tabela, colunas in COLUNAS.items():
+            frames[tabela][colunas].to_excel(writer, sheet_name=tabela, index=False)
+    return destino
+
+@pytest.fixture(scope='module')
+def em_memoria(planilha, tmp_path_factory):
+    sem_armazenamento = str(tmp_path_factory.mktemp("vazio"))
+    return simulador_sql.executar_em_memoria(simulador_sql.carregar_tabelas(planilha, sem_armazenamento))
+
+class TestSimuladorEmBlocos:
+    """Testes para o modo em blocos do simulador de queries"""
+
+    @pytest.mark.parametrize("tamanho_bloco", [1, 97, 100_000])
+    def test_planilha_em_blocos_igual_em_memoria(self, planilha, em_memoria, tmp_path, tamanho_bloco):
+        """Lendo a planilha em blocos, os totais são idênticos aos do merge + groupby"""
+        resultados, _ = simulador_sql.executar_em_blocos(planilha, str(tmp_path), tamanho_bloco)
+
+        assert set(resultados) == set(CONSULTAS)
+        for nome, esperado in em_memoria.items():
+            pd.testing.assert_series_equal(resultados[nome], esperado, check_exact=True)
+
+    def test_armazenamento_em_blocos_igual_em_memoria(self, planilha, em_memoria, tmp_path):
+        """Os blocos lidos do armazenamento colunar também dão os mesmos totais"""
+        armazenamento = str(tmp_path / "colstore")
+        colstore.ingest(planilha, armazenamento, sheets=tuple(COLUNAS))
+
+        resultados, estatisticas = simulador_sql.executar_em_blocos(planilha, armazenamento, 256)
+
+        for nome, esperado in em_memoria.items():
+            pd.testing.assert_series_equal(resultados[nome], esperado, check_exact=True)
+        assert estatisticas["linhas"] == 4000
+        assert estatisticas["blocos"] == 2 * -(-2000 // 256)
+        assert estatisticas["linhas_por_segundo"] > 0
+
+    def test_blocos_limitados_ao_tamanho(self, planilha, tmp_path):
+        """Nenhum bloco passa do tamanho pedido e todas as linhas são lidas, em ordem"""
+        blocos = list(simulador_sql.ler_blocos('purchase', planilha, str(tmp_path), 300))
+
+        assert max(len(bloco) for bloco in blocos) == 300
+        ids = pd.concat(blocos)['product_id']
+        esperado = pd.read_excel(planilha, 'purchase')['product_id']
+        np.testing.assert_array_equal(ids.to_numpy(), esperado.to_numpy())
+
+    def test_soma_compensada_continua_entre_blocos(self):
+        """A soma de Kahan continua entre blocos: o total é o do groupby sobre tudo"""
+        rng = np.random.default_rng(0)
+        valores = rng.choice([1e16, -1e16, 1.0, 0.1, 3.3333333333333335], size=5000)
+        codigos = rng.integers(0, 3, size=5000)
+        rotulos = pd.Categorical.from_codes([0, 1, 2], categories=['a', 'b', 'c'])
+        esperado = pd.Series(valores).groupby(rotulos[codigos], observed=True).sum().sort_values(ascending=False)
+
+        parcial = SomaPorRotulo(3)
+        for inicio in range(0, 5000, 333):
+            parcial.acumular(codigos[inicio:inicio + 333], valores[inicio:inicio + 333])
+
+        obtido = parcial.resultado(rotulos, None, None)
+        np.testing.assert_array_equal(obtido.to_numpy(), esperado.to_numpy())
+        assert list(obtido.index) == list(esperado.index)
+
+class TestSimuladorParalelo:
+    """Testes para o modo paralelo do simulador de queries"""
+
+    def test_paralelo_igual_em_memoria(self, planilha, em_memoria, tmp_path):
+        """As partições agregadas em dois processos dão os totais do merge + groupby"""
+        tabelas = simulador_sql.carregar_tabelas(planilha, str(tmp_path))
+        executor = ParallelExecutor(workers=2, min_rows=0, partition_rows=300)
+        try:
+            resultados = simulador_sql.executar_em_paralelo(tabelas, executor)
+        finally:
+            executor.close()
+
+        for nome, esperado in em_memoria.items():
+            pd.testing.assert_series_equal(resultados[nome], esperado, check_dtype=False, rtol=1e-12)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
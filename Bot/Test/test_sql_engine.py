@@ -0,0 +1,49 @@
+import pytest
+import os
+import sqlite3
+import sys
+
+# Adicionar o diretório Bot ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot import chatbot_response
+from chatbot_api import execute_query_simulation
+from sql_engine import SQLEngine
+
+PERGUNTAS = {
+    "vendas_por_pagamento": "Qual o total de vendas de produtos por tipo de pagamento?",
+    "produtos_mais_vendidos": "Quais os produtos mais vendidos em termos de quantidade?",
+    "estadias_por_pet": "Qual o custo total das estadias por pet?"
+}
+
+@pytest.fixture(scope="module")
+def engine():
+    """Motor SQL sobre o conjunto de dados do projeto"""
+    return SQLEngine()
+
+class TestSQLEngine:
+    """Testes para a execução das queries do chatbot no SQLite em memória"""
+
+    @pytest.mark.parametrize("tipo_query", list(PERGUNTAS))
+    def test_resultado_igual_a_simulacao(self, engine, tipo_query):
+        """A query SQL do catálogo produz os mesmos totais da simulação com pandas"""
+        colunas, linhas = engine.execute(chatbot_response(PERGUNTAS[tipo_query])["query"])
+        esperado = execute_query_simulation(tipo_query)
+
+        assert len(colunas) == 2
+        assert dict(linhas) == pytest.approx(esperado)
+
+    @pytest.mark.parametrize("tipo_query", list(PERGUNTAS))
+    def test_juncao_usa_indices(self, engine, tipo_query):
+        """As junções do catálogo são resolvidas pelos índices das chaves"""
+        plano = engine.explain(chatbot_response(PERGUNTAS[tipo_query])["query"])
+
+        assert any("SEARCH" in passo and "INDEX" in passo for passo in plano)
+
+    def test_somente_leitura(self, engine):
+        """Comandos de escrita são recusados"""
+        with pytest.raises(sqlite3.DatabaseError):
+            engine.execute("DELETE FROM purchase")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
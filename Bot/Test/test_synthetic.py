@@ -0,0 +1,83 @@
+import pytest
+import os
+import sys
+
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar o gerador e o benchmark
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import MaterializedAggregates
+from benchmark import compare
+from dataset_cache import SHEETS
+from synthetic import SyntheticDataset, generate
+
+# Chaves estrangeiras do esquema: (tabela, coluna) -> (tabela, coluna referenciada)
+FOREIGN_KEYS = {
+    ('address', 'user_id'): ('user', 'user_id'),
+    ('seller', 'user_id'): ('user', 'user_id'),
+    ('pet_owner', 'user_id'): ('user', 'user_id'),
+    ('pet', 'user_id'): ('pet_owner', 'user_id'),
+    ('pet', 'pet_type_id'): ('pet_type', 'pet_type_id'),
+    ('stay', 'pet_id'): ('pet', 'pet_id'),
+    ('stay', 'payment_method'): ('payment_method_type', 'payment_method_type_id'),
+    ('purchase', 'product_id'): ('product', 'product_id'),
+    ('purchase', 'payment_method'): ('payment_method_type', 'payment_method_type_id'),
+    ('purchase', 'created_by'): ('seller', 'user_id')
+}
+
+@pytest.fixture(scope='module')
+def frames():
+    return generate(scale=0.005, seed=1)
+
+class TestSyntheticData:
+    """Testes para o gerador de dados sintéticos"""
+
+    def test_gera_todas_as_abas(self, frames):
+        """Todas as abas da planilha são geradas, na mesma ordem"""
+        assert tuple(frames) == SHEETS
+        assert len(frames['purchase']) == 5000
+
+    def test_chaves_estrangeiras_consistentes(self, frames):
+        """Toda chave estrangeira aponta para uma linha existente"""
+        for (table, column), (parent, parent_column) in FOREIGN_KEYS.items():
+            assert frames[table][column].isin(frames[parent][parent_column]).all(), (table, column)
+
+    def test_chaves_primarias_unicas(self, frames):
+        """Os ids de cada tabela são únicos"""
+        for table, df in frames.items():
+            assert df.iloc[:, 0].is_unique, table
+
+    def test_deterministico_pela_semente(self, frames):
+        """A mesma semente gera os mesmos dados"""
+        pd.testing.assert_frame_equal(frames['stay'], generate(scale=0.005, seed=1)['stay'])
+
+    def test_distribuicao_concentrada(self, frames):
+        """Poucos produtos concentram a maior parte das compras"""
+        share = frames['purchase']['product_id'].value_counts(normalize=True)
+        assert share.iloc[0] > 3 / len(frames['product'])
+
+    def test_agregados_conferem_com_recalculo(self):
+        """Os agregados materializados conferem com merge + groupby nos dados gerados"""
+        aggregates = MaterializedAggregates(SyntheticDataset(scale=0.005, seed=2))
+        assert aggregates.verify() == {}
+
+class TestBenchmarkCompare:
+    """Testes para a detecção de regressões do benchmark"""
+
+    def test_aponta_regressao_acima_da_tolerancia(self):
+        baseline = {"resultados": {"a@1": {"mediana_s": 0.010}, "b@1": {"mediana_s": 0.010}}}
+        report = {"resultados": {"a@1": {"mediana_s": 0.020}, "b@1": {"mediana_s": 0.011},
+                                 "c@1": {"mediana_s": 1.0}}}
+
+        regressions = compare(report, baseline, tolerance=0.25)
+        assert [r["medicao"] for r in regressions] == ["a@1"]
+
+    def test_ignora_diferencas_pequenas(self):
+        """Medições muito curtas não geram alarme por ruído"""
+        baseline = {"resultados": {"a@1": {"mediana_s": 0.0001}}}
+        report = {"resultados": {"a@1": {"mediana_s": 0.0003}}}
+        assert compare(report, baseline) == []
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,107 @@
+import pytest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adicionar o diretório Bot ao path para importar os módulos
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import AGGREGATE_SPECS, compute_full
+from filters import FilterError, read_filters
+from synthetic import SyntheticDataset
+from time_index import TIME_COLUMNS, FilteredAggregates, dimension_filters
+
+@pytest.fixture(scope='module')
+def dataset():
+    return SyntheticDataset(scale=0.02, seed=5)
+
+def recalculo_com_mascara(snapshot, tipo_query, filtros):
+    """Referência: filtra a tabela fato com máscara booleana e faz merge + groupby"""
+    spec = AGGREGATE_SPECS[tipo_query]
+    fato = snapshot[spec.fact]
+    tempo = fato[TIME_COLUMNS[spec.fact]]
+    mascara = np.ones(len(fato), dtype=bool)
+    if 'inicio' in filtros:
+        mascara &= (tempo >= filtros['inicio']).to_numpy()
+    if 'fim' in filtros:
+        mascara &= (tempo < filtros['fim']).to_numpy()
+    for coluna, aceitos in dimension_filters(snapshot, filtros):
+        mascara &= fato[coluna].isin(aceitos).to_numpy()
+    return compute_full({**snapshot.frames, spec.fact: fato[mascara]}, tipo_query)
+
+CASOS = [
+    {"mes": "2025-02"},
+    {"data_inicio": "2025-03-10T13:30:00", "data_fim": "2025-05-02"},
+    {"data_inicio": "2025-03-10 05:00", "data_fim": "2025-03-10 09:00"},
+    {"data_fim": "2025-01-31", "vendedor": [1, 2]},
+    {"data_inicio": "2030-01-01"}
+]
+
+class TestTimeIndex:
+    """Testes para os agregados filtrados pelo índice de tempo"""
+
+    @pytest.mark.parametrize("tipo_query", list(AGGREGATE_SPECS))
+    @pytest.mark.parametrize("corpo", CASOS)
+    def test_igual_ao_filtro_por_mascara(self, dataset, tipo_query, corpo):
+        """Intervalos com dias inteiros, pontas parciais e vendedor conferem com a máscara"""
+        filtros = read_filters(corpo)
+        esperado = recalculo_com_mascara(dataset.get(), tipo_query, filtros)
+        obtido = FilteredAggregates(dataset).result(tipo_query, filtros)
+
+        assert list(obtido.index) == list(esperado.index)
+        assert np.allclose(obtido.to_numpy(dtype=float), esperado.to_numpy(dtype=float))
+
+    @pytest.mark.parametrize("tipo_query, filtro", [
+        ("produtos_mais_vendidos", {"marca": ["hotel", "Patas"]}),
+        ("estadias_por_pet", {"tipo_pet": ["Gato"]}),
+        ("estadias_por_pet", {"tipo_pet": ["1"], "vendedor": [2]})
+    ])
+    def test_filtros_de_dimensao(self, dataset, tipo_query, filtro):
+        filtros = {**read_filters({"mes": "2025-04"}), **filtro}
+        esperado = recalculo_com_mascara(dataset.get(), tipo_query, filtros)
+        obtido = FilteredAggregates(dataset).result(tipo_query, filtros)
+
+        assert len(obtido) > 0
+        assert np.allclose(obtido.reindex(esperado.index).to_numpy(dtype=float),
+                           esperado.to_numpy(dtype=float))
+
+    def test_filtro_que_nao_se_aplica(self, dataset):
+        with pytest.raises(FilterError):
+            FilteredAggregates(dataset).result("vendas_por_pagamento", {"tipo_pet": ["Gato"]})
+
+    def test_indice_reaproveitado_por_versao(self, dataset):
+        agregados = FilteredAggregates(dataset)
+        indice = agregados.index(dataset.get(), 'purchase')
+        assert agregados.index(dataset.get(), 'purchase') is indice
+        assert np.all(np.diff(indice.times) >= 0)
+
+class TestReadFilters:
+    """Testes para a leitura dos filtros da requisição"""
+
+    def test_sem_filtros(self):
+        assert read_filters({"tipo_query": "x"}) is None
+
+    def test_data_fim_inclui_o_dia(self):
+        filtros = read_filters({"data_inicio": "2025-01-05", "data_fim": "2025-01-10"})
+        assert filtros["inicio"] == pd.Timestamp("2025-01-05")
+        assert filtros["fim"] == pd.Timestamp("2025-01-11")
+
+    def test_mes(self):
+        filtros = read_filters({"mes": "2025-02"})
+        assert (filtros["inicio"], filtros["fim"]) == (pd.Timestamp("2025-02-01"), pd.Timestamp("2025-03-01"))
+
+    @pytest.mark.parametrize("corpo", [
+        {"data_inicio": "ontem"},
+        {"data_inicio": "2025-02-01", "data_fim": "2025-01-01"},
+        {"mes": "2025-02", "data_inicio": "2025-02-01"},
+        {"vendedor": "joão"},
+        {"marca": []}
+    ])
+    def test_filtros_invalidos(self, corpo):
+        with pytest.raises(FilterError):
+            read_filters(corpo)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,155 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import ADMISSION_REJECTIONS, COALESCED_REQUESTS
+
+# Queries pesadas executadas ao mesmo tempo em cada processo, queries
+# aguardando vaga e tempo máximo de espera na fila (segundos)
+MAX_RUNNING = int(os.environ.get('HOTEL_MAX_HEAVY_QUERIES', 4))
+MAX_QUEUED = int(os.environ.get('HOTEL_MAX_QUEUED_QUERIES', 16))
+QUEUE_TIMEOUT = float(os.environ.get('HOTEL_QUEUE_TIMEOUT', 5))
+
+# Sugestão de espera (segundos) enviada no Retry-After das recusas
+RETRY_AFTER = 2
+
+
+class Overloaded(RuntimeError):
+    """Query recusada pelo controle de admissão.
+
+    ``status`` é 429 quando a fila de espera já está cheia (a query é recusada
+    na hora) e 503 quando a espera por uma vaga passou do limite.
+    """
+
+    def __init__(self, message, status, retry_after=RETRY_AFTER):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Limita quantas queries pesadas rodam ao mesmo tempo.
+
+    Até ``max_running`` execuções simultâneas; as seguintes esperam por uma
+    vaga, no máximo ``max_queued`` de cada vez e por até ``queue_timeout``
+    segundos. O excedente é recusado com Overloaded, então a latência e o
+    uso de CPU sob rajadas ficam limitados em vez de crescer com o número
+    de clientes.
+    """
+
+    def __init__(self, max_running=MAX_RUNNING, max_queued=MAX_QUEUED, queue_timeout=QUEUE_TIMEOUT):
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self._condition = threading.Condition()
+
+    def _acquire(self):
+        with self._condition:
+            if self.running >= self.max_running:
+                if self.queued >= self.max_queued:
+                    ADMISSION_REJECTIONS.inc('fila_cheia')
+                    raise Overloaded("Servidor ocupado: fila de queries cheia", 429)
+
+                self.queued += 1
+                try:
+                    deadline = time.monotonic() + self.queue_timeout
+                    while self.running >= self.max_running:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            ADMISSION_REJECTIONS.inc('tempo_esgotado')
+                            raise Overloaded("Servidor ocupado: tempo de espera por uma vaga esgotado", 503)
+                        self._condition.wait(remaining)
+                finally:
+                    self.queued -= 1
+
+            self.running += 1
+            self.admitted += 1
+
+    def _release(self):
+        with self._condition:
+            self.running -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self):
+        """Ocupa uma vaga durante o bloco (esperando por ela, se preciso)"""
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "limite_execucao": self.max_running,
+                "limite_fila": self.max_queued,
+                "em_execucao": self.running,
+                "na_fila": self.queued,
+                "admitidas": self.admitted
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Uma única execução em andamento por chave.
+
+    Chamadas concorrentes com a mesma chave esperam pela execução já em
+    andamento e recebem o mesmo resultado (ou a mesma exceção). Terminada a
+    execução, a chave é liberada; resultados não são guardados aqui.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, function):
+        """Devolve (resultado, compartilhado)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self.shared += 1
+            COALESCED_REQUESTS.inc()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+# Instâncias compartilhadas pelo processo
+ADMISSION = AdmissionController()
+INFLIGHT = SingleFlight()
@@ -0,0 +1,320 @@
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dataset_cache import DATASET
+from metrics import QUERY_STAGE_LATENCY
+from parallel import EXECUTOR
+
+# Definição de cada agregado: tabela fato, chave primária, chave estrangeira,
+# coluna somada e a dimensão que fornece o rótulo do grupo
+AggregateSpec = namedtuple('AggregateSpec', 'fact pk key value dimension dimension_key label')
+
+AGGREGATE_SPECS = {
+    "vendas_por_pagamento": AggregateSpec(
+        'purchase', 'purchase_id', 'payment_method', 'total_value',
+        'payment_method_type', 'payment_method_type_id', 'nome'),
+    "produtos_mais_vendidos": AggregateSpec(
+        'purchase', 'purchase_id', 'product_id', 'quantity',
+        'product', 'product_id', 'name'),
+    "estadias_por_pet": AggregateSpec(
+        'stay', 'stay_id', 'pet_id', 'stay_cost',
+        'pet', 'pet_id', 'name')
+}
+
+
+def compute_full(snapshot, query_type):
+    """Recalcula o agregado do zero com merge + groupby (referência de consistência)"""
+    spec = AGGREGATE_SPECS[query_type]
+    fact = snapshot[spec.fact][[spec.key, spec.value]]
+    dimension = snapshot[spec.dimension][[spec.dimension_key, spec.label]]
+
+    with QUERY_STAGE_LATENCY.time('merge'):
+        merged = pd.merge(fact, dimension, left_on=spec.key, right_on=spec.dimension_key, how='left')
+    with QUERY_STAGE_LATENCY.time('agrupamento_ordenacao'):
+        return merged.groupby(spec.label, observed=True)[spec.value].sum().sort_values(ascending=False)
+
+
+def _float_sums(codes, values, size):
+    """Somas de ponto flutuante por código, com a mesma soma compensada do groupby.
+
+    Os códigos já são inteiros densos, então o agrupamento usa um Categorical
+    montado a partir deles, sem fatorar nem comparar chaves. A soma é feita na
+    ordem das linhas, como no pandas, e o resultado fica idêntico ao merge +
+    groupby até o último bit.
+    """
+    groups = pd.Categorical.from_codes(codes, categories=pd.RangeIndex(size))
+    return pd.Series(values, copy=False).groupby(groups, observed=False).sum().to_numpy()
+
+
+def segment_totals(keys, values):
+    """Soma e contagem por chave inteira, sem join nem hash de textos.
+
+    Devolve (chaves, somas, contagens) ordenados pela chave. Contagens e somas
+    de inteiros usam np.bincount. Como no groupby do pandas, chaves ausentes
+    são descartadas e valores ausentes contam como linha, mas não entram na
+    soma. Chaves esparsas ou negativas são antes compactadas com np.unique.
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values)
+
+    if keys.dtype.kind == 'f':
+        present = ~np.isnan(keys)
+        keys, values = keys[present].astype(np.int64), values[present]
+
+    if not len(keys):
+        return keys.astype(np.int64), values[:0], np.zeros(0, dtype=np.int64)
+
+    low, high = keys.min(), keys.max()
+    if low >= 0 and high < 4 * len(keys) + 1024:
+        # Chaves densas: o próprio valor é a posição no vetor de totais
+        unique, codes, size = None, keys, int(high) + 1
+    else:
+        unique, codes = np.unique(keys, return_inverse=True)
+        size = len(unique)
+
+    counts = np.bincount(codes, minlength=size)
+    if values.dtype.kind in 'iub':
+        sums = np.bincount(codes, weights=values, minlength=size).round().astype(np.int64)
+    else:
+        sums = _float_sums(codes, values, size)
+
+    if unique is None:
+        unique = np.flatnonzero(counts)
+        counts, sums = counts[unique], sums[unique]
+    return unique, sums, counts
+
+
+def _as_dicts(keys, sums, counts):
+    keys = keys.tolist()
+    return dict(zip(keys, sums.tolist())), dict(zip(keys, counts.tolist()))
+
+
+def _group_totals(rows, spec):
+    """Soma e contagem de linhas por chave estrangeira"""
+    return _as_dicts(*segment_totals(rows[spec.key].to_numpy(), rows[spec.value].to_numpy()))
+
+
+def _partition_totals(arrays, lo, hi):
+    """Soma e contagem por chave das linhas [lo, hi) (executado no pool de processos)"""
+    keys, values = arrays
+    unique, sums, counts = segment_totals(keys[lo:hi], values[lo:hi])
+    # Cópias: o resultado não pode apontar para a memória compartilhada
+    return np.array(unique), np.array(sums), np.array(counts)
+
+
+def combine_totals(partials):
+    """Combina os totais por chave das partições, na ordem das linhas.
+
+    Contagens e somas de inteiros são exatas. Somas de ponto flutuante
+    combinam os parciais com a mesma soma compensada e podem diferir da soma
+    linha a linha nos últimos bits; como as partições têm tamanho fixo, o
+    resultado não depende do número de processos.
+    """
+    if len(partials) == 1:
+        return partials[0]
+    keys = np.concatenate([partial[0] for partial in partials])
+    unique, sums, _ = segment_totals(keys, np.concatenate([partial[1] for partial in partials]))
+    counts = segment_totals(keys, np.concatenate([partial[2] for partial in partials]))[1]
+    return unique, sums, counts
+
+
+def query_totals(tables, specs, executor=EXECUTOR):
+    """Soma e contagem por chave de vários agregados: {tipo_query: (chaves, somas, contagens)}.
+
+    As tabelas fato são divididas em partições de linhas e todos os agregados
+    são enviados juntos ao executor paralelo, que recorre à execução serial
+    para entradas pequenas ou quando configurado com um único processo.
+    """
+    tasks = [(_partition_totals, (tables[spec.fact][spec.key].to_numpy(), tables[spec.fact][spec.value].to_numpy()), ())
+             for spec in specs.values()]
+    partials = executor.run(tasks)
+    return {query_type: combine_totals(parts) for query_type, parts in zip(specs, partials)}
+
+
+def diff_rows(old, new, spec):
+    """Compara duas versões da tabela fato pela chave primária.
+
+    Devolve (removidas, adicionadas): linhas alteradas aparecem nas duas listas,
+    com o valor antigo em ``removidas`` e o novo em ``adicionadas``.
+    """
+    columns = [spec.pk, spec.key, spec.value]
+
+    # Caminho rápido para o caso comum de linhas apenas acrescentadas ao final
+    if len(new) >= len(old) and all(
+            np.array_equal(old[column].to_numpy(), new[column].to_numpy()[:len(old)], equal_nan=True)
+            for column in columns):
+        return old.iloc[:0][[spec.key, spec.value]], new.iloc[len(old):][[spec.key, spec.value]]
+
+    with QUERY_STAGE_LATENCY.time('merge'):
+        merged = pd.merge(old[columns], new[columns], on=spec.pk, how='outer',
+                          suffixes=('_old', '_new'), indicator=True)
+
+    key_old, key_new = f'{spec.key}_old', f'{spec.key}_new'
+    value_old, value_new = f'{spec.value}_old', f'{spec.value}_new'
+    both = merged['_merge'] == 'both'
+    changed = both & ~(
+        (merged[key_old] == merged[key_new]) & (merged[value_old] == merged[value_new])
+    )
+
+    removed = merged[(merged['_merge'] == 'left_only') | changed]
+    added = merged[(merged['_merge'] == 'right_only') | changed]
+    removed = removed[[key_old, value_old]].rename(columns={key_old: spec.key, value_old: spec.value})
+    added = added[[key_new, value_new]].rename(columns={key_new: spec.key, value_new: spec.value})
+    return removed, added
+
+
+def label_totals(snapshot, spec, totals):
+    """Agrupa os totais por chave (Series indexada pela chave) pelo rótulo da dimensão.
+
+    Devolve a Series por rótulo ordenada do maior para o menor, no mesmo
+    formato do merge + groupby.
+    """
+    with QUERY_STAGE_LATENCY.time('agrupamento_ordenacao'):
+        dimension = snapshot[spec.dimension]
+        labels = pd.Series(dimension[spec.label].array, index=dimension[spec.dimension_key].to_numpy())
+        labels = labels[~labels.index.duplicated()]
+        group_labels = labels.reindex(totals.index)
+
+        result = totals.groupby(group_labels.array, observed=True).sum().sort_values(ascending=False)
+    result.index.name = spec.label
+    result.name = spec.value
+    return result
+
+
+class _AggregateState:
+    """Totais por grupo de uma versão do conjunto de dados (nunca alterado após publicado)"""
+
+    def __init__(self, snapshot, sums, counts):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.sums = sums
+        self.counts = counts
+        self.results = {}
+
+
+class MaterializedAggregates:
+    """Agregados materializados das três queries de negócio.
+
+    Mantém a soma e a contagem por chave estrangeira (forma de pagamento,
+    produto, pet). Quando a versão do conjunto de dados muda, apenas as linhas
+    adicionadas, removidas ou alteradas nas tabelas fato são aplicadas como
+    deltas sobre uma cópia dos totais, que então substitui o estado publicado.
+    Uma consulta custa proporcionalmente ao número de grupos. A construção
+    inicial dos totais passa pelo executor paralelo.
+    """
+
+    def __init__(self, dataset=DATASET, executor=EXECUTOR):
+        self.dataset = dataset
+        self.executor = executor
+        self._state = None
+        self._lock = threading.Lock()
+
+    def _build(self, snapshot):
+        """Calcula todos os totais a partir do snapshot inteiro"""
+        sums, counts = {}, {}
+        for query_type, totals in query_totals(snapshot, AGGREGATE_SPECS, self.executor).items():
+            sums[query_type], counts[query_type] = _as_dicts(*totals)
+        return _AggregateState(snapshot, sums, counts)
+
+    def _apply(self, state, snapshot):
+        """Aplica a diferença entre o snapshot do estado e o novo snapshot"""
+        sums, counts = {}, {}
+        for query_type, spec in AGGREGATE_SPECS.items():
+            removed, added = diff_rows(state.snapshot[spec.fact], snapshot[spec.fact], spec)
+            sums[query_type] = dict(state.sums[query_type])
+            counts[query_type] = dict(state.counts[query_type])
+            self._apply_delta(sums[query_type], counts[query_type], removed, spec, sign=-1)
+            self._apply_delta(sums[query_type], counts[query_type], added, spec, sign=1)
+        return _AggregateState(snapshot, sums, counts)
+
+    @staticmethod
+    def _apply_delta(sums, counts, rows, spec, sign):
+        """Soma (ou subtrai) as linhas nos totais por chave"""
+        if rows.empty:
+            return
+        delta_sums, delta_counts = _group_totals(rows, spec)
+        for key, value in delta_sums.items():
+            counts[key] = counts.get(key, 0) + sign * delta_counts[key]
+            if counts[key] <= 0:
+                # Grupo sem linhas deixa de existir, como no groupby
+                del counts[key]
+                sums.pop(key, None)
+            else:
+                sums[key] = sums.get(key, 0) + sign * value
+
+    def sync(self):
+        """Atualiza os totais para a versão atual do conjunto de dados"""
+        snapshot = self.dataset.get()
+        state = self._state
+        if state is not None and state.version == snapshot.version:
+            return state
+
+        with self._lock, QUERY_STAGE_LATENCY.time('atualizacao_agregados'):
+            state = self._state
+            if state is None:
+                state = self._build(snapshot)
+            elif state.version != snapshot.version:
+                state = self._apply(state, snapshot)
+            self._state = state
+        return state
+
+    def current(self):
+        """Estado publicado, se já corresponde à versão atual dos dados; senão None.
+
+        Não carrega a planilha nem recalcula nada: serve para distinguir a
+        consulta barata do trabalho pesado de carga, recarga e deltas.
+        """
+        if not self.dataset.loaded():
+            return None
+        snapshot = self.dataset.get()
+        state = self._state
+        return state if state is not None and state.version == snapshot.version else None
+
+    def result(self, query_type, state=None):
+        """Totais por rótulo ordenados do maior para o menor.
+
+        ``state`` permite responder várias consultas sobre a mesma versão dos
+        dados (por exemplo, em lote); por padrão usa a versão atual.
+        """
+        spec = AGGREGATE_SPECS[query_type]
+        state = state or self.sync()
+        result = state.results.get(query_type)
+        if result is not None:
+            return result
+
+        # Somas em int64/float64, como no groupby, mesmo com colunas de tipo estreito
+        value_kind = state.snapshot[spec.fact][spec.value].dtype.kind
+        totals = pd.Series(state.sums[query_type], dtype=np.int64 if value_kind in 'iub' else np.float64)
+        result = label_totals(state.snapshot, spec, totals)
+        state.results[query_type] = result
+        return result
+
+    def verify(self):
+        """Compara os totais materializados com o recálculo completo.
+
+        Devolve um dicionário {tipo_query: diferenças}; vazio quando tudo confere.
+        """
+        state = self.sync()
+        mismatches = {}
+        for query_type in AGGREGATE_SPECS:
+            expected = compute_full(state.snapshot, query_type)
+            actual = self.result(query_type)
+            aligned = actual.reindex(expected.index)
+            if len(actual) != len(expected) or not np.allclose(aligned.to_numpy(dtype=float),
+                                                               expected.to_numpy(dtype=float)):
+                mismatches[query_type] = {
+                    "esperado": expected.to_dict(),
+                    "materializado": actual.to_dict()
+                }
+        return mismatches
+
+
+# Instância compartilhada pelo processo
+AGGREGATES = MaterializedAggregates()
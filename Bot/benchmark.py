@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aggregates import AGGREGATE_SPECS, MaterializedAggregates, compute_full
+from catalog import load_catalog
+from matcher import QuestionMatcher
+from serializers import COLUMNAR, JSON
+from synthetic import SyntheticDataset, generate
+
+# Linha de base usada para detectar regressões
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+DEFAULT_SCALES = (0.01, 0.1)
+
+# Aumento relativo da mediana aceito antes de apontar uma regressão, e diferença
+# absoluta mínima (em segundos) para ignorar ruído em medições muito curtas
+DEFAULT_TOLERANCE = 0.25
+MIN_DIFFERENCE = 0.0005
+
+# Perguntas fora do catálogo usadas para medir o caminho de falha do matcher
+_MISSES = (
+    "Qual a previsão do tempo para amanhã?",
+    "Quantos funcionários foram contratados em março?",
+    "Listar endereços cadastrados em São Paulo"
+)
+
+
+def measure(function, repeat=5):
+    """Executa a função ``repeat`` vezes e devolve mediana e mínimo em segundos"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return {
+        "mediana_s": statistics.median(durations),
+        "minimo_s": min(durations),
+        "repeticoes": repeat
+    }
+
+
+def _matcher_entries(catalog, size):
+    """Entradas do catálogo real acrescidas de perguntas geradas até ``size``"""
+    entries = [(question, intent['tipo_query'])
+               for intent in catalog.intents
+               for question in (intent['pergunta'], *intent['variacoes'])]
+    for position in range(len(entries), size):
+        entries.append((f"Qual o total de vendas do produto {position} na loja {position % 97}?",
+                        f"sintetico_{position}"))
+    return entries
+
+
+def benchmark_scale(scale, seed=0, repeat=5):
+    """Mede geração, queries e matcher em uma escala; devolve {nome: medição}"""
+    results = {}
+
+    start = time.perf_counter()
+    frames = generate(scale, seed)
+    results["geracao"] = {"mediana_s": time.perf_counter() - start, "minimo_s": None, "repeticoes": 1}
+    dataset = SyntheticDataset(scale, seed, frames=frames)
+    snapshot = dataset.get()
+
+    for query_type, spec in AGGREGATE_SPECS.items():
+        # Caminho original (simulador_sql): merge + groupby + ordenação a cada chamada
+        results[f"merge_groupby/{query_type}"] = measure(lambda: compute_full(snapshot, query_type), repeat)
+        results[f"merge_groupby/{query_type}"]["linhas"] = len(snapshot[spec.fact])
+
+    aggregates = MaterializedAggregates(dataset)
+    results["agregados/construcao"] = measure(lambda: MaterializedAggregates(dataset).sync(), repeat)
+    state = aggregates.sync()
+
+    for query_type in AGGREGATE_SPECS:
+        def materialized_query():
+            state.results.pop(query_type, None)
+            aggregates.result(query_type, state).to_dict()
+
+        # Consulta do execute_query_simulation: rótulos, ordenação e serialização
+        results[f"agregado/{query_type}"] = measure(materialized_query, repeat)
+
+    # Corpo do /execute-query em cada formato: tempo de serialização e tamanho
+    for serializer in (JSON, COLUMNAR):
+        for query_type in AGGREGATE_SPECS:
+            result = aggregates.result(query_type, state)
+            envelope = {"tipo_query": query_type, "status": "sucesso"}
+            name = f"serializacao_{serializer.name}/{query_type}"
+            results[name] = measure(lambda: serializer.query(envelope, result), repeat)
+            results[name]["bytes"] = len(serializer.query(envelope, result))
+
+    catalog = load_catalog()
+    questions = [question for intent in catalog.intents
+                 for question in (intent['pergunta'], *intent['variacoes'])] + list(_MISSES)
+    size = max(len(questions), int(1000 * scale))
+    matcher = QuestionMatcher(_matcher_entries(catalog, size))
+    results["matcher/pergunta"] = measure(lambda: [matcher.match(q) for q in questions], repeat)
+    results["matcher/pergunta"]["entradas"] = size
+    results["matcher/pergunta"]["perguntas_por_execucao"] = len(questions)
+
+    return results
+
+
+def run(scales=DEFAULT_SCALES, seed=0, repeat=5):
+    """Executa o benchmark em todas as escalas"""
+    results = {}
+    for scale in scales:
+        for name, timing in benchmark_scale(scale, seed, repeat).items():
+            results[f"{name}@{scale:g}"] = timing
+
+    return {
+        "ambiente": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "processadores": os.cpu_count()
+        },
+        "escalas": list(scales),
+        "semente": seed,
+        "resultados": results
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE, min_difference=MIN_DIFFERENCE):
+    """Lista as medições mais lentas que a linha de base além da tolerância"""
+    regressions = []
+    reference = baseline.get("resultados", {})
+    for name, timing in report["resultados"].items():
+        if name not in reference:
+            continue
+        before, after = reference[name]["mediana_s"], timing["mediana_s"]
+        if after > before * (1 + tolerance) and after - before > min_difference:
+            regressions.append({
+                "medicao": name,
+                "linha_de_base_s": before,
+                "atual_s": after,
+                "variacao": round(after / before - 1, 4) if before else None
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das queries e do matcher com dados sintéticos")
+    parser.add_argument('--escalas', type=float, nargs='+', default=list(DEFAULT_SCALES),
+                        help="Fatores de escala (1 = 1 milhão de compras e de estadias)")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Linha de base para comparação")
+    parser.add_argument('--tolerancia', type=float, default=DEFAULT_TOLERANCE,
+                        help="Aumento relativo aceito na mediana (0.25 = 25%%)")
+    parser.add_argument('--atualizar-baseline', action='store_true',
+                        help="Grava os resultados como nova linha de base")
+    args = parser.parse_args()
+
+    report = run(args.escalas, args.semente, args.repeticoes)
+    for name, timing in report["resultados"].items():
+        print(f"{name:50s} {timing['mediana_s'] * 1000:10.2f} ms")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.atualizar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Linha de base gravada em {args.baseline}")
+        return 0
+
+    # Sem linha de base não há como apontar regressões: a verificação falha em vez de passar em silêncio
+    if not os.path.exists(args.baseline):
+        print(f"Linha de base {args.baseline} não encontrada; grave uma com --atualizar-baseline")
+        return 2
+
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare(report, json.load(f), args.tolerancia)
+
+    for regression in regressions:
+        print(f"REGRESSÃO {regression['medicao']}: {regression['linha_de_base_s'] * 1000:.2f} ms -> "
+              f"{regression['atual_s'] * 1000:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from matcher import QuestionMatcher
+
+# Arquivo declarativo com as intenções do chatbot
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalogo.json')
+
+REQUIRED_FIELDS = ('tipo_query', 'pergunta', 'query', 'pergunta_da_query')
+
+
+class CompiledCatalog:
+    """Catálogo de intenções compilado e imutável.
+
+    Guarda as intenções, as listas usadas por /perguntas e o índice de busca já
+    construído. Uma instância nunca é alterada depois de criada: uma edição do
+    arquivo gera um novo CompiledCatalog.
+    """
+
+    def __init__(self, intents, mtime=None):
+        self.intents = tuple(MappingProxyType(dict(intent)) for intent in intents)
+        self.by_tipo_query = MappingProxyType({intent['tipo_query']: intent for intent in self.intents})
+        self.questions = tuple(intent['pergunta'] for intent in self.intents)
+        self.tipos_query = tuple(self.by_tipo_query)
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+        # Todas as formas de cada pergunta apontam para a mesma intenção
+        self.matcher = QuestionMatcher(
+            (question, intent)
+            for intent in self.intents
+            for question in (intent['pergunta'], *intent.get('variacoes', ()))
+        )
+
+    def match(self, user_question):
+        """Devolve a intenção correspondente à pergunta, ou None"""
+        intent, _ = self.matcher.match(user_question)
+        return intent
+
+
+def load_catalog(path=CATALOG_FILE):
+    """Lê e valida o arquivo do catálogo, devolvendo um CompiledCatalog"""
+    mtime = os.path.getmtime(path)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    intents = data.get('intencoes')
+    if not isinstance(intents, list) or not intents:
+        raise ValueError("O catálogo precisa de uma lista 'intencoes' não vazia")
+
+    seen = set()
+    for position, intent in enumerate(intents):
+        missing = [field for field in REQUIRED_FIELDS if not intent.get(field)]
+        if missing:
+            raise ValueError(f"Intenção {position} sem os campos: {', '.join(missing)}")
+        if intent['tipo_query'] in seen:
+            raise ValueError(f"tipo_query repetido no catálogo: {intent['tipo_query']}")
+        seen.add(intent['tipo_query'])
+        intent['variacoes'] = tuple(intent.get('variacoes', ()))
+
+    return CompiledCatalog(intents, mtime)
+
+
+class CatalogHolder:
+    """Mantém o catálogo compilado atual e o recarrega quando o arquivo muda.
+
+    A leitura do catálogo é uma única leitura de atributo, sem lock. Quando o
+    mtime do arquivo muda, o novo catálogo é compilado em uma thread de fundo e
+    substitui o atual em uma única atribuição; se o arquivo editado for
+    inválido, o catálogo anterior continua em uso e a versão inválida não é
+    recompilada de novo até o arquivo mudar outra vez.
+    """
+
+    def __init__(self, path=CATALOG_FILE, check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._catalog = load_catalog(path)
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._last_check = 0.0
+        self._last_error = None
+        self._failed_mtime = None
+
+    def current(self):
+        """Devolve o catálogo compilado atual"""
+        catalog = self._catalog
+        self._check_for_changes(catalog)
+        return catalog
+
+    def _check_for_changes(self, catalog):
+        """Dispara a recompilação em segundo plano se o arquivo foi modificado"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+
+        # Versão já em uso ou que já falhou: só um novo mtime dispara outra tentativa
+        if mtime == catalog.mtime or mtime == self._failed_mtime:
+            return
+
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_thread = threading.Thread(target=self.reload, daemon=True)
+            self._reload_thread.start()
+
+    def reload(self):
+        """Compila o arquivo atual e troca o catálogo em uso"""
+        mtime = None
+        try:
+            mtime = os.path.getmtime(self.path)
+            catalog = load_catalog(self.path)
+        except Exception as e:
+            # Arquivo inválido ou em escrita: mantém o catálogo anterior e
+            # registra o mtime para não repetir a mesma falha a cada verificação
+            self._last_error = str(e)
+            self._failed_mtime = mtime
+            return False
+
+        self._last_error = None
+        self._failed_mtime = None
+        self._catalog = catalog
+        return True
+
+    def wait_reload(self, timeout=None):
+        """Aguarda o término de uma recompilação em andamento (útil em testes)"""
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def last_error(self):
+        return self._last_error
+
+
+# Instância compartilhada pelo processo
+CATALOG = CatalogHolder()
@@ -1,24 +1,14 @@
+import os
+import sys
 
-def chatbot_response(user_question):
-    responses = {
-        "qual o total de vendas de produtos por tipo de pagamento?": {
-            "query": "SELECT pmt.nome AS tipo_pagamento, SUM(p.total_value) AS total_vendas FROM purchase AS p JOIN payment_method_type AS pmt ON p.payment_method = pmt.payment_method_type_id GROUP BY pmt.nome ORDER BY total_vendas DESC;",
-            "pergunta_da_query": "Qual o total de vendas de produtos agrupado por tipo de pagamento?"
-        },
-        "quais os produtos mais vendidos em termos de quantidade?": {
-            "query": "SELECT prod.name AS nome_produto, SUM(p.quantity) AS quantidade_vendida FROM purchase AS p JOIN product AS prod ON p.product_id = prod.product_id GROUP BY prod.name ORDER BY quantidade_vendida DESC;",
-            "pergunta_da_query": "Quais produtos tiveram a maior quantidade vendida?"
-        },
-        "qual o custo total das estadias por pet?": {
-            "query": "SELECT pet.name AS nome_pet, SUM(s.stay_cost) AS custo_total_estadia FROM stay AS s JOIN pet ON s.pet_id = pet.pet_id GROUP BY pet.name ORDER BY custo_total_estadia DESC;",
-            "pergunta_da_query": "Qual o custo acumulado das estadias para cada pet?"
-        }
-    }
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-    normalized_question = user_question.lower().strip()
+from catalog import CATALOG
+from metrics import INTENT_MATCHES
 
-    if normalized_question in responses:
-        response_data = responses[normalized_question]
+def build_response(user_question, response_data):
+    """Monta a resposta do chatbot para a intenção encontrada (ou None)"""
+    if response_data is not None:
         return {
             "pergunta_do_usuario": user_question,
             "query": response_data["query"],
@@ -34,12 +24,25 @@ def chatbot_response(user_question):
             "mensagem": "Não foi possível encontrar uma resposta para esta pergunta."
         }
 
+def match_intent(user_question, catalog=None):
+    """Intenção da pergunta (ou None), contada em hotel_chatbot_intents_total.
+
+    Todas as rotas que buscam intenções passam por aqui; um lote passa o mesmo
+    ``catalog`` para responder todas as perguntas com a mesma versão.
+    """
+    # Busca tolerante a acentos, pontuação e pequenas variações de escrita
+    response_data = (catalog or CATALOG.current()).match(user_question)
+    INTENT_MATCHES.inc('acerto' if response_data is not None else 'falha')
+    return response_data
+
+def chatbot_response(user_question):
+    return build_response(user_question, match_intent(user_question))
+
 if __name__ == "__main__":
     print("Bem-vindo ao Chatbot de IA para o Hotel de Pets!")
     print("Perguntas que você pode fazer:")
-    print("- Qual o total de vendas de produtos por tipo de pagamento?")
-    print("- Quais os produtos mais vendidos em termos de quantidade?")
-    print("- Qual o custo total das estadias por pet?")
+    for question in CATALOG.current().questions:
+        print(f"- {question}")
     print("Digite 'sair' para encerrar.")
 
     while True:
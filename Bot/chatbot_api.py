@@ -1,95 +1,105 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context, url_for
 from flask_cors import CORS
-import pandas as pd
+import json
 import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admission import ADMISSION, INFLIGHT, Overloaded
+from catalog import CATALOG
+from chatbot import build_response, chatbot_response, match_intent
+from datastack import DATA, STARTUP_MODE
+from jobs import DONE, JOBS, JobQueueFull
+from metrics import CONTENT_TYPE, QUERY_STAGE_LATENCY, REGISTRY, REQUEST_LATENCY
+from pagination import NDJSON_MIMETYPE, PaginationError, iter_ndjson, page_info, read_page
+from result_cache import RESULT_CACHE, make_etag
+from serializers import JSON, NotAcceptable, negotiate
 
 app = Flask(__name__)
 CORS(app)  # Permite requisições de qualquer origem
 
-# Função do chatbot (importada do arquivo original)
-def chatbot_response(user_question):
-    responses = {
-        "qual o total de vendas de produtos por tipo de pagamento?": {
-            "query": "SELECT pmt.nome AS tipo_pagamento, SUM(p.total_value) AS total_vendas FROM purchase AS p JOIN payment_method_type AS pmt ON p.payment_method = pmt.payment_method_type_id GROUP BY pmt.nome ORDER BY total_vendas DESC;",
-            "pergunta_da_query": "Qual o total de vendas de produtos agrupado por tipo de pagamento?"
-        },
-        "quais os produtos mais vendidos em termos de quantidade?": {
-            "query": "SELECT prod.name AS nome_produto, SUM(p.quantity) AS quantidade_vendida FROM purchase AS p JOIN product AS prod ON p.product_id = prod.product_id GROUP BY prod.name ORDER BY quantidade_vendida DESC;",
-            "pergunta_da_query": "Quais produtos tiveram a maior quantidade vendida?"
-        },
-        "qual o custo total das estadias por pet?": {
-            "query": "SELECT pet.name AS nome_pet, SUM(s.stay_cost) AS custo_total_estadia FROM stay AS s JOIN pet ON s.pet_id = pet.pet_id GROUP BY pet.name ORDER BY custo_total_estadia DESC;",
-            "pergunta_da_query": "Qual o custo acumulado das estadias para cada pet?"
-        }
-    }
+# Número máximo de itens aceitos pelos endpoints em lote
+MAX_BATCH_ITEMS = 5000
 
-    normalized_question = user_question.lower().strip()
+# Espera máxima (segundos) de uma requisição pelo término de um job
+MAX_JOB_WAIT = 25
 
-    if normalized_question in responses:
-        response_data = responses[normalized_question]
-        return {
-            "pergunta_do_usuario": user_question,
-            "query": response_data["query"],
-            "pergunta_da_query": response_data["pergunta_da_query"],
-            "status": "sucesso"
-        }
-    else:
-        return {
-            "pergunta_do_usuario": user_question,
-            "query": None,
-            "pergunta_da_query": None,
-            "status": "falha",
-            "mensagem": "Não foi possível encontrar uma resposta para esta pergunta."
-        }
+# Sugestão de espera (segundos) enviada quando a fila de jobs está cheia
+JOB_RETRY_AFTER = 5
+
+# Valores do cache de resultados expostos junto com as métricas
+REGISTRY.gauge_callback('hotel_result_cache_hits', 'Acertos do cache de resultados',
+                        lambda: RESULT_CACHE.hits)
+REGISTRY.gauge_callback('hotel_result_cache_misses', 'Falhas do cache de resultados',
+                        lambda: RESULT_CACHE.misses)
+REGISTRY.gauge_callback('hotel_result_cache_bytes', 'Bytes ocupados pelo cache de resultados',
+                        lambda: RESULT_CACHE.stats()["bytes"])
+REGISTRY.gauge_callback('hotel_jobs_pending', 'Jobs aguardando ou em execução',
+                        lambda: JOBS.stats()["pendentes"])
+REGISTRY.gauge_callback('hotel_heavy_queries_running', 'Queries pesadas em execução',
+                        lambda: ADMISSION.stats()["em_execucao"])
+REGISTRY.gauge_callback('hotel_heavy_queries_queued', 'Queries pesadas aguardando vaga',
+                        lambda: ADMISSION.stats()["na_fila"])
+REGISTRY.gauge_callback('hotel_data_stack_loaded', 'Indica (1) se pandas e os módulos de dados já foram importados',
+                        lambda: int(DATA.loaded()))
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    """Registra a latência da requisição no histograma da rota"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+        REQUEST_LATENCY.observe(time.perf_counter() - start, route, request.method, response.status_code)
+    return response
+
+def known_query_type(query_type):
+    """Indica se ``query_type`` é um tipo de query com agregado (valores que não são texto não são)"""
+    return isinstance(query_type, str) and query_type in DATA.AGGREGATE_SPECS
 
-# Função para executar queries simuladas usando pandas
-def execute_query_simulation(query_type):
+# Função para executar queries simuladas usando os agregados materializados
+def execute_query_simulation(query_type, state=None):
     try:
-        # Caminho para o arquivo Excel
-        excel_file = 'flask/Conjuntodedados.xlsx'
-        
-        if not os.path.exists(excel_file):
+        if not DATA.DATASET.available():
             return {"erro": "Arquivo de dados não encontrado"}
         
-        xls = pd.ExcelFile(excel_file)
-        
-        # Carregar os DataFrames necessários
-        pet_df = pd.read_excel(xls, 'pet')
-        stay_df = pd.read_excel(xls, 'stay')
-        product_df = pd.read_excel(xls, 'product')
-        purchase_df = pd.read_excel(xls, 'purchase')
-        payment_method_type_df = pd.read_excel(xls, 'payment_method_type')
-        
-        if query_type == "vendas_por_pagamento":
-            merged_purchase_payment = pd.merge(purchase_df, payment_method_type_df, 
-                                             left_on='payment_method', 
-                                             right_on='payment_method_type_id', 
-                                             how='left')
-            result = merged_purchase_payment.groupby('nome')['total_value'].sum().sort_values(ascending=False)
-            return result.to_dict()
-            
-        elif query_type == "produtos_mais_vendidos":
-            merged_purchase_product = pd.merge(purchase_df, product_df, 
-                                             left_on='product_id', 
-                                             right_on='product_id', 
-                                             how='left')
-            result = merged_purchase_product.groupby('name')['quantity'].sum().sort_values(ascending=False)
-            return result.to_dict()
-            
-        elif query_type == "estadias_por_pet":
-            merged_stay_pet = pd.merge(stay_df, pet_df, 
-                                     left_on='pet_id', 
-                                     right_on='pet_id', 
-                                     how='left')
-            result = merged_stay_pet.groupby('name')['stay_cost'].sum().sort_values(ascending=False)
-            return result.to_dict()
-            
-        else:
+        if not known_query_type(query_type):
             return {"erro": "Tipo de query não reconhecido"}
+        
+        # Totais mantidos por grupo; custo proporcional ao número de grupos
+        result = DATA.AGGREGATES.result(query_type, state or current_state())
+        with QUERY_STAGE_LATENCY.time('serializacao'):
+            return result.to_dict()
             
+    except Overloaded:
+        raise
+        
     except Exception as e:
         return {"erro": f"Erro ao executar query: {str(e)}"}
 
+def execute_intent(intent):
+    """Executa a query de uma intenção do catálogo sobre os dados carregados"""
+    if intent["tipo_query"] in DATA.AGGREGATE_SPECS:
+        return execute_query_simulation(intent["tipo_query"])
+    
+    # Intenções sem agregado materializado são respondidas pelo motor SQL
+    colunas, linhas = execute_sql_query(intent["query"])
+    return {"colunas": colunas, "linhas": [list(linha) for linha in linhas]}
+
+def parse_flag(value, default=True):
+    """Interpreta um parâmetro booleano vindo do JSON ou da query string"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in ('false', '0', 'no', 'nao', 'não')
+    return bool(value)
+
 # Rotas da API
 
 @app.route('/', methods=['GET'])
@@ -100,8 +110,18 @@ def home():
         "versao": "1.0",
         "endpoints": {
             "/chat": "POST - Enviar pergunta para o chatbot",
-            "/execute-query": "POST - Executar query simulada",
+            "/execute-query": "POST - Executar query simulada (com filtros opcionais de data, vendedor, tipo de pet e marca)",
+            "/execute-sql": "POST - Executar a query SQL correspondente à pergunta",
+            "/ask": "POST - Responder a pergunta com a query e os dados em uma única chamada",
+            "/chat/batch": "POST - Enviar uma lista de perguntas para o chatbot",
+            "/execute-query/batch": "POST - Executar uma lista de queries sobre a mesma versão dos dados",
+            "/jobs": "POST - Executar query em segundo plano (devolve job_id); GET - Estatísticas da fila de jobs",
+            "/jobs/<job_id>": "GET - Estado e resultado do job (aguardar=segundos espera o término)",
             "/perguntas": "GET - Listar perguntas disponíveis",
+            "/dataset": "GET - Informações do conjunto de dados em cache",
+            "/dataset/memoria": "GET - Memória e tipos de cada tabela e violações do esquema",
+            "/cache": "GET - Estatísticas do cache de resultados",
+            "/metrics": "GET - Métricas no formato do Prometheus",
             "/health": "GET - Verificar status da API"
         }
     })
@@ -139,37 +159,492 @@ def execute_query():
             }), 400
         
         query_type = data['tipo_query']
-        result = execute_query_simulation(query_type)
+        stream = (data.get('formato') == 'ndjson'
+                  or request.accept_mimetypes.best == NDJSON_MIMETYPE)
+        paged = any(campo in data for campo in ('limit', 'offset', 'cursor'))
+        serializer = negotiate(request.accept_mimetypes)
+        filters = DATA.read_filters(data)
+        
+        if not stream and not paged and not filters and (not known_query_type(query_type) or not DATA.DATASET.available()):
+            # Tipo desconhecido ou sem dados: mantém a resposta original com o erro no resultado
+            result = execute_query_simulation(query_type)
+            
+            return jsonify({
+                "tipo_query": query_type,
+                "resultado": result,
+                "status": "sucesso"
+            })
+        
+        return execute_query_result(query_type, data, stream, filters, serializer)
+        
+    except NotAcceptable as e:
+        return jsonify({
+            "erro": str(e)
+        }), 406
+        
+    except (PaginationError, DATA.FilterError) as e:
+        return jsonify({
+            "erro": str(e)
+        }), 400
+        
+    except Overloaded as e:
+        return overloaded_response(e)
+        
+    except Exception as e:
+        return jsonify({
+            "erro": f"Erro ao executar query: {str(e)}"
+        }), 500
+
+def overloaded_response(error):
+    """Resposta 429/503 com Retry-After para uma query recusada pela admissão"""
+    response = jsonify({"erro": str(error)})
+    response.status_code = error.status
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def run_heavy(key, function):
+    """Executa um cálculo pesado uma única vez por chave e dentro do limite de admissão.
+    
+    Requisições idênticas simultâneas esperam pelo cálculo em andamento e
+    recebem o mesmo resultado, sem ocupar vagas da admissão.
+    """
+    def admitted():
+        with ADMISSION.slot():
+            return function()
+    return INFLIGHT.do(key, admitted)[0]
+
+def current_state():
+    """Estado dos agregados na versão atual dos dados.
+    
+    Com os agregados já atualizados, a verificação é barata e não ocupa vaga.
+    Carga da planilha, recarga e reconstrução ou deltas dos agregados são
+    trabalho pesado: passam pela execução única e pelo controle de admissão.
+    """
+    state = DATA.AGGREGATES.current()
+    if state is None:
+        state = run_heavy(('sincronizacao',), DATA.AGGREGATES.sync)
+    return state
+
+def execute_sql_query(sql):
+    """Executa no motor SQL dentro da execução única e do controle de admissão"""
+    return run_heavy(('sql', sql), lambda: DATA.SQL_ENGINE.execute(sql))
+
+def is_not_modified(etag, last_modified):
+    """Indica se a requisição condicional já tem a versão atual do resultado"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    
+    since = request.if_modified_since
+    return since is not None and last_modified.replace(microsecond=0) <= since
+
+def execute_query_result(query_type, data, stream, filters=None, serializer=JSON):
+    """Entrega o resultado completo, em páginas (limit/offset/cursor) ou como NDJSON.
+    
+    Fora do NDJSON, o corpo é escrito pelo ``serializer`` escolhido pelo
+    Accept (JSON original, JSON colunar ou Arrow). Os corpos são guardados no
+    cache por (tipo_query, página, filtros, formato, versão dos dados) e
+    carregam ETag/Last-Modified; requisições condicionais com a versão atual
+    recebem 304 sem recalcular nada.
+    
+    Com a planilha já carregada, os validadores vêm da versão do snapshot, sem
+    sync() dos agregados nem vaga na admissão. Antes da primeira carga (modo
+    lazy recém-iniciado) não há versão conhecida: a primeira requisição,
+    condicional ou não, paga a carga.
+    """
+    if not DATA.DATASET.available():
+        return jsonify({"erro": "Arquivo de dados não encontrado"}), 500
+    
+    if not known_query_type(query_type):
+        return jsonify({"erro": "Tipo de query não reconhecido"}), 400
+    
+    state = None if DATA.DATASET.loaded() else current_state()
+    snapshot = DATA.DATASET.get() if state is None else state.snapshot
+    page, etag, last_modified = query_validators(query_type, data, stream, filters, serializer, snapshot)
+    
+    if is_not_modified(etag, last_modified):
+        RESULT_CACHE.record_not_modified()
+        response = Response(status=304)
+    else:
+        if state is None:
+            state = current_state()
+        if state.version != snapshot.version:
+            # Os dados mudaram depois da validação: a resposta segue a versão calculada
+            page, etag, last_modified = query_validators(query_type, data, stream, filters, serializer, state.snapshot)
+        response = build_query_response(query_type, page, state, stream, filters, serializer)
+    
+    response.set_etag(etag)
+    response.vary.add('Accept')
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def query_validators(query_type, data, stream, filters, serializer, snapshot):
+    """Página pedida, ETag e Last-Modified da resposta na versão de ``snapshot``"""
+    page = read_page(data, query_type, snapshot.version)
+    etag = make_etag(query_type, [page, 'ndjson' if stream else serializer.name, DATA.filters_key(filters)], snapshot.version)
+    last_modified = datetime.fromtimestamp(snapshot.mtime, tz=timezone.utc)
+    return page, etag, last_modified
+
+def build_query_response(query_type, page, state, stream, filters, serializer):
+    """Resposta com o corpo do resultado: NDJSON ou o formato do ``serializer``, vindo do cache"""
+    if stream:
+        return stream_query_result(query_type, page, state, filters)
+    
+    cache_key = (query_type, page, serializer.name, state.version, json.dumps(DATA.filters_key(filters), sort_keys=True))
+    body = RESULT_CACHE.get(cache_key)
+    if body is None:
+        body = run_heavy(cache_key, lambda: render_query_body(cache_key, serializer, query_type, page, state, filters))
+    return Response(body, mimetype=serializer.mimetype)
+
+def render_query_body(cache_key, serializer, query_type, page, state, filters=None):
+    """Calcula e serializa o corpo do resultado e o guarda no cache"""
+    envelope, rows = query_result_body(query_type, page, state, filters)
+    with QUERY_STAGE_LATENCY.time('serializacao'):
+        body = serializer.query(envelope, rows)
+    RESULT_CACHE.put(cache_key, body)
+    return body
+
+def query_result(query_type, state, filters=None):
+    """Resultado da query: agregado materializado ou, com filtros, pelo índice de tempo"""
+    if filters:
+        return DATA.FILTERED_AGGREGATES.result(query_type, filters, state.snapshot)
+    return DATA.AGGREGATES.result(query_type, state)
+
+def query_result_body(query_type, page, state, filters=None):
+    """Envelope da resposta (com os metadados de paginação quando houver) e as linhas do resultado"""
+    result = query_result(query_type, state, filters)
+    envelope = {
+        "tipo_query": query_type,
+        "status": "sucesso"
+    }
+    
+    if filters:
+        envelope["filtros"] = DATA.filters_key(filters)
+    
+    rows = result
+    if page is not None:
+        offset, limit = page
+        rows = result.iloc[offset:offset + limit]
+        envelope["paginacao"] = page_info(query_type, offset, limit, len(result), state.version)
+    return envelope, rows
+
+def stream_query_result(query_type, page, state, filters=None):
+    """Resultado como NDJSON, uma linha por item gerada sob demanda"""
+    key = ('ndjson', query_type, state.version, json.dumps(DATA.filters_key(filters), sort_keys=True))
+    result = run_heavy(key, lambda: query_result(query_type, state, filters))
+    rows = result
+    if page is not None:
+        offset, limit = page
+        rows = result.iloc[offset:offset + limit]
+    
+    response = Response(stream_with_context(iter_ndjson(rows)), mimetype=NDJSON_MIMETYPE)
+    response.headers['X-Total-Count'] = str(len(result))
+    return response
+
+def read_wait(value):
+    """Segundos de espera pedidos (``aguardar``), limitados a MAX_JOB_WAIT"""
+    if value is None:
+        return 0.0
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("Campo 'aguardar' deve ser um número de segundos")
+    if seconds != seconds or seconds < 0:
+        raise ValueError("Campo 'aguardar' deve ser um número de segundos")
+    return min(seconds, MAX_JOB_WAIT)
+
+def run_query_job(query_type, filters):
+    """Executa a query de um job na versão atual dos dados, dentro do controle de admissão.
+    
+    Recusado pela admissão, o job termina com erro e pode ser reenviado.
+    """
+    state = current_state()
+    key = ('job', query_type, state.version, json.dumps(DATA.filters_key(filters), sort_keys=True))
+    result = run_heavy(key, lambda: query_result(query_type, state, filters))
+    return {
+        "resultado": result.to_dict(),
+        "versao_dados": state.version
+    }
+
+def job_response(job, wait=0.0, created=None):
+    """Estado do job; quando concluído, com o resultado (200), senão 202"""
+    if wait:
+        job.wait(wait)
+    
+    body = job.to_dict()
+    if job.finished():
+        status = 200
+        if job.status == DONE:
+            body.update(job.result)
+    else:
+        status = 202
+    if created is not None:
+        body["novo"] = created
+    
+    response = jsonify(body)
+    response.status_code = status
+    response.headers['Location'] = url_for('job_status', job_id=job.id)
+    return response
+
+def read_batch(data, field):
+    """Valida o corpo de um endpoint em lote e devolve (itens, resposta de erro)"""
+    if not data or not isinstance(data.get(field), list):
+        return None, (jsonify({
+            "erro": f"Campo '{field}' é obrigatório e deve ser uma lista"
+        }), 400)
+    
+    if len(data[field]) > MAX_BATCH_ITEMS:
+        return None, (jsonify({
+            "erro": f"O lote aceita no máximo {MAX_BATCH_ITEMS} itens"
+        }), 400)
+    
+    return data[field], None
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Endpoint que responde uma lista de perguntas com a mesma versão do catálogo"""
+    try:
+        perguntas, erro = read_batch(request.get_json(), 'perguntas')
+        if erro:
+            return erro
+        
+        catalog = CATALOG.current()
+        resultados = []
+        for pergunta in perguntas:
+            if not isinstance(pergunta, str):
+                resultados.append({"status": "erro", "erro": "A pergunta deve ser um texto"})
+                continue
+            resultados.append(build_response(pergunta, match_intent(pergunta, catalog)))
         
         return jsonify({
-            "tipo_query": query_type,
-            "resultado": result,
-            "status": "sucesso"
+            "resultados": resultados,
+            "total": len(resultados)
         })
         
+    except Exception as e:
+        return jsonify({
+            "erro": f"Erro interno do servidor: {str(e)}"
+        }), 500
+
+@app.route('/execute-query/batch', methods=['POST'])
+def execute_query_batch():
+    """Endpoint que executa uma lista de queries sobre um único snapshot dos dados"""
+    try:
+        tipos_query, erro = read_batch(request.get_json(), 'tipos_query')
+        if erro:
+            return erro
+        
+        serializer = negotiate(request.accept_mimetypes)
+        
+        if not DATA.DATASET.available():
+            return jsonify({"erro": "Arquivo de dados não encontrado"}), 500
+        
+        # Todos os itens usam a mesma versão dos agregados; cada tipo é calculado uma vez
+        state = current_state()
+        with ADMISSION.slot():
+            resultados = batch_results(tipos_query, state)
+            with QUERY_STAGE_LATENCY.time('serializacao'):
+                body = serializer.batch({
+                    "versao_dados": state.version,
+                    "total": len(resultados)
+                }, resultados)
+        
+        response = Response(body, mimetype=serializer.mimetype)
+        response.vary.add('Accept')
+        return response
+        
+    except NotAcceptable as e:
+        return jsonify({
+            "erro": str(e)
+        }), 406
+        
+    except Overloaded as e:
+        return overloaded_response(e)
+        
+    except Exception as e:
+        return jsonify({
+            "erro": f"Erro ao executar query: {str(e)}"
+        }), 500
+
+def batch_results(tipos_query, state):
+    """Itens do lote sobre a mesma versão dos agregados, com a Series de cada resultado"""
+    calculados = {}
+    resultados = []
+    for query_type in tipos_query:
+        if not known_query_type(query_type):
+            resultados.append({
+                "tipo_query": query_type,
+                "status": "erro",
+                "erro": "Tipo de query não reconhecido"
+            })
+            continue
+        
+        if query_type not in calculados:
+            try:
+                calculados[query_type] = DATA.AGGREGATES.result(query_type, state)
+            except Exception as e:
+                calculados[query_type] = f"Erro ao executar query: {str(e)}"
+        result = calculados[query_type]
+        
+        if isinstance(result, str):
+            resultados.append({"tipo_query": query_type, "status": "erro", "erro": result})
+        else:
+            resultados.append({"tipo_query": query_type, "resultado": result, "status": "sucesso"})
+    return resultados
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Endpoint que coloca uma query na fila de jobs e devolve o job_id imediatamente.
+    
+    Pedidos repetidos da mesma query (com os mesmos filtros) sobre a mesma
+    versão dos dados recebem o job já existente. Com ``aguardar`` (segundos),
+    a resposta espera o término por até esse tempo.
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'tipo_query' not in data:
+            return jsonify({
+                "erro": "Campo 'tipo_query' é obrigatório"
+            }), 400
+        
+        query_type = data['tipo_query']
+        if not known_query_type(query_type):
+            return jsonify({"erro": "Tipo de query não reconhecido"}), 400
+        
+        filters = DATA.read_filters(data)
+        if filters:
+            DATA.check_applicable(filters, DATA.AGGREGATE_SPECS[query_type].fact)
+        wait = read_wait(data.get('aguardar'))
+        
+        if not DATA.DATASET.available():
+            return jsonify({"erro": "Arquivo de dados não encontrado"}), 500
+        
+        # get() verifica se a planilha mudou: um job concluído sobre a versão
+        # anterior dos dados não é reaproveitado depois da recarga
+        key = (query_type, json.dumps(DATA.filters_key(filters), sort_keys=True), DATA.DATASET.get().version)
+        description = {"tipo_query": query_type}
+        if filters:
+            description["filtros"] = DATA.filters_key(filters)
+        job, created = JOBS.submit(key, lambda: run_query_job(query_type, filters), description)
+        
+        return job_response(job, wait, created=created)
+        
+    except JobQueueFull as e:
+        response = jsonify({"erro": str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(JOB_RETRY_AFTER)
+        return response
+        
+    except ValueError as e:
+        # Filtros (FilterError) ou espera inválidos
+        return jsonify({
+            "erro": str(e)
+        }), 400
+        
+    except Exception as e:
+        return jsonify({
+            "erro": f"Erro ao enviar job: {str(e)}"
+        }), 500
+
+@app.route('/jobs', methods=['GET'])
+def jobs_info():
+    """Endpoint com o estado da fila de jobs"""
+    return jsonify(JOBS.stats())
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Endpoint que consulta um job; ``aguardar`` (segundos) espera o término"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"erro": "Job não encontrado ou expirado"}), 404
+    
+    try:
+        wait = read_wait(request.args.get('aguardar'))
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    return job_response(job, wait)
+
+@app.route('/execute-sql', methods=['POST'])
+def execute_sql():
+    """Endpoint que executa no SQLite em memória a query SQL retornada pelo chatbot"""
+    try:
+        data = request.get_json()
+        
+        if not data or 'pergunta' not in data:
+            return jsonify({
+                "erro": "Campo 'pergunta' é obrigatório"
+            }), 400
+        
+        response = chatbot_response(data['pergunta'])
+        if response["status"] != "sucesso":
+            return jsonify(response)
+        
+        if not DATA.DATASET.available():
+            return jsonify({"erro": "Arquivo de dados não encontrado"}), 500
+        
+        colunas, linhas = execute_sql_query(response["query"])
+        response["colunas"] = colunas
+        response["linhas"] = [list(linha) for linha in linhas]
+        
+        return jsonify(response)
+        
+    except Overloaded as e:
+        return overloaded_response(e)
+        
     except Exception as e:
         return jsonify({
             "erro": f"Erro ao executar query: {str(e)}"
         }), 500
 
+@app.route('/ask', methods=['POST'])
+def ask():
+    """Endpoint que resolve a intenção no servidor e devolve query e resultado juntos"""
+    try:
+        data = request.get_json()
+        
+        if not data or 'pergunta' not in data:
+            return jsonify({
+                "erro": "Campo 'pergunta' é obrigatório"
+            }), 400
+        
+        user_question = data['pergunta']
+        include_data = parse_flag(data.get('include_data', request.args.get('include_data')))
+        
+        intent = match_intent(user_question)
+        response = build_response(user_question, intent)
+        if intent is None:
+            return jsonify(response)
+        
+        response["tipo_query"] = intent["tipo_query"]
+        if include_data:
+            try:
+                response["resultado"] = execute_intent(intent)
+            except Overloaded:
+                raise
+            except Exception as e:
+                # A intenção encontrada continua na resposta; só a execução falhou
+                response["resultado"] = {"erro": f"Erro ao executar query: {str(e)}"}
+        
+        return jsonify(response)
+        
+    except Overloaded as e:
+        return overloaded_response(e)
+        
+    except Exception as e:
+        return jsonify({
+            "erro": f"Erro interno do servidor: {str(e)}"
+        }), 500
+
 @app.route('/perguntas', methods=['GET'])
 def list_questions():
     """Endpoint para listar perguntas disponíveis"""
-    perguntas = [
-        "Qual o total de vendas de produtos por tipo de pagamento?",
-        "Quais os produtos mais vendidos em termos de quantidade?",
-        "Qual o custo total das estadias por pet?"
-    ]
-    
-    tipos_query = [
-        "vendas_por_pagamento",
-        "produtos_mais_vendidos", 
-        "estadias_por_pet"
-    ]
+    catalog = CATALOG.current()
     
     return jsonify({
-        "perguntas_disponiveis": perguntas,
-        "tipos_query_disponiveis": tipos_query
+        "perguntas_disponiveis": list(catalog.questions),
+        "tipos_query_disponiveis": list(catalog.tipos_query)
     })
 
 @app.route('/health', methods=['GET'])
@@ -177,10 +652,45 @@ def health_check():
     """Endpoint para verificar o status da API"""
     return jsonify({
         "status": "healthy",
-        "timestamp": pd.Timestamp.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "dados_carregados": DATA.loaded()
+    })
+
+@app.route('/dataset', methods=['GET'])
+def dataset_info():
+    """Endpoint com tempo de carga, versão e memória do conjunto de dados em cache"""
+    return jsonify(DATA.DATASET.stats())
+
+@app.route('/dataset/memoria', methods=['GET'])
+def dataset_memory():
+    """Endpoint com a memória ocupada por tabela e coluna, com os tipos do esquema"""
+    if not DATA.DATASET.available():
+        return jsonify({"erro": "Arquivo de dados não encontrado"}), 500
+    
+    snapshot = DATA.DATASET.get()
+    return jsonify({
+        "versao": snapshot.version,
+        "fonte": snapshot.source,
+        **snapshot.memory,
+        "violacoes_esquema": list(snapshot.violations)
     })
 
+@app.route('/cache', methods=['GET'])
+def cache_info():
+    """Endpoint com acertos, falhas e ocupação do cache de resultados"""
+    return jsonify(RESULT_CACHE.stats())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Endpoint com latências por rota, tempos por etapa e contadores no formato do Prometheus"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 if __name__ == '__main__':
+    if STARTUP_MODE == 'preload':
+        # Carrega a planilha e os agregados antes de aceitar requisições
+        DATA.preload()
+    elif STARTUP_MODE == 'background':
+        DATA.warm_up()
     # Configuração para desenvolvimento
     app.run(host='0.0.0.0', port=5000, debug=True)
 
@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import apply_all
+
+# Caminho padrão da planilha, resolvido a partir da raiz do projeto
+EXCEL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'flask', 'Conjuntodedados.xlsx')
+
+# Abas do conjunto de dados, na ordem em que aparecem na planilha
+SHEETS = (
+    'user', 'address', 'seller', 'pet_owner', 'pet',
+    'pet_type', 'stay', 'product', 'purchase', 'payment_method_type'
+)
+
+# Diretório padrão do armazenamento colunar, ao lado da planilha
+STORE_DIR = os.path.join(os.path.dirname(EXCEL_FILE), 'colstore')
+
+SCHEMA_FILE = 'schema.json'
+STRING = 'string'
+
+
+def file_hash(path):
+    """Calcula o hash SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_schema(series):
+    """Converte uma coluna do pandas em (array a ser salvo, esquema da coluna)"""
+    nullable = bool(series.isna().any())
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categóricas já têm dicionário: os códigos são gravados no tipo usado pelo pandas
+        return series.cat.codes.to_numpy(), {
+            "dtype": STRING,
+            "nullable": nullable,
+            "categorical": True,
+            "categories": [str(c) for c in series.cat.categories]
+        }
+
+    if series.dtype == object:
+        # Textos são gravados como códigos inteiros + dicionário de valores
+        text = series.where(series.isna(), series.astype(str))
+        codes, categories = pd.factorize(text, sort=True)
+        return codes.astype(np.int32), {
+            "dtype": STRING,
+            "nullable": nullable,
+            "categories": [str(c) for c in categories]
+        }
+
+    values = series.to_numpy()
+    return values, {"dtype": str(values.dtype), "nullable": nullable}
+
+
+def ingest(excel_path=EXCEL_FILE, store_dir=STORE_DIR, sheets=SHEETS):
+    """Converte cada aba da planilha em arquivos .npy por coluna com esquema explícito.
+
+    As colunas são gravadas já com os tipos do esquema declarado (inteiros
+    estreitos, categóricas, datas). O armazenamento é escrito em um diretório temporário e só então substitui o
+    anterior, para que leitores nunca encontrem um armazenamento pela metade.
+    As violações do esquema (tipos, chaves primárias e estrangeiras) são
+    verificadas aqui, uma vez, e gravadas no schema.json para a carga não
+    repetir a validação.
+    """
+    start = time.perf_counter()
+    stat = os.stat(excel_path)
+    schema = {
+        "source": {
+            "path": os.path.abspath(excel_path),
+            "sha256": file_hash(excel_path),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size
+        },
+        "tables": {}
+    }
+
+    tmp_dir = store_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    with pd.ExcelFile(excel_path) as xls:
+        frames, violations = apply_all((sheet, pd.read_excel(xls, sheet)) for sheet in sheets)
+        schema["violations"] = violations
+        for sheet, df in frames.items():
+            os.makedirs(os.path.join(tmp_dir, sheet))
+            columns = {}
+            for position, column in enumerate(df.columns):
+                values, column_schema = _column_schema(df[column])
+                column_schema["file"] = f"{sheet}/{position:03d}.npy"
+                np.save(os.path.join(tmp_dir, column_schema["file"]), values, allow_pickle=False)
+                columns[str(column)] = column_schema
+            schema["tables"][sheet] = {"rows": len(df), "columns": columns}
+
+    with open(os.path.join(tmp_dir, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+
+    old_dir = store_dir + '.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(store_dir):
+        os.replace(store_dir, old_dir)
+    os.replace(tmp_dir, store_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    schema["seconds"] = time.perf_counter() - start
+    return schema
+
+
+def read_schema(store_dir=STORE_DIR):
+    """Lê o esquema do armazenamento, ou None se ele não existir"""
+    try:
+        with open(os.path.join(store_dir, SCHEMA_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(excel_path=EXCEL_FILE, store_dir=STORE_DIR, schema=None):
+    """Indica se o armazenamento corresponde ao conteúdo atual da planilha"""
+    schema = schema or read_schema(store_dir)
+    if schema is None:
+        return False
+    if not os.path.exists(excel_path):
+        return True
+
+    source = schema["source"]
+    stat = os.stat(excel_path)
+    if stat.st_mtime == source["mtime"] and stat.st_size == source["size"]:
+        return True
+    # O mtime mudou: só o hash do conteúdo diz se a planilha foi alterada
+    return file_hash(excel_path) == source["sha256"]
+
+
+def load_column(column_schema, store_dir=STORE_DIR):
+    """Abre uma coluna com memory mapping (textos são decodificados do dicionário)"""
+    values = np.load(os.path.join(store_dir, column_schema["file"]), mmap_mode='r')
+
+    if column_schema["dtype"] == STRING and column_schema.get("categorical"):
+        # Categóricas usam os códigos gravados diretamente, sem decodificar os textos
+        return pd.Categorical.from_codes(np.asarray(values), categories=column_schema["categories"],
+                                         validate=False)
+
+    if column_schema["dtype"] == STRING:
+        categories = np.array(column_schema["categories"] + [np.nan], dtype=object)
+        # Código -1 (valor ausente) aponta para o NaN no fim do dicionário
+        values = categories[values]
+
+    return values
+
+
+def load_table(sheet, columns=None, store_dir=STORE_DIR, schema=None):
+    """Carrega uma tabela do armazenamento lendo apenas as colunas pedidas"""
+    schema = schema or read_schema(store_dir)
+    if schema is None:
+        raise FileNotFoundError(f"Armazenamento colunar não encontrado em {store_dir}")
+
+    table = schema["tables"][sheet]
+    names = list(table["columns"]) if columns is None else list(columns)
+    data = {name: load_column(table["columns"][name], store_dir) for name in names}
+    return pd.DataFrame(data, index=pd.RangeIndex(table["rows"]), columns=names, copy=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte a planilha do hotel para o armazenamento colunar")
+    parser.add_argument('--planilha', default=EXCEL_FILE, help="Arquivo .xlsx de origem")
+    parser.add_argument('--destino', default=STORE_DIR, help="Diretório do armazenamento colunar")
+    args = parser.parse_args()
+
+    schema = ingest(args.planilha, args.destino)
+    print(f"Armazenamento gravado em {args.destino} ({schema['seconds']:.2f}s)")
+    for sheet, table in schema["tables"].items():
+        print(f"  {sheet}: {table['rows']} linhas, {len(table['columns'])} colunas")
+
+
+if __name__ == "__main__":
+    main()
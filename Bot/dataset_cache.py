@@ -0,0 +1,247 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import colstore
+from colstore import EXCEL_FILE, SHEETS, STORE_DIR, file_hash
+from metrics import QUERY_STAGE_LATENCY
+from schema import apply_all, log_violations, memory_report
+
+
+def freeze_frame(df):
+    """Devolve o DataFrame com todas as colunas somente leitura.
+
+    Colunas já somente leitura (abertas com memory mapping) não são copiadas.
+    Colunas categóricas continuam categóricas, com os códigos congelados.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        values = series.cat.codes.to_numpy() if categorical else series.to_numpy()
+        if values.flags.writeable:
+            values = values.copy()
+            values.flags.writeable = False
+        if categorical:
+            values = pd.Categorical.from_codes(values, dtype=series.dtype, validate=False)
+        columns[column] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+class DatasetSnapshot:
+    """Versão imutável do conjunto de dados carregada em memória"""
+
+    def __init__(self, frames, version, mtime, load_seconds, memory_bytes, source='xlsx',
+                 memory=None, violations=()):
+        self.frames = frames
+        self.version = version
+        self.mtime = mtime
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.memory_bytes = memory_bytes
+        self.source = source
+        # Memória por tabela e coluna e violações do esquema encontradas na carga
+        self.memory = memory
+        self.violations = tuple(violations)
+
+    def __getitem__(self, sheet):
+        return self.frames[sheet]
+
+
+def _freeze_all(tables):
+    """Congela as tabelas e devolve (tabelas, relatório de memória)"""
+    tables = dict(tables)
+    # Medido antes do congelamento: o pandas não inspeciona objetos somente leitura
+    report = memory_report(tables)
+    return {sheet: freeze_frame(df) for sheet, df in tables.items()}, report
+
+
+def load_snapshot(path, sheets=SHEETS, store_dir=STORE_DIR):
+    """Carrega todas as abas e devolve um DatasetSnapshot.
+
+    Se o armazenamento colunar estiver atualizado em relação à planilha, as
+    colunas são abertas com memory mapping; caso contrário a planilha é lida.
+    As colunas do armazenamento já têm os tipos do esquema e as violações
+    foram verificadas na ingestão, então a carga não repete a validação
+    (armazenamentos antigos, sem as violações gravadas, ainda são validados).
+    """
+    start = time.perf_counter()
+    schema = colstore.read_schema(store_dir)
+
+    if schema is not None and colstore.is_fresh(path, store_dir, schema):
+        source = schema["source"]
+        tables = ((sheet, colstore.load_table(sheet, store_dir=store_dir, schema=schema)) for sheet in sheets)
+        if "violations" in schema:
+            tables, violations = dict(tables), schema["violations"]
+            log_violations(violations)
+        else:
+            tables, violations = apply_all(tables)
+        frames, memory = _freeze_all(tables.items())
+        mtime = os.path.getmtime(path) if os.path.exists(path) else source["mtime"]
+        load_seconds = time.perf_counter() - start
+        QUERY_STAGE_LATENCY.observe(load_seconds, 'carga_colstore')
+        return DatasetSnapshot(frames, source["sha256"][:16], mtime, load_seconds,
+                               memory["bytes_total"], source='colstore', memory=memory,
+                               violations=violations)
+
+    mtime = os.path.getmtime(path)
+    version = file_hash(path)[:16]
+    with pd.ExcelFile(path) as xls:
+        tables, violations = apply_all((sheet, pd.read_excel(xls, sheet)) for sheet in sheets)
+    frames, memory = _freeze_all(tables.items())
+
+    load_seconds = time.perf_counter() - start
+    QUERY_STAGE_LATENCY.observe(load_seconds, 'carga_planilha')
+    return DatasetSnapshot(frames, version, mtime, load_seconds, memory["bytes_total"],
+                           memory=memory, violations=violations)
+
+
+class DatasetCache:
+    """Cache do conjunto de dados compartilhado por todo o processo.
+
+    A planilha é lida uma única vez (na inicialização ou no primeiro uso) e os
+    leitores recebem sempre um snapshot completo. Quando o mtime do arquivo muda,
+    o novo conteúdo é carregado em uma thread de fundo e só então substitui o
+    snapshot atual, em uma única atribuição. Uma versão do arquivo que falhou
+    na carga não é lida de novo até o arquivo mudar outra vez.
+    """
+
+    def __init__(self, path=EXCEL_FILE, check_interval=2.0, store_dir=STORE_DIR):
+        self.path = path
+        self.store_dir = store_dir
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._reload_thread = None
+        self._last_check = 0.0
+        self._reloads = 0
+        self._last_error = None
+        self._failed_stat = None
+
+    def get(self):
+        """Devolve o snapshot atual, carregando a planilha no primeiro uso"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = load_snapshot(self.path, store_dir=self.store_dir)
+                return self._snapshot
+
+        self._check_for_changes(snapshot)
+        return snapshot
+
+    def _check_for_changes(self, snapshot):
+        """Dispara a recarga em segundo plano se o arquivo foi modificado"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+
+        # Versão já em uso ou que já falhou: só um novo mtime/tamanho dispara outra tentativa
+        if stat.st_mtime == snapshot.mtime or (stat.st_mtime, stat.st_size) == self._failed_stat:
+            return
+
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_thread = threading.Thread(target=self._reload, daemon=True)
+            self._reload_thread.start()
+
+    def _reload(self):
+        """Carrega a nova versão da planilha e troca o snapshot atual"""
+        current = self._snapshot
+        failed_stat = None
+        try:
+            stat = os.stat(self.path)
+            failed_stat = (stat.st_mtime, stat.st_size)
+            if file_hash(self.path)[:16] == current.version:
+                # Apenas o mtime mudou: reaproveita os DataFrames já carregados
+                snapshot = DatasetSnapshot(current.frames, current.version,
+                                           os.path.getmtime(self.path), current.load_seconds,
+                                           current.memory_bytes, current.source,
+                                           current.memory, current.violations)
+            else:
+                snapshot = load_snapshot(self.path, store_dir=self.store_dir)
+                self._reloads += 1
+        except Exception as e:
+            # Arquivo inválido ou em escrita: mantém o snapshot anterior e
+            # registra mtime e tamanho para não repetir a mesma falha a cada verificação
+            self._last_error = str(e)
+            self._failed_stat = failed_stat
+            return
+
+        self._last_error = None
+        self._failed_stat = None
+        self._snapshot = snapshot
+
+    def loaded(self):
+        """Indica se o snapshot já foi carregado (sem disparar a carga)"""
+        return self._snapshot is not None
+
+    def available(self):
+        """Indica se existe uma fonte de dados (planilha ou armazenamento colunar)"""
+        return os.path.exists(self.path) or colstore.read_schema(self.store_dir) is not None
+
+    def wait_reload(self, timeout=None):
+        """Aguarda o término de uma recarga em andamento (útil em testes)"""
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        """Informações sobre o snapshot carregado"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"carregado": False, "arquivo": self.path}
+
+        return {
+            "carregado": True,
+            "arquivo": self.path,
+            "versao": snapshot.version,
+            "fonte": snapshot.source,
+            "carregado_em": pd.Timestamp(snapshot.loaded_at, unit='s').isoformat(),
+            "tempo_carga_segundos": round(snapshot.load_seconds, 4),
+            "memoria_bytes": snapshot.memory_bytes,
+            "linhas_por_tabela": {sheet: len(df) for sheet, df in snapshot.frames.items()},
+            "violacoes_esquema": list(snapshot.violations),
+            "recargas": self._reloads,
+            "ultimo_erro": self._last_error
+        }
+
+
+# Instância compartilhada pelo processo
+DATASET = DatasetCache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de memória do conjunto de dados carregado com o esquema")
+    parser.add_argument('--planilha', default=EXCEL_FILE, help="Arquivo .xlsx de origem")
+    parser.add_argument('--armazenamento', default=STORE_DIR, help="Diretório do armazenamento colunar")
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.planilha, store_dir=args.armazenamento)
+    print(f"Fonte: {snapshot.source} (versão {snapshot.version}, {snapshot.load_seconds:.2f}s)")
+    print(f"{'tabela':22s} {'linhas':>10s} {'bytes':>12s}")
+    for sheet, table in snapshot.memory["tabelas"].items():
+        print(f"{sheet:22s} {table['linhas']:10d} {table['bytes']:12d}")
+        for column, info in table["colunas"].items():
+            print(f"    {column:18s} {info['tipo'][:10]:>10s} {info['bytes']:12d}")
+    print(f"{'total':22s} {'':10s} {snapshot.memory['bytes_total']:12d}")
+
+    for violation in snapshot.violations:
+        print(f"Violação do esquema: {violation}")
+
+
+if __name__ == "__main__":
+    main()
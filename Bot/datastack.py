@@ -0,0 +1,113 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Modo de início do servidor:
+#   preload     importa pandas e carrega planilha e agregados antes de atender (padrão)
+#   lazy        importa pandas/openpyxl só na primeira consulta de dados
+#   background  faz a mesma carga em uma thread, depois que o servidor já escuta
+STARTUP_MODES = ('preload', 'lazy', 'background')
+STARTUP_MODE = os.environ.get('HOTEL_STARTUP', 'preload')
+if STARTUP_MODE not in STARTUP_MODES:
+    raise ValueError(f"HOTEL_STARTUP deve ser um de {', '.join(STARTUP_MODES)}")
+
+# Módulos que dependem do pandas e os nomes que a API usa de cada um
+EXPORTS = {
+    'dataset_cache': ('DATASET',),
+    'aggregates': ('AGGREGATES', 'AGGREGATE_SPECS'),
+    'filters': ('FilterError', 'check_applicable', 'filters_key', 'read_filters'),
+    'sql_engine': ('SQL_ENGINE',),
+    'time_index': ('FILTERED_AGGREGATES',)
+}
+
+
+class DataStack:
+    """Acesso sob demanda aos módulos de dados.
+
+    Importar pandas e numpy leva centenas de milissegundos, e as rotas que não
+    consultam dados (/chat, /perguntas, /health) não precisam deles. O primeiro
+    acesso a um dos nomes de ``exports`` importa os módulos e registra o tempo
+    de cada um; os acessos seguintes são uma leitura de dicionário.
+    """
+
+    def __init__(self, exports=EXPORTS):
+        self._exports = exports
+        self._names = None
+        self._lock = threading.Lock()
+        self._warmup = None
+        self.import_seconds = {}
+        self.warmup_seconds = None
+        self.warmup_error = None
+
+    def load(self):
+        """Importa os módulos de dados (uma única vez) e devolve os nomes exportados"""
+        names = self._names
+        if names is None:
+            with self._lock:
+                if self._names is None:
+                    names = {}
+                    for module_name, attributes in self._exports.items():
+                        start = time.perf_counter()
+                        module = importlib.import_module(module_name)
+                        self.import_seconds[module_name] = time.perf_counter() - start
+                        for attribute in attributes:
+                            names[attribute] = getattr(module, attribute)
+                    self._names = names
+                names = self._names
+        return names
+
+    def loaded(self):
+        return self._names is not None
+
+    def __getattr__(self, name):
+        # Só é chamado para nomes que não são atributos da instância
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self.load()[name]
+        except KeyError:
+            raise AttributeError(f"A pilha de dados não exporta '{name}'") from None
+
+    def preload(self):
+        """Importa os módulos e, havendo planilha, carrega os dados e os agregados"""
+        dataset = self.load()['DATASET']
+        if dataset.available():
+            dataset.get()
+            self.load()['AGGREGATES'].sync()
+
+    def warm_up(self):
+        """Executa o preload em uma thread de fundo (uma vez por processo)"""
+        with self._lock:
+            if self._warmup is not None:
+                return self._warmup
+            self._warmup = threading.Thread(target=self._run_warmup, name='aquecimento', daemon=True)
+        self._warmup.start()
+        return self._warmup
+
+    def _run_warmup(self):
+        start = time.perf_counter()
+        try:
+            self.preload()
+        except Exception as e:
+            self.warmup_error = str(e)
+        self.warmup_seconds = time.perf_counter() - start
+
+    def stats(self):
+        info = {
+            "modo_inicio": STARTUP_MODE,
+            "carregada": self.loaded(),
+            "import_segundos": {name: round(seconds, 4) for name, seconds in self.import_seconds.items()}
+        }
+        if self.warmup_seconds is not None:
+            info["aquecimento_segundos"] = round(self.warmup_seconds, 4)
+        if self.warmup_error is not None:
+            info["erro_aquecimento"] = self.warmup_error
+        return info
+
+
+# Instância compartilhada pelo processo
+DATA = DataStack()
@@ -0,0 +1,314 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import colstore
+from aggregates import AGGREGATE_SPECS
+from schema import apply_schema
+from time_index import TIME_COLUMNS
+
+# Diretório padrão dos extratos, ao lado da planilha
+EXPORT_DIR = os.path.join(os.path.dirname(colstore.EXCEL_FILE), 'extratos')
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 2
+
+# Coluna com o momento da última alteração de cada linha das tabelas fato
+UPDATED_COLUMN = 'updated_at'
+
+# Granularidade das partições (período da data da tabela fato) e o nome de
+# cada partição; linhas sem data ficam em uma partição própria
+GRANULARITIES = {'dia': '%Y-%m-%d', 'mes': '%Y-%m'}
+NO_DATE = 'sem_data'
+
+# Extratos exportados: os agregados do chatbot, com os totais por período e chave
+EXTRACTS = AGGREGATE_SPECS
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _source_columns(extracts=EXTRACTS):
+    """Colunas lidas de cada tabela: data, alteração, chave primária, chave e valor das fatos e rótulos das dimensões"""
+    columns = {}
+    for spec in extracts.values():
+        fact = columns.setdefault(spec.fact, [TIME_COLUMNS[spec.fact], UPDATED_COLUMN, spec.pk])
+        fact.extend(column for column in (spec.key, spec.value) if column not in fact)
+        columns[spec.dimension] = [spec.dimension_key, spec.label]
+    return columns
+
+
+def load_sources(excel_file=colstore.EXCEL_FILE, store_dir=colstore.STORE_DIR, extracts=EXTRACTS):
+    """Carrega as colunas dos extratos do armazenamento colunar (se atualizado) ou da planilha"""
+    columns = _source_columns(extracts)
+    if colstore.is_fresh(excel_file, store_dir):
+        return {table: colstore.load_table(table, names, store_dir) for table, names in columns.items()}
+
+    with pd.ExcelFile(excel_file) as xls:
+        return {table: apply_schema(table, pd.read_excel(xls, table, usecols=names), partial=True)[0]
+                for table, names in columns.items()}
+
+
+def read_manifest(dest=EXPORT_DIR):
+    """Lê o manifesto dos extratos, ou None se ele não existir"""
+    try:
+        with open(os.path.join(dest, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, data):
+    """Grava em um arquivo temporário e o move para o lugar, sem deixar arquivos pela metade"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _source_info(excel_file):
+    stat = os.stat(excel_file)
+    return {"sha256": colstore.file_hash(excel_file), "mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def _source_unchanged(excel_file, source):
+    """Indica se a planilha é a mesma da última exportação (mtime e tamanho, depois o hash)"""
+    if source is None or not os.path.exists(excel_file):
+        return False
+    stat = os.stat(excel_file)
+    if stat.st_mtime == source["mtime"] and stat.st_size == source["size"]:
+        return True
+    return colstore.file_hash(excel_file) == source["sha256"]
+
+
+def partition_labels(times, granularity='dia'):
+    """Nome da partição de cada linha: o período da data, ou NO_DATE quando ela falta"""
+    times = pd.Series(times)
+    return times.dt.strftime(GRANULARITIES[granularity]).fillna(NO_DATE).to_numpy(dtype=object)
+
+
+def _dimension_hash(dimension):
+    """Hash dos pares (chave, rótulo) da dimensão, que vão em todas as partições"""
+    rows = dimension.astype(str).sort_values(list(dimension.columns))
+    return hashlib.sha256(rows.to_csv(index=False).encode('utf-8')).hexdigest()
+
+
+def _fact_changes(table, fact, pk, granularity, watermark):
+    """Partições das linhas, partições com linhas alteradas desde a marca d'água e a nova marca.
+
+    A marca guarda o maior ``updated_at`` exportado e as chaves primárias das
+    linhas com esse valor. Uma linha gravada depois da exportação com o mesmo
+    ``updated_at`` tem a chave fora da marca e também conta como alterada.
+    """
+    periods = partition_labels(table[TIME_COLUMNS[fact]], granularity)
+    updated = pd.Series(table[UPDATED_COLUMN])
+    keys = pd.Series(table[pk])
+    if watermark is None:
+        changed = np.ones(len(table), dtype=bool)
+    else:
+        # Linhas sem data de alteração são sempre consideradas alteradas
+        marked = pd.Timestamp(watermark["updated_at"])
+        tied = (updated == marked) & ~keys.isin(watermark["chaves"])
+        changed = (updated.isna() | (updated > marked) | tied).to_numpy()
+
+    latest = updated.max()
+    if pd.isna(latest):
+        return periods, set(periods[changed]), watermark
+    new_watermark = {"updated_at": latest.isoformat(), "chaves": sorted(keys[updated == latest].tolist())}
+    return periods, set(periods[changed]), new_watermark
+
+
+def _partition_frames(table, periods, dimension, spec, dirty):
+    """Totais por período e chave das linhas das partições ``dirty``, com o rótulo da dimensão"""
+    mask = np.isin(periods, list(dirty))
+    values = pd.Series(table[spec.value]).to_numpy()[mask]
+    if values.dtype.kind in 'iub':
+        values = values.astype(np.int64)
+
+    rows = pd.DataFrame({
+        'periodo': periods[mask],
+        spec.key: pd.Series(table[spec.key]).to_numpy()[mask],
+        spec.value: values
+    })
+    grouped = rows.groupby(['periodo', spec.key], sort=True).agg(
+        **{spec.value: (spec.value, 'sum'), 'linhas': (spec.value, 'size')}).reset_index()
+
+    # Como no merge das queries, chaves sem correspondência na dimensão ficam de fora
+    labels = dimension.rename(columns={spec.dimension_key: spec.key})
+    labels[spec.key] = labels[spec.key].astype(grouped[spec.key].dtype)
+    grouped = grouped.merge(labels, on=spec.key, how='inner')
+    grouped = grouped[['periodo', spec.key, spec.label, spec.value, 'linhas']]
+    grouped = grouped.sort_values(['periodo', spec.key], kind='stable')
+
+    frames = dict(tuple(grouped.groupby('periodo', sort=False)))
+    return {period: frames.get(period, grouped.iloc[:0]) for period in dirty}, int(mask.sum())
+
+
+def export(excel_file=colstore.EXCEL_FILE, dest=EXPORT_DIR, store_dir=colstore.STORE_DIR,
+           granularity='dia', full=False, extracts=EXTRACTS):
+    """Atualiza os extratos particionados e devolve o relatório da exportação.
+
+    Só são reescritas as partições com linhas alteradas desde a marca d'água
+    (maior ``updated_at`` da última exportação e as chaves das linhas com esse
+    valor), partições novas, partições cujo número de linhas de origem mudou
+    (linhas removidas) e partições cujo arquivo sumiu. Uma mudança nos rótulos
+    de uma dimensão reescreve o extrato inteiro, e ``full`` reescreve tudo. Com
+    a planilha idêntica à da última exportação, nada é lido. O manifesto, com
+    linhas e sha256 de cada partição, é gravado por último.
+    """
+    start = time.perf_counter()
+    manifest = read_manifest(dest)
+    if manifest is not None and (manifest.get("versao") != MANIFEST_VERSION
+                                 or manifest.get("granularidade") != granularity):
+        full = True
+    previous = (manifest or {}).get("extratos", {})
+
+    report = {"extratos": {}, "bytes_escritos": 0, "sem_alteracoes": False}
+    if manifest is not None and not full and _source_unchanged(excel_file, manifest.get("fonte")):
+        for name in extracts:
+            kept = len(previous.get(name, {}).get("particoes", {}))
+            report["extratos"][name] = {"escritas": 0, "removidas": 0, "mantidas": kept, "linhas_agregadas": 0}
+        report["sem_alteracoes"] = True
+        report["segundos"] = time.perf_counter() - start
+        return report
+
+    tables = load_sources(excel_file, store_dir, extracts)
+    watermarks = {} if full or manifest is None else manifest.get("marca_dagua", {})
+
+    changes = {}
+    for fact, pk in sorted({(spec.fact, spec.pk) for spec in extracts.values()}):
+        changes[fact] = _fact_changes(tables[fact], fact, pk, granularity, watermarks.get(fact))
+
+    new_manifest = {
+        "versao": MANIFEST_VERSION,
+        "granularidade": granularity,
+        "gerado_em": _utcnow(),
+        "fonte": _source_info(excel_file) if os.path.exists(excel_file) else None,
+        "marca_dagua": {fact: change[2] for fact, change in changes.items()},
+        "extratos": {}
+    }
+
+    for name, spec in extracts.items():
+        periods, changed, _ = changes[spec.fact]
+        source_counts = pd.Series(periods).value_counts().to_dict()
+        dimension = tables[spec.dimension][[spec.dimension_key, spec.label]]
+        dimension_hash = _dimension_hash(dimension)
+
+        old = previous.get(name, {})
+        old_partitions = old.get("particoes", {})
+        if full or old.get("dimensao_sha256") != dimension_hash:
+            dirty = set(source_counts)
+        else:
+            dirty = {period for period, count in source_counts.items()
+                     if period in changed
+                     or period not in old_partitions
+                     or old_partitions[period]["linhas_fonte"] != count
+                     or not os.path.exists(os.path.join(dest, old_partitions[period]["arquivo"]))}
+
+        partitions = {period: info for period, info in old_partitions.items()
+                      if period in source_counts and period not in dirty}
+        frames, aggregated_rows = _partition_frames(tables[spec.fact], periods, dimension, spec, dirty)
+        for period, frame in sorted(frames.items()):
+            relative = f"{name}/{period}.csv"
+            data = frame.to_csv(index=False).encode('utf-8')
+            _write_atomic(os.path.join(dest, relative), data)
+            report["bytes_escritos"] += len(data)
+            partitions[period] = {
+                "arquivo": relative,
+                "linhas": len(frame),
+                "linhas_fonte": int(source_counts[period]),
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "atualizado_em": new_manifest["gerado_em"]
+            }
+
+        removed = [info for period, info in old_partitions.items() if period not in source_counts]
+        for info in removed:
+            try:
+                os.remove(os.path.join(dest, info["arquivo"]))
+            except FileNotFoundError:
+                pass
+
+        new_manifest["extratos"][name] = {
+            "tabela_fato": spec.fact,
+            "colunas": ['periodo', spec.key, spec.label, spec.value, 'linhas'],
+            "dimensao_sha256": dimension_hash,
+            "particoes": dict(sorted(partitions.items()))
+        }
+        report["extratos"][name] = {
+            "escritas": len(frames),
+            "removidas": len(removed),
+            "mantidas": len(partitions) - len(frames),
+            "linhas_agregadas": aggregated_rows
+        }
+
+    # Extratos que deixaram de existir (manifesto de outra versão ou granularidade)
+    for name in set(previous) - set(extracts):
+        shutil.rmtree(os.path.join(dest, name), ignore_errors=True)
+
+    _write_atomic(os.path.join(dest, MANIFEST_FILE),
+                  json.dumps(new_manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    report["segundos"] = time.perf_counter() - start
+    return report
+
+
+def verify(dest=EXPORT_DIR):
+    """Confere os arquivos com o manifesto; devolve a lista de problemas (vazia quando tudo confere)"""
+    manifest = read_manifest(dest)
+    if manifest is None:
+        return [f"Manifesto não encontrado em {dest}"]
+
+    problems = []
+    for name, extract in manifest["extratos"].items():
+        for period, info in extract["particoes"].items():
+            path = os.path.join(dest, info["arquivo"])
+            if not os.path.exists(path):
+                problems.append(f"{name}/{period}: arquivo ausente")
+            elif colstore.file_hash(path) != info["sha256"]:
+                problems.append(f"{name}/{period}: sha256 diferente do manifesto")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta extratos agregados e particionados para o Power BI")
+    parser.add_argument('--planilha', default=colstore.EXCEL_FILE, help="Arquivo .xlsx de origem")
+    parser.add_argument('--armazenamento', default=colstore.STORE_DIR,
+                        help="Armazenamento colunar usado no lugar da planilha quando estiver atualizado")
+    parser.add_argument('--destino', default=EXPORT_DIR, help="Diretório dos extratos")
+    parser.add_argument('--granularidade', choices=sorted(GRANULARITIES), default='dia',
+                        help="Período de cada partição")
+    parser.add_argument('--completo', action='store_true', help="Reescreve todas as partições")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Só confere os arquivos com os checksums do manifesto")
+    args = parser.parse_args()
+
+    if args.verificar:
+        problems = verify(args.destino)
+        for problem in problems:
+            print(f"PROBLEMA: {problem}")
+        print("Extratos conferem com o manifesto" if not problems else f"{len(problems)} problema(s)")
+        return 1 if problems else 0
+
+    report = export(args.planilha, args.destino, args.armazenamento, args.granularidade, args.completo)
+    if report["sem_alteracoes"]:
+        print("Planilha sem alterações desde a última exportação")
+    for name, info in report["extratos"].items():
+        print(f"  {name}: {info['escritas']} partições escritas, {info['removidas']} removidas, "
+              f"{info['mantidas']} mantidas ({info['linhas_agregadas']} linhas agregadas)")
+    print(f"{report['bytes_escritos']} bytes escritos em {report['segundos']:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
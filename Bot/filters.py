@@ -0,0 +1,90 @@
+import pandas as pd
+
+# Filtros de dimensão aceitos e as tabelas fato a que cada um se aplica
+DIMENSION_FILTERS = {
+    'vendedor': ('purchase', 'stay'),
+    'tipo_pet': ('stay',),
+    'marca': ('purchase',)
+}
+
+
+class FilterError(ValueError):
+    """Filtro de data ou de dimensão inválido"""
+
+
+def _timestamp(value, field):
+    try:
+        timestamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        raise FilterError(f"Campo '{field}' deve ser uma data no formato AAAA-MM-DD")
+    if timestamp is pd.NaT:
+        raise FilterError(f"Campo '{field}' deve ser uma data no formato AAAA-MM-DD")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return timestamp
+
+
+def _values(value, field):
+    """Aceita um valor ou uma lista de valores"""
+    values = value if isinstance(value, list) else [value]
+    if not values or any(v is None or isinstance(v, (dict, list, bool)) for v in values):
+        raise FilterError(f"Campo '{field}' deve ser um valor ou uma lista de valores")
+    return values
+
+
+def read_filters(data):
+    """Extrai os filtros do corpo da requisição, ou None se não houver filtros.
+
+    ``data_inicio`` e ``data_fim`` são inclusivos; uma data sem horário em
+    ``data_fim`` inclui o dia inteiro. ``mes`` (AAAA-MM) seleciona o mês todo.
+    ``vendedor`` recebe seller_id, ``tipo_pet`` o id ou o nome do tipo e
+    ``marca`` o nome da marca; cada um aceita um valor ou uma lista.
+    """
+    filters = {}
+
+    if data.get('mes'):
+        if 'data_inicio' in data or 'data_fim' in data:
+            raise FilterError("Use 'mes' ou 'data_inicio'/'data_fim', não ambos")
+        try:
+            month = pd.Period(str(data['mes']), freq='M')
+        except (TypeError, ValueError):
+            raise FilterError("Campo 'mes' deve estar no formato AAAA-MM")
+        filters['inicio'] = month.start_time
+        filters['fim'] = (month + 1).start_time
+
+    if data.get('data_inicio') is not None:
+        filters['inicio'] = _timestamp(data['data_inicio'], 'data_inicio')
+    if data.get('data_fim') is not None:
+        end = _timestamp(data['data_fim'], 'data_fim')
+        # Data sem horário: o fim exclusivo é o início do dia seguinte
+        filters['fim'] = end + pd.Timedelta(days=1) if end == end.normalize() else end + pd.Timedelta(1, 'ns')
+
+    if 'inicio' in filters and 'fim' in filters and filters['inicio'] >= filters['fim']:
+        raise FilterError("'data_inicio' deve ser anterior a 'data_fim'")
+
+    if data.get('vendedor') is not None:
+        try:
+            filters['vendedor'] = sorted({int(v) for v in _values(data['vendedor'], 'vendedor')})
+        except (TypeError, ValueError):
+            raise FilterError("Campo 'vendedor' deve conter ids de vendedor")
+    if data.get('tipo_pet') is not None:
+        filters['tipo_pet'] = sorted({str(v) for v in _values(data['tipo_pet'], 'tipo_pet')})
+    if data.get('marca') is not None:
+        filters['marca'] = sorted({str(v) for v in _values(data['marca'], 'marca')})
+
+    return filters or None
+
+
+def check_applicable(filters, fact):
+    """Rejeita filtros de dimensão que não se aplicam à tabela fato da query"""
+    for name, facts in DIMENSION_FILTERS.items():
+        if name in filters and fact not in facts:
+            raise FilterError(f"Filtro '{name}' não se aplica a esta query")
+
+
+def filters_key(filters):
+    """Forma serializável e estável dos filtros (para ETag e cache)"""
+    if not filters:
+        return None
+    return {name: value.isoformat() if isinstance(value, pd.Timestamp) else value
+            for name, value in sorted(filters.items())}
@@ -0,0 +1,72 @@
+# Configuração do gunicorn para servir a API em produção:
+#   gunicorn -c Bot/gunicorn.conf.py
+#
+# Variáveis de ambiente:
+#   HOTEL_BIND              endereço de escuta (padrão 0.0.0.0:5000)
+#   HOTEL_WORKERS           número de processos (padrão: número de CPUs)
+#   HOTEL_THREADS           threads por processo (padrão 1)
+#   HOTEL_TIMEOUT           segundos até um worker travado ser reiniciado (padrão 30)
+#   HOTEL_GRACEFUL_TIMEOUT  segundos para concluir requisições em um reload (padrão 30)
+#   HOTEL_QUERY_WORKERS     processos do executor paralelo das agregações (padrão 1: serial)
+#   HOTEL_JOB_WORKERS       threads que executam os jobs de /jobs em cada processo (padrão 2)
+#   HOTEL_MAX_PENDING_JOBS  jobs pendentes aceitos por processo antes de responder 503 (padrão 32)
+#   HOTEL_JOBS_DB           arquivo SQLite com o estado dos jobs, lido por todos os workers
+#                           (padrão: hotel_jobs_<pid do mestre>.sqlite3 no diretório temporário)
+#   HOTEL_MAX_HEAVY_QUERIES   queries pesadas simultâneas por processo (padrão 4)
+#   HOTEL_MAX_QUEUED_QUERIES  queries aguardando vaga antes de responder 429 (padrão 16)
+#   HOTEL_QUEUE_TIMEOUT       segundos de espera por uma vaga antes de responder 503 (padrão 5)
+#   HOTEL_STARTUP           preload (padrão), lazy ou background; ver Bot/datastack.py
+#
+# Recarga sem derrubar conexões: kill -HUP <pid do mestre>
+import multiprocessing
+import os
+import tempfile
+
+_bot_dir = os.path.dirname(os.path.abspath(__file__))
+
+wsgi_app = 'wsgi:application'
+pythonpath = _bot_dir
+chdir = os.path.dirname(_bot_dir)
+
+bind = os.environ.get('HOTEL_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('HOTEL_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('HOTEL_THREADS', 1))
+timeout = int(os.environ.get('HOTEL_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('HOTEL_GRACEFUL_TIMEOUT', 30))
+
+# A aplicação (e os dados) são carregados uma única vez no mestre, antes do fork
+preload_app = True
+
+# Definido antes de a aplicação ser importada: a consulta de um job
+# (/jobs/<id>) pode chegar a qualquer worker, não só ao que o recebeu
+_temporary_jobs_db = 'HOTEL_JOBS_DB' not in os.environ
+_jobs_db = os.environ.setdefault('HOTEL_JOBS_DB',
+                                 os.path.join(tempfile.gettempdir(), f'hotel_jobs_{os.getpid()}.sqlite3'))
+
+
+def on_starting(server):
+    import wsgi
+    wsgi.preload()
+    server.log.info("Catálogo e conjunto de dados carregados no processo mestre")
+
+
+def post_fork(server, worker):
+    from datastack import DATA, STARTUP_MODE
+    if STARTUP_MODE == 'background':
+        # O socket já está aberto pelo mestre: o worker atende /health e /chat
+        # enquanto pandas e os dados são carregados em segundo plano
+        DATA.warm_up()
+        server.log.info("Worker %s iniciado; dados em carga em segundo plano", worker.pid)
+    elif STARTUP_MODE == 'lazy':
+        server.log.info("Worker %s iniciado; dados carregados na primeira consulta", worker.pid)
+    else:
+        server.log.info("Worker %s iniciado com os dados compartilhados do mestre", worker.pid)
+
+
+def on_exit(server):
+    # O arquivo padrão dos jobs é desta execução do servidor
+    if _temporary_jobs_db:
+        try:
+            os.remove(_jobs_db)
+        except OSError:
+            pass
@@ -0,0 +1,269 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Threads que executam os jobs e limite de jobs aguardando ou em execução
+JOB_WORKERS = int(os.environ.get('HOTEL_JOB_WORKERS', 2))
+MAX_PENDING_JOBS = int(os.environ.get('HOTEL_MAX_PENDING_JOBS', 32))
+
+# Jobs concluídos ficam disponíveis para consulta por este tempo (segundos),
+# até o limite de jobs guardados
+JOB_TTL = 600
+MAX_JOBS = 1000
+
+# Arquivo SQLite com o estado dos jobs, compartilhado pelos processos do
+# gunicorn (definido em gunicorn.conf.py); sem ele, os jobs ficam só na
+# memória do processo que os recebeu
+JOBS_DB = os.environ.get('HOTEL_JOBS_DB')
+
+# Intervalo (segundos) entre leituras do arquivo ao aguardar um job de outro processo
+STORE_POLL_INTERVAL = 0.05
+
+PENDING = 'pendente'
+RUNNING = 'executando'
+DONE = 'concluido'
+FAILED = 'erro'
+
+
+class JobQueueFull(RuntimeError):
+    """Limite de jobs pendentes atingido"""
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+class Job:
+    """Execução em segundo plano de uma função, consultada pelo id"""
+
+    def __init__(self, key, description, store=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.description = description
+        self.store = store
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def finished(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Aguarda o término por até ``timeout`` segundos; indica se terminou"""
+        return self._done.wait(timeout)
+
+    def _save(self):
+        if self.store is not None:
+            self.store.save(self)
+
+    def _run(self, function):
+        self.status = RUNNING
+        self.started_at = time.time()
+        self._save()
+        try:
+            self.result = function()
+            self.status = DONE
+        except Exception as e:
+            self.error = str(e)
+            self.status = FAILED
+        finally:
+            self.finished_at = time.time()
+            try:
+                self._save()
+            finally:
+                self._done.set()
+
+    def to_dict(self):
+        info = {
+            "job_id": self.id,
+            "status": self.status,
+            **self.description,
+            "criado_em": _isoformat(self.created_at)
+        }
+        if self.started_at is not None:
+            info["iniciado_em"] = _isoformat(self.started_at)
+        if self.finished_at is not None:
+            info["concluido_em"] = _isoformat(self.finished_at)
+            info["duracao_segundos"] = round(self.finished_at - (self.started_at or self.finished_at), 4)
+        if self.status == FAILED:
+            info["erro"] = self.error
+        return info
+
+
+class StoredJob(Job):
+    """Job de outro processo, lido do JobStore; ``wait`` relê o arquivo até o término"""
+
+    def __init__(self, store, job_id, status, description, result, error, created_at, started_at, finished_at):
+        self.id = job_id
+        self.key = None
+        self.store = store
+        self.status = status
+        self.description = description
+        self.result = result
+        self.error = error
+        self.created_at = created_at
+        self.started_at = started_at
+        self.finished_at = finished_at
+
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.finished():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(STORE_POLL_INTERVAL)
+            current = self.store.load(self.id)
+            if current is None:
+                return False
+            self.__dict__.update(current.__dict__)
+        return True
+
+
+class JobStore:
+    """Estado dos jobs em um arquivo SQLite, para qualquer processo consultar qualquer job.
+
+    Cada operação abre a sua conexão: o arquivo é usado por vários processos
+    (inclusive depois do fork do gunicorn) e pelas threads de cada um.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, descricao TEXT, "
+                      "resultado TEXT, erro TEXT, criado REAL, iniciado REAL, concluido REAL)")
+
+    def _execute(self, sql, params=()):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                return db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+
+    def save(self, job):
+        self._execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+            job.id, job.status, json.dumps(job.description),
+            json.dumps(job.result, default=str) if job.status == DONE else None, job.error,
+            job.created_at, job.started_at, job.finished_at))
+
+    def load(self, job_id):
+        rows = self._execute("SELECT id, status, descricao, resultado, erro, criado, iniciado, concluido "
+                             "FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job_id, status, description, result, error, created_at, started_at, finished_at = rows[0]
+        return StoredJob(self, job_id, status, json.loads(description),
+                         json.loads(result) if result is not None else None,
+                         error, created_at, started_at, finished_at)
+
+    def purge(self, finished_before):
+        """Remove os jobs concluídos antes de ``finished_before``"""
+        self._execute("DELETE FROM jobs WHERE concluido IS NOT NULL AND concluido < ?", (finished_before,))
+
+
+class JobManager:
+    """Fila de jobs com número limitado de threads e de jobs pendentes.
+
+    Um job é identificado pela chave da tarefa (por exemplo, tipo de query,
+    filtros e versão dos dados): enquanto um job com a mesma chave estiver
+    pendente, em execução ou concluído com sucesso e ainda guardado, um novo
+    pedido recebe esse mesmo job em vez de repetir o trabalho. Jobs com erro
+    não são reaproveitados, para que o pedido possa ser repetido.
+
+    Com um ``store``, o estado de cada job também é gravado no arquivo
+    compartilhado, e ``get`` encontra os jobs criados por outros processos.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=MAX_PENDING_JOBS, ttl=JOB_TTL, max_jobs=MAX_JOBS,
+                 store=None):
+        self.workers = workers
+        self.store = store
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+
+    def _pending(self):
+        return sum(1 for job in self._jobs.values() if not job.finished())
+
+    def _purge(self, now):
+        """Remove os jobs concluídos expirados e os mais antigos além do limite"""
+        for job_id, job in list(self._jobs.items()):
+            if not job.finished():
+                continue
+            if now - job.finished_at > self.ttl or len(self._jobs) > self.max_jobs:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+        if self.store is not None:
+            self.store.purge(now - self.ttl)
+
+    def submit(self, key, function, description=None):
+        """Devolve (job, novo): o job existente para a chave ou um novo job na fila.
+
+        Levanta JobQueueFull quando o limite de jobs pendentes foi atingido.
+        """
+        with self._lock:
+            self._purge(time.time())
+
+            job = self._by_key.get(key)
+            if job is not None and job.status != FAILED:
+                self.deduplicated += 1
+                return job, False
+
+            if self._pending() >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull("Limite de jobs pendentes atingido")
+
+            job = Job(key, description or {}, self.store)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self.submitted += 1
+            job._save()
+
+        self._executor.submit(job._run, function)
+        return job, True
+
+    def get(self, job_id):
+        """Job pelo id: os deste processo ou, com ``store``, os de qualquer processo"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+            if job is not None and job.finished() and time.time() - job.finished_at > self.ttl:
+                return None
+        return job
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending()
+            return {
+                "threads": self.workers,
+                "limite_pendentes": self.max_pending,
+                "pendentes": pending,
+                "guardados": len(self._jobs),
+                "enviados": self.submitted,
+                "reaproveitados": self.deduplicated,
+                "recusados": self.rejected
+            }
+
+
+# Instância compartilhada pelo processo
+JOBS = JobManager(store=JobStore(JOBS_DB) if JOBS_DB else None)
@@ -0,0 +1,151 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize(text):
+    """Remove acentos, pontuação, maiúsculas e espaços repetidos"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    without_accents = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', without_accents.lower()).strip()
+
+
+def char_ngrams(normalized, n=3):
+    """Conta os n-gramas de caracteres de um texto já normalizado"""
+    padded = f' {normalized} '
+    return Counter(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class QuestionMatcher:
+    """Índice de perguntas com busca por similaridade TF-IDF de n-gramas de caracteres.
+
+    O índice é construído uma única vez. Perguntas idênticas após a normalização
+    são resolvidas por um dicionário; as demais são comparadas só com os
+    candidatos das listas invertidas dos n-gramas mais raros da pergunta, até
+    ``max_candidates`` entradas de lista no total. N-gramas comuns não trazem
+    candidatos, apenas entram no cosseno exato dos candidatos, e assim o custo
+    da busca fica limitado mesmo com catálogos de dezenas de milhares de
+    intenções. Uma pergunta que só compartilha n-gramas comuns com o catálogo
+    não tem candidatos.
+    """
+
+    def __init__(self, entries, threshold=0.7, ngram=3, max_candidates=512):
+        """``entries`` é uma sequência de pares (pergunta, resposta)"""
+        self.threshold = threshold
+        self.ngram = ngram
+        self.max_candidates = max_candidates
+        self.payloads = []
+        self.exact = {}
+
+        documents = []
+        for question, payload in entries:
+            normalized = normalize(question)
+            self.exact.setdefault(normalized, len(self.payloads))
+            self.payloads.append(payload)
+            documents.append(char_ngrams(normalized, ngram))
+
+        n_docs = len(documents)
+        document_frequency = Counter(gram for grams in documents for gram in grams)
+        self.idf = {gram: math.log((1 + n_docs) / df) + 1.0
+                    for gram, df in document_frequency.items()}
+        # N-gramas desconhecidos pesam como os mais raros e reduzem a similaridade
+        self.unseen_idf = math.log(1 + n_docs) + 1.0
+
+        # Vetores dos documentos em formato CSR (ids dos n-gramas e pesos
+        # normalizados, linha a linha) e listas invertidas só com os documentos
+        self.gram_ids = {gram: gram_id for gram_id, gram in enumerate(document_frequency)}
+        postings = {}
+        indptr, gram_ids, doc_weights = [0], [], []
+        for doc_id, grams in enumerate(documents):
+            weights = {gram: count * self.idf[gram] for gram, count in grams.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for gram, weight in weights.items():
+                postings.setdefault(gram, []).append(doc_id)
+                gram_ids.append(self.gram_ids[gram])
+                doc_weights.append(weight / norm)
+            indptr.append(len(gram_ids))
+
+        self.postings = {gram: np.asarray(docs, dtype=np.int32) for gram, docs in postings.items()}
+        self.doc_indptr = np.asarray(indptr, dtype=np.int64)
+        self.doc_grams = np.asarray(gram_ids, dtype=np.int32)
+        self.doc_weights = np.asarray(doc_weights)
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def _query_weights(self, normalized):
+        """Pesos normalizados dos n-gramas da pergunta"""
+        grams = char_ngrams(normalized, self.ngram)
+        weights = {gram: count * self.idf.get(gram, self.unseen_idf) for gram, count in grams.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {gram: weight / norm for gram, weight in weights.items()}
+
+    def _candidate_grams(self, weights):
+        """N-gramas da pergunta, do mais raro ao mais comum, cujas listas somam até ``max_candidates``"""
+        chosen = []
+        budget = self.max_candidates
+        for gram in sorted((gram for gram in weights if gram in self.postings),
+                           key=lambda gram: len(self.postings[gram])):
+            size = len(self.postings[gram])
+            if size > budget:
+                break
+            chosen.append(gram)
+            budget -= size
+        return chosen
+
+    def _candidates(self, weights):
+        grams = self._candidate_grams(weights)
+        if not grams:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate([self.postings[gram] for gram in grams]))
+
+    def candidates(self, question):
+        """Documentos comparados com ``question`` na busca (no máximo ``max_candidates``)"""
+        normalized = normalize(question)
+        if not normalized:
+            return np.empty(0, dtype=np.int32)
+        return self._candidates(self._query_weights(normalized))
+
+    def _scores(self, candidates, weights):
+        """Cosseno exato entre a pergunta e cada candidato, pelas linhas CSR dos candidatos"""
+        known = sorted((self.gram_ids[gram], weight) for gram, weight in weights.items() if gram in self.gram_ids)
+        query_ids = np.fromiter((gram_id for gram_id, _ in known), dtype=np.int32, count=len(known))
+        query_weights = np.fromiter((weight for _, weight in known), dtype=float, count=len(known))
+
+        starts = self.doc_indptr[candidates]
+        lengths = self.doc_indptr[candidates + 1] - starts
+        row_starts = np.cumsum(lengths) - lengths
+        entries = np.repeat(starts - row_starts, lengths) + np.arange(int(lengths.sum()))
+
+        ids = self.doc_grams[entries]
+        positions = np.minimum(np.searchsorted(query_ids, ids), len(query_ids) - 1)
+        products = np.where(query_ids[positions] == ids, query_weights[positions], 0.0) * self.doc_weights[entries]
+        return np.add.reduceat(products, row_starts)
+
+    def match(self, question):
+        """Devolve (resposta, similaridade) da pergunta mais próxima, ou (None, similaridade)"""
+        normalized = normalize(question)
+        if not normalized:
+            return None, 0.0
+
+        doc_id = self.exact.get(normalized)
+        if doc_id is not None:
+            return self.payloads[doc_id], 1.0
+
+        weights = self._query_weights(normalized)
+        candidates = self._candidates(weights)
+        if not len(candidates):
+            return None, 0.0
+
+        scores = self._scores(candidates, weights)
+        best = int(np.argmax(scores))
+        score = float(scores[best])
+
+        if score < self.threshold:
+            return None, score
+        return self.payloads[int(candidates[best])], score
@@ -0,0 +1,167 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico com rótulos"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Histograma com buckets fixos, no formato do Prometheus"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [contagem por bucket..., +Inf], soma
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    @contextmanager
+    def time(self, *labels):
+        """Mede a duração do bloco e registra no histograma"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield (f'{self.name}_bucket',
+                       _format_labels(self.labelnames, labels, [('le', le)]), cumulative)
+            yield f'{self.name}_sum', _format_labels(self.labelnames, labels), total
+            yield f'{self.name}_count', _format_labels(self.labelnames, labels), cumulative
+
+
+class Registry:
+    """Conjunto de métricas exportadas em /metrics.
+
+    Os valores são mantidos por processo; com vários workers do gunicorn cada
+    coleta reflete o worker que atendeu a requisição.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._gauge_callbacks = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_callback(self, name, help_text, callback):
+        """Gauge calculado no momento da coleta (``callback`` devolve um número)"""
+        self._gauge_callbacks.append((name, help_text, callback))
+
+    def render(self):
+        """Texto no formato de exposição do Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+
+        for name, help_text, callback in self._gauge_callbacks:
+            try:
+                value = callback()
+            except Exception:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registro compartilhado pelo processo e métricas usadas pelos módulos
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    'hotel_http_request_duration_seconds', 'Latência das requisições HTTP por rota',
+    ('rota', 'metodo', 'status'))
+
+QUERY_STAGE_LATENCY = REGISTRY.histogram(
+    'hotel_query_stage_duration_seconds', 'Duração de cada etapa da execução das queries',
+    ('etapa',))
+
+INTENT_MATCHES = REGISTRY.counter(
+    'hotel_chatbot_intents_total', 'Perguntas respondidas pelo chatbot por resultado da busca',
+    ('resultado',))
+
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    'hotel_admission_rejected_total', 'Queries recusadas pelo controle de admissão por motivo',
+    ('motivo',))
+
+COALESCED_REQUESTS = REGISTRY.counter(
+    'hotel_coalesced_requests_total', 'Requisições atendidas pelo cálculo em andamento de outra requisição idêntica')
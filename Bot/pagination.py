@@ -0,0 +1,91 @@
+import base64
+import json
+
+# Limite padrão e máximo de linhas por página
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class PaginationError(ValueError):
+    """Parâmetros de paginação inválidos ou cursor expirado"""
+
+
+def encode_cursor(query_type, offset, limit, version):
+    """Gera um cursor opaco para a próxima página"""
+    payload = json.dumps({"t": query_type, "o": offset, "l": limit, "v": version},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def _as_int(value):
+    """Converte para inteiro; números não finitos (Infinity, NaN) ou com parte fracionária levantam ValueError"""
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"{value} não é um número inteiro")
+    return int(value)
+
+
+def decode_cursor(cursor):
+    """Lê um cursor gerado por encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        query_type, offset, limit, version = payload["t"], _as_int(payload["o"]), _as_int(payload["l"]), payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise PaginationError("Cursor inválido")
+    # Cursores são opacos, mas podem ser montados à mão: os valores passam pelos mesmos limites
+    if offset < 0 or not 1 <= limit <= MAX_LIMIT:
+        raise PaginationError("Cursor inválido")
+    return query_type, offset, limit, version
+
+
+def _int_at_least(value, field, minimum):
+    try:
+        number = _as_int(value)
+    except (TypeError, ValueError):
+        raise PaginationError(f"Campo '{field}' deve ser um número inteiro")
+    if number < minimum:
+        raise PaginationError(f"Campo '{field}' deve ser maior ou igual a {minimum}")
+    return number
+
+
+def read_page(data, query_type, version):
+    """Extrai (offset, limit) do corpo da requisição, ou None se não houver paginação.
+
+    Um cursor tem precedência sobre limit/offset e só vale para a mesma query
+    e a mesma versão dos dados em que foi gerado.
+    """
+    if data.get('cursor'):
+        cursor_type, offset, limit, cursor_version = decode_cursor(data['cursor'])
+        if cursor_type != query_type:
+            raise PaginationError("Cursor gerado para outro tipo de query")
+        if cursor_version != version:
+            raise PaginationError("Cursor expirado: os dados foram atualizados")
+        return offset, limit
+
+    if 'limit' not in data and 'offset' not in data:
+        return None
+
+    limit = _int_at_least(data.get('limit', DEFAULT_LIMIT), 'limit', 1)
+    offset = _int_at_least(data.get('offset', 0), 'offset', 0)
+    return offset, min(limit, MAX_LIMIT)
+
+
+def page_info(query_type, offset, limit, total, version):
+    """Metadados da página, com o cursor da próxima quando houver"""
+    next_offset = offset + limit
+    return {
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        # Só há próxima página se ela avança o offset
+        "proximo_cursor": encode_cursor(query_type, next_offset, limit, version) if offset < next_offset < total else None
+    }
+
+
+def iter_ndjson(series):
+    """Gera uma linha JSON por item do resultado, sem montar o documento inteiro"""
+    for label, value in series.items():
+        yield json.dumps({"rotulo": label, "valor": value.item() if hasattr(value, 'item') else value},
+                         ensure_ascii=False) + '\n'
@@ -0,0 +1,142 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Número de processos do executor paralelo; 1 executa tudo no próprio processo
+WORKERS = int(os.environ.get('HOTEL_QUERY_WORKERS', 1))
+
+# Abaixo deste total de linhas o custo de iniciar processos e copiar os dados
+# para a memória compartilhada supera o ganho, e a execução é serial
+MIN_PARALLEL_ROWS = 2_000_000
+
+# Linhas por partição. O tamanho não depende do número de processos, então as
+# partições (e a ordem em que os parciais são combinados) são sempre as mesmas
+PARTITION_ROWS = 250_000
+
+
+def _start_method():
+    # forkserver cria os processos a partir de um servidor sem threads, o que é
+    # seguro mesmo dentro de um worker do gunicorn com várias threads
+    methods = multiprocessing.get_all_start_methods()
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+class SharedArrays:
+    """Cópias de arrays numpy em memória compartilhada, lidas pelos processos
+    do pool sem serialização (apenas nome, tipo e tamanho são enviados)"""
+
+    def __init__(self):
+        self._blocks = {}
+
+    def share(self, array):
+        """Descritor (nome, dtype, tamanho) da cópia compartilhada do array"""
+        array = np.asarray(array)
+        # Arrays diferentes sobre a mesma memória (por exemplo, a mesma coluna
+        # pedida por duas tarefas) são copiados uma única vez
+        key = (array.__array_interface__['data'][0], array.shape, array.strides, array.dtype.str)
+        entry = self._blocks.get(key)
+        if entry is None:
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            # O array original é mantido para que o endereço não seja reaproveitado
+            entry = self._blocks[key] = (block, array)
+        return entry[0].name, array.dtype.str, array.shape
+
+    def close(self):
+        for block, _ in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _run_partition(function, descriptors, lo, hi, args):
+    """Executa ``function`` no processo do pool sobre os arrays compartilhados"""
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in descriptors]
+    try:
+        arrays = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+                  for block, (_, dtype, shape) in zip(blocks, descriptors)]
+        result = function(arrays, lo, hi, *args)
+        del arrays
+        return result
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class ParallelExecutor:
+    """Executa reduções sobre partições de linhas em um pool de processos.
+
+    Cada tarefa é (função, arrays, argumentos): os arrays são divididos em
+    partições de linhas e ``função(arrays, início, fim, *argumentos)`` é
+    chamada para cada partição. A função deve estar definida no nível de um
+    módulo e devolver dados próprios (nunca fatias dos arrays recebidos). As
+    partições de todas as tarefas são enviadas juntas ao pool, então tarefas
+    independentes (por exemplo, os três tipos de query) rodam ao mesmo tempo.
+
+    Com um único processo ou poucas linhas, tudo roda no próprio processo e
+    cada tarefa vira uma única partição.
+    """
+
+    def __init__(self, workers=WORKERS, min_rows=MIN_PARALLEL_ROWS, partition_rows=PARTITION_ROWS):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.min_rows = min_rows
+        self.partition_rows = partition_rows
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def parallel(self, rows):
+        """Indica se ``rows`` linhas no total são processadas em paralelo"""
+        return self.workers > 1 and rows >= self.min_rows
+
+    def partitions(self, rows):
+        """Intervalos [início, fim) das partições de uma tabela com ``rows`` linhas"""
+        return [(lo, min(lo + self.partition_rows, rows))
+                for lo in range(0, rows, self.partition_rows)] or [(0, 0)]
+
+    def _get_pool(self):
+        with self._lock:
+            # Um processo criado por fork (por exemplo, um worker do gunicorn)
+            # não pode usar o pool do processo pai
+            if self._pool is None or self._pool_pid != os.getpid():
+                context = multiprocessing.get_context(_start_method())
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def run(self, tasks):
+        """Lista, por tarefa, dos resultados de cada partição na ordem das linhas"""
+        tasks = [(function, [np.asarray(array) for array in arrays], tuple(args))
+                 for function, arrays, args in tasks]
+        rows = sum(len(arrays[0]) for _, arrays, _ in tasks)
+        if not self.parallel(rows):
+            return [[function(arrays, 0, len(arrays[0]), *args)] for function, arrays, args in tasks]
+
+        pool = self._get_pool()
+        with SharedArrays() as shared:
+            futures = []
+            for function, arrays, args in tasks:
+                descriptors = [shared.share(array) for array in arrays]
+                futures.append([pool.submit(_run_partition, function, descriptors, lo, hi, args)
+                                for lo, hi in self.partitions(len(arrays[0]))])
+            return [[future.result() for future in partials] for partials in futures]
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+
+
+# Instância compartilhada pelo processo (configurada por HOTEL_QUERY_WORKERS)
+EXECUTOR = ParallelExecutor()
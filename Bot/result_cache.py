@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def make_etag(query_type, params, version):
+    """ETag derivado da versão dos dados, do tipo de query e dos parâmetros"""
+    key = json.dumps([query_type, params], sort_keys=True, default=str)
+    return f"{version}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+
+class ResultCache:
+    """Cache LRU de respostas já serializadas, limitado por memória.
+
+    As chaves incluem a versão do conjunto de dados, então uma recarga da
+    planilha invalida naturalmente as entradas antigas, que saem pelo LRU.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_entries=4096):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        """Devolve o corpo guardado para a chave, ou None"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        """Guarda o corpo (bytes) e remove as entradas menos usadas se preciso"""
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+
+            self._entries[key] = body
+            self._bytes += len(body)
+
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        """Conta uma resposta 304 (requisição condicional sem recálculo)"""
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entradas": len(self._entries),
+                "bytes": self._bytes,
+                "limite_bytes": self.max_bytes,
+                "acertos": self.hits,
+                "falhas": self.misses,
+                "taxa_acerto": round(self.hits / lookups, 4) if lookups else 0.0,
+                "remocoes": self.evictions,
+                "respostas_304": self.not_modified
+            }
+
+
+# Instância compartilhada pelo processo
+RESULT_CACHE = ResultCache()
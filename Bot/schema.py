@@ -0,0 +1,277 @@
+import logging
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tipos declarados das colunas
+INT = 'int'            # inteiro com o menor tipo que comporta os valores
+FLOAT = 'float'        # float32 quando a conversão não perde nenhum valor
+MEASURE = 'measure'    # float64 sempre: valores somados pelas queries
+CATEGORY = 'category'  # texto com dicionário (poucos valores distintos)
+TEXT = 'text'          # texto livre, mantido como object
+DATETIME = 'datetime'
+
+ColumnSpec = namedtuple('ColumnSpec', 'kind nullable', defaults=(False,))
+TableSchema = namedtuple('TableSchema', 'columns primary_key foreign_keys', defaults=({},))
+
+_AUDIT = {
+    'created_at': ColumnSpec(DATETIME),
+    'updated_at': ColumnSpec(DATETIME),
+    'created_by': ColumnSpec(INT),
+    'updated_by': ColumnSpec(INT)
+}
+_AUDIT_FKS = {'created_by': ('user', 'user_id'), 'updated_by': ('user', 'user_id')}
+
+# Esquema declarado de cada aba da planilha
+SCHEMA = {
+    'user': TableSchema({
+        'user_id': ColumnSpec(INT),
+        'name': ColumnSpec(TEXT),
+        'email': ColumnSpec(TEXT),
+        'type': ColumnSpec(CATEGORY),
+        'phone': ColumnSpec(INT),
+        'password': ColumnSpec(TEXT),
+        'created_at': ColumnSpec(DATETIME),
+        'updated_at': ColumnSpec(DATETIME)
+    }, 'user_id'),
+    'address': TableSchema({
+        'address_id': ColumnSpec(INT),
+        'user_id': ColumnSpec(INT),
+        'country': ColumnSpec(CATEGORY),
+        'state': ColumnSpec(CATEGORY),
+        'city': ColumnSpec(CATEGORY),
+        'postal_code': ColumnSpec(INT),
+        'neighborhood': ColumnSpec(CATEGORY),
+        'street': ColumnSpec(CATEGORY),
+        'number': ColumnSpec(INT),
+        'complement': ColumnSpec(FLOAT, nullable=True),
+        **_AUDIT
+    }, 'address_id', {'user_id': ('user', 'user_id'), **_AUDIT_FKS}),
+    'seller': TableSchema({
+        'seller_id': ColumnSpec(INT),
+        'user_id': ColumnSpec(INT),
+        'hired_at': ColumnSpec(DATETIME),
+        'salary': ColumnSpec(INT),
+        'birth_date': ColumnSpec(DATETIME),
+        'gender': ColumnSpec(CATEGORY),
+        'created_at': ColumnSpec(DATETIME),
+        'updated_at': ColumnSpec(DATETIME)
+    }, 'seller_id', {'user_id': ('user', 'user_id')}),
+    'pet_owner': TableSchema({
+        'pet_owner_id': ColumnSpec(INT),
+        'user_id': ColumnSpec(INT),
+        'birth_date': ColumnSpec(DATETIME),
+        'gender': ColumnSpec(CATEGORY),
+        **_AUDIT
+    }, 'pet_owner_id', {'user_id': ('user', 'user_id'), **_AUDIT_FKS}),
+    'pet': TableSchema({
+        'pet_id': ColumnSpec(INT),
+        'user_id': ColumnSpec(INT),
+        'name': ColumnSpec(CATEGORY),
+        'weight': ColumnSpec(FLOAT),
+        'birth_date': ColumnSpec(DATETIME),
+        'pet_type_id': ColumnSpec(INT),
+        **_AUDIT
+    }, 'pet_id', {'user_id': ('user', 'user_id'), 'pet_type_id': ('pet_type', 'pet_type_id'), **_AUDIT_FKS}),
+    'pet_type': TableSchema({
+        'pet_type_id': ColumnSpec(INT),
+        'name': ColumnSpec(CATEGORY),
+        **_AUDIT
+    }, 'pet_type_id', _AUDIT_FKS),
+    'stay': TableSchema({
+        'stay_id': ColumnSpec(INT),
+        'pet_id': ColumnSpec(INT),
+        'check_in_date': ColumnSpec(DATETIME),
+        'check_in_hour': ColumnSpec(INT),
+        'check_out_date': ColumnSpec(DATETIME),
+        'check_out_hour': ColumnSpec(INT),
+        'payment_method': ColumnSpec(INT),
+        'stay_cost': ColumnSpec(MEASURE),
+        **_AUDIT
+    }, 'stay_id', {
+        'pet_id': ('pet', 'pet_id'),
+        'payment_method': ('payment_method_type', 'payment_method_type_id'),
+        **_AUDIT_FKS
+    }),
+    'product': TableSchema({
+        'product_id': ColumnSpec(INT),
+        'name': ColumnSpec(CATEGORY),
+        'brand': ColumnSpec(CATEGORY),
+        'type': ColumnSpec(CATEGORY),
+        **_AUDIT
+    }, 'product_id', _AUDIT_FKS),
+    'purchase': TableSchema({
+        'purchase_id': ColumnSpec(INT),
+        'product_id': ColumnSpec(INT),
+        'price': ColumnSpec(MEASURE),
+        'cost': ColumnSpec(MEASURE),
+        'quantity': ColumnSpec(INT),
+        'total_value': ColumnSpec(MEASURE),
+        'payment_method': ColumnSpec(INT),
+        **_AUDIT
+    }, 'purchase_id', {
+        'product_id': ('product', 'product_id'),
+        'payment_method': ('payment_method_type', 'payment_method_type_id'),
+        **_AUDIT_FKS
+    }),
+    'payment_method_type': TableSchema({
+        'payment_method_type_id': ColumnSpec(INT),
+        'nome': ColumnSpec(CATEGORY),
+        **_AUDIT
+    }, 'payment_method_type_id', _AUDIT_FKS)
+}
+
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def narrowest_int(values):
+    """Menor tipo inteiro com sinal que comporta todos os valores"""
+    if not len(values):
+        return np.dtype(np.int64)
+    low, high = values.min(), values.max()
+    for dtype in _INT_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _convert(series, spec, column):
+    """Converte a coluna para o tipo declarado; devolve (coluna, violações)"""
+    violations = []
+    missing = series.isna()
+    if missing.any() and not spec.nullable:
+        violations.append(f"{column}: {int(missing.sum())} valores ausentes em coluna obrigatória")
+
+    if spec.kind in (CATEGORY, TEXT):
+        if spec.kind == TEXT or isinstance(series.dtype, pd.CategoricalDtype):
+            return series, violations
+        text = series.where(missing, series.astype(str))
+        return text.astype('category'), violations
+
+    if spec.kind == DATETIME:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series, violations
+        parsed = pd.to_datetime(series, errors='coerce')
+        invalid = int((parsed.isna() & ~missing).sum())
+        if invalid:
+            violations.append(f"{column}: {invalid} datas inválidas")
+            return series, violations
+        return parsed, violations
+
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        numeric = pd.to_numeric(series, errors='coerce')
+        invalid = int((numeric.isna() & ~missing).sum())
+        if invalid:
+            violations.append(f"{column}: {invalid} valores não numéricos")
+            return series, violations
+        series = numeric
+
+    values = series.to_numpy()
+    if spec.kind == INT:
+        if missing.any():
+            # Inteiros com ausentes continuam como float64 (NaN)
+            return series.astype(np.float64), violations
+        if values.dtype.kind == 'f' and not np.array_equal(values, np.round(values)):
+            violations.append(f"{column}: valores com casas decimais em coluna inteira")
+            return series, violations
+        dtype = narrowest_int(values)
+        return (series if values.dtype == dtype else series.astype(dtype)), violations
+
+    if spec.kind == FLOAT:
+        if values.dtype == np.float32:
+            return series, violations
+        values = values.astype(np.float64, copy=False)
+        compact = values.astype(np.float32)
+        if np.array_equal(compact.astype(np.float64), values, equal_nan=True):
+            return pd.Series(compact, index=series.index, name=series.name), violations
+
+    return (series if values.dtype == np.float64 else series.astype(np.float64)), violations
+
+
+def apply_schema(sheet, df, partial=False):
+    """Converte a tabela para os tipos declarados; devolve (tabela, violações).
+
+    Colunas que não podem ser convertidas sem perda são mantidas como vieram e
+    a violação é registrada; colunas não declaradas são preservadas. Com
+    ``partial``, a tabela pode trazer apenas parte das colunas declaradas.
+    """
+    table = SCHEMA.get(sheet)
+    if table is None:
+        return df, []
+
+    violations = []
+    columns = {}
+    for column in df.columns:
+        spec = table.columns.get(column)
+        if spec is None:
+            violations.append(f"{sheet}.{column}: coluna não declarada no esquema")
+            columns[column] = df[column]
+            continue
+        columns[column], problems = _convert(df[column], spec, f"{sheet}.{column}")
+        violations.extend(problems)
+
+    for column in () if partial else table.columns:
+        if column not in df.columns:
+            violations.append(f"{sheet}.{column}: coluna ausente")
+
+    if table.primary_key in df.columns and not df[table.primary_key].is_unique:
+        violations.append(f"{sheet}.{table.primary_key}: chave primária com valores repetidos")
+
+    return pd.DataFrame(columns, index=df.index, copy=False), violations
+
+
+def check_foreign_keys(frames):
+    """Lista as chaves estrangeiras sem correspondência na tabela referenciada"""
+    violations = []
+    for sheet, table in SCHEMA.items():
+        df = frames.get(sheet)
+        if df is None:
+            continue
+        for column, (parent, parent_column) in table.foreign_keys.items():
+            if parent not in frames or column not in df or parent_column not in frames[parent]:
+                continue
+            values = df[column].dropna()
+            orphans = int((~values.isin(frames[parent][parent_column])).sum())
+            if orphans:
+                violations.append(
+                    f"{sheet}.{column}: {orphans} valores sem correspondência em {parent}.{parent_column}")
+    return violations
+
+
+def apply_all(tables):
+    """Aplica o esquema a todas as tabelas e registra as violações encontradas"""
+    frames, violations = {}, []
+    for sheet, df in tables:
+        frames[sheet], problems = apply_schema(sheet, df)
+        violations.extend(problems)
+    violations.extend(check_foreign_keys(frames))
+
+    log_violations(violations)
+    return frames, violations
+
+
+def log_violations(violations):
+    for violation in violations:
+        logger.warning("Violação do esquema: %s", violation)
+
+
+def memory_report(frames):
+    """Memória ocupada por tabela e por coluna, com o tipo de cada coluna"""
+    tables = {}
+    for sheet, df in frames.items():
+        usage = df.memory_usage(deep=True, index=False)
+        tables[sheet] = {
+            "linhas": len(df),
+            "bytes": int(usage.sum()),
+            "colunas": {str(column): {"tipo": str(df[column].dtype), "bytes": int(usage[column])}
+                        for column in df.columns}
+        }
+    return {
+        "bytes_total": sum(table["bytes"] for table in tables.values()),
+        "tabelas": tables
+    }
+
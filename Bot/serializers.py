@@ -0,0 +1,152 @@
+import json
+from functools import lru_cache
+
+JSON_MIMETYPE = 'application/json'
+COLUMNAR_MIMETYPE = 'application/vnd.hotel.columnar+json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+class NotAcceptable(ValueError):
+    """Formato pedido no Accept não disponível neste servidor"""
+
+
+@lru_cache(maxsize=None)
+def _pyarrow():
+    """pyarrow é opcional e só é importado quando o formato Arrow é pedido"""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _plain(envelope, name, value):
+    return {**envelope, name: value}
+
+
+class JSONSerializer:
+    """Formato original: o resultado é um objeto {rótulo: valor}.
+
+    Serializa como o jsonify do Flask (chaves ordenadas, ASCII, sem espaços e
+    com quebra de linha no fim), então o corpo é byte a byte o de antes da
+    negociação de formato.
+    """
+
+    name = 'json'
+    mimetype = JSON_MIMETYPE
+
+    def encode_result(self, result):
+        return result.to_dict()
+
+    def dumps(self, payload):
+        return (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+    def query(self, envelope, result):
+        """Corpo de uma query: o envelope com o resultado em ``resultado``"""
+        return self.dumps(_plain(envelope, "resultado", self.encode_result(result)))
+
+    def batch(self, envelope, items):
+        """Corpo de um lote; ``items`` traz a Series em ``resultado`` quando há sucesso"""
+        resultados = [_plain(item, "resultado", self.encode_result(item["resultado"]))
+                      if "resultado" in item else item
+                      for item in items]
+        return self.dumps(_plain(envelope, "resultados", resultados))
+
+
+class ColumnarSerializer(JSONSerializer):
+    """JSON colunar: ``{"labels": [...], "values": [...]}`` na ordem do resultado.
+
+    As duas listas saem da Series com tolist(), sem criar um objeto por linha,
+    e o documento é escrito sem espaços nem ordenação de chaves.
+    """
+
+    name = 'colunar'
+    mimetype = COLUMNAR_MIMETYPE
+
+    def encode_result(self, result):
+        return {"labels": result.index.tolist(), "values": result.tolist()}
+
+    def dumps(self, payload):
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class ArrowSerializer:
+    """Arrow IPC (stream) com as colunas ``rotulo`` e ``valor``.
+
+    Os demais campos do envelope vão como JSON nos metadados do esquema, na
+    chave ``envelope``. Em um lote, os resultados ficam empilhados em uma
+    tabela longa com a coluna ``tipo_query``; como o esquema é único, os
+    rótulos viram texto e os valores float64, e os itens com erro vão nos
+    metadados.
+    """
+
+    name = 'arrow'
+    mimetype = ARROW_MIMETYPE
+
+    def __init__(self, pyarrow):
+        self.pa = pyarrow
+
+    def _write(self, table, envelope):
+        table = table.replace_schema_metadata({
+            'envelope': json.dumps(envelope, ensure_ascii=False)
+        })
+        sink = self.pa.BufferOutputStream()
+        with self.pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def query(self, envelope, result):
+        table = self.pa.table({
+            'rotulo': self.pa.array(result.index.to_numpy()),
+            'valor': self.pa.array(result.to_numpy())
+        })
+        return self._write(table, envelope)
+
+    def batch(self, envelope, items):
+        query_types, labels, values, errors = [], [], [], []
+        for position, item in enumerate(items):
+            if "resultado" not in item:
+                errors.append({"posicao": position, **item})
+                continue
+            result = item["resultado"]
+            query_types.extend([item["tipo_query"]] * len(result))
+            labels.extend(str(label) for label in result.index.tolist())
+            values.extend(float(value) for value in result.tolist())
+
+        table = self.pa.table({
+            'tipo_query': self.pa.array(query_types, type=self.pa.string()),
+            'rotulo': self.pa.array(labels, type=self.pa.string()),
+            'valor': self.pa.array(values, type=self.pa.float64())
+        })
+        return self._write(table, _plain(envelope, "erros", errors))
+
+
+JSON = JSONSerializer()
+COLUMNAR = ColumnarSerializer()
+
+
+def negotiate(accept):
+    """Serializador para o cabeçalho Accept (um MIMEAccept do werkzeug).
+
+    Sem Accept, com ``*/*`` ou com tipos que nenhum serializador produz, a
+    resposta mantém o JSON original. Levanta NotAcceptable quando o Arrow é
+    pedido e o pyarrow não está instalado.
+    """
+    if not accept:
+        return JSON
+
+    # O Arrow só é oferecido a quem o pede explicitamente (e se houver pyarrow)
+    arrow_requested = ARROW_MIMETYPE in accept.values()
+    pyarrow = _pyarrow() if arrow_requested else None
+    offered = [JSON_MIMETYPE, COLUMNAR_MIMETYPE] + ([ARROW_MIMETYPE] if pyarrow is not None else [])
+
+    best = accept.best_match(offered)
+    if best == ARROW_MIMETYPE:
+        return ArrowSerializer(pyarrow)
+    if best == COLUMNAR_MIMETYPE:
+        return COLUMNAR
+    if best is None and arrow_requested:
+        raise NotAcceptable(f"Formato {ARROW_MIMETYPE} indisponível: instale o pyarrow "
+                            f"ou use {JSON_MIMETYPE} ou {COLUMNAR_MIMETYPE}")
+    return JSON
@@ -1,27 +1,276 @@
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import colstore
+from aggregates import AGGREGATE_SPECS, label_totals, query_totals
+from parallel import ParallelExecutor
+from schema import apply_schema
 
 excel_file = 'flask/Conjuntodedados.xlsx'
-xls = pd.ExcelFile(excel_file)
-
-# Carregar os DataFrames
-pet_df = pd.read_excel(xls, 'pet')
-stay_df = pd.read_excel(xls, 'stay')
-product_df = pd.read_excel(xls, 'product')
-purchase_df = pd.read_excel(xls, 'purchase')
-payment_method_type_df = pd.read_excel(xls, 'payment_method_type')
-
-print("\n--- Simulação da Query 1: Total de vendas de produtos por tipo de pagamento ---")
-merged_purchase_payment = pd.merge(purchase_df, payment_method_type_df, left_on='payment_method', right_on='payment_method_type_id', how='left')
-payment_sales = merged_purchase_payment.groupby('nome')['total_value'].sum().sort_values(ascending=False)
-print(payment_sales)
-
-print("\n--- Simulação da Query 2: Produtos mais vendidos em termos de quantidade ---")
-merged_purchase_product = pd.merge(purchase_df, product_df, left_on='product_id', right_on='product_id', how='left')
-product_quantity = merged_purchase_product.groupby('name')['quantity'].sum().sort_values(ascending=False)
-print(product_quantity)
-
-print("\n--- Simulação da Query 3: Custo total das estadias por pet ---")
-merged_stay_pet = pd.merge(stay_df, pet_df, left_on='pet_id', right_on='pet_id', how='left')
-pet_stay_cost = merged_stay_pet.groupby('name')['stay_cost'].sum().sort_values(ascending=False)
-print(pet_stay_cost)
 
+# Colunas usadas pelas três queries em cada tabela
+COLUNAS = {
+    'pet': ['pet_id', 'name'],
+    'stay': ['pet_id', 'stay_cost'],
+    'product': ['product_id', 'name'],
+    'purchase': ['product_id', 'quantity', 'total_value', 'payment_method'],
+    'payment_method_type': ['payment_method_type_id', 'nome']
+}
+
+# Tabelas fato (lidas em blocos no modo em blocos) e dimensões (sempre inteiras na memória)
+FATOS = ('purchase', 'stay')
+DIMENSOES = ('pet', 'product', 'payment_method_type')
+
+# Linhas por bloco no modo em blocos
+TAMANHO_BLOCO = 100_000
+
+# As três queries: título, tabela fato, chave estrangeira, coluna somada,
+# dimensão, chave da dimensão e coluna do rótulo
+Consulta = namedtuple('Consulta', 'titulo fato chave valor dimensao chave_dimensao rotulo')
+
+CONSULTAS = {
+    'vendas_por_pagamento': Consulta(
+        "Simulação da Query 1: Total de vendas de produtos por tipo de pagamento",
+        'purchase', 'payment_method', 'total_value', 'payment_method_type', 'payment_method_type_id', 'nome'),
+    'produtos_mais_vendidos': Consulta(
+        "Simulação da Query 2: Produtos mais vendidos em termos de quantidade",
+        'purchase', 'product_id', 'quantity', 'product', 'product_id', 'name'),
+    'estadias_por_pet': Consulta(
+        "Simulação da Query 3: Custo total das estadias por pet",
+        'stay', 'pet_id', 'stay_cost', 'pet', 'pet_id', 'name')
+}
+
+def carregar_tabelas(excel_file=excel_file, store_dir=colstore.STORE_DIR, tabelas=None):
+    """Carrega as tabelas do armazenamento colunar (se atualizado) ou da planilha"""
+    colunas_por_tabela = {tabela: COLUNAS[tabela] for tabela in (tabelas or COLUNAS)}
+    if colstore.is_fresh(excel_file, store_dir):
+        return {tabela: colstore.load_table(tabela, colunas, store_dir)
+                for tabela, colunas in colunas_por_tabela.items()}
+
+    xls = pd.ExcelFile(excel_file)
+    return {tabela: apply_schema(tabela, pd.read_excel(xls, tabela, usecols=colunas), partial=True)[0]
+            for tabela, colunas in colunas_por_tabela.items()}
+
+def executar_em_memoria(tabelas):
+    """Executa as três queries com merge + groupby sobre as tabelas inteiras"""
+    resultados = {}
+    for nome, consulta in CONSULTAS.items():
+        merged = pd.merge(tabelas[consulta.fato], tabelas[consulta.dimensao],
+                          left_on=consulta.chave, right_on=consulta.chave_dimensao, how='left')
+        resultados[nome] = merged.groupby(consulta.rotulo, observed=True)[consulta.valor].sum().sort_values(ascending=False)
+    return resultados
+
+def executar_em_paralelo(tabelas, executor):
+    """Executa as três queries em partições de linhas das tabelas fato, em paralelo.
+
+    Os totais por chave de cada partição são calculados nos processos do
+    executor e combinados; os rótulos vêm das dimensões, como no merge. Somas
+    de ponto flutuante podem diferir do modo em memória nos últimos bits.
+    """
+    totais = query_totals(tabelas, {nome: AGGREGATE_SPECS[nome] for nome in CONSULTAS}, executor)
+    resultados = {}
+    for nome, (chaves, somas, _) in totais.items():
+        spec = AGGREGATE_SPECS[nome]
+        tipo = np.int64 if tabelas[spec.fact][spec.value].dtype.kind in 'iub' else np.float64
+        resultados[nome] = label_totals(tabelas, spec, pd.Series(somas, index=chaves, dtype=tipo))
+    return resultados
+
+def _blocos_planilha(excel_file, tabela, colunas, tamanho_bloco):
+    """Lê uma aba da planilha em blocos, sem carregar a aba inteira"""
+    workbook = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        linhas = workbook[tabela].iter_rows(values_only=True)
+        cabecalho = list(next(linhas, ()))
+        posicoes = [cabecalho.index(coluna) for coluna in colunas]
+
+        bloco = []
+        for linha in linhas:
+            if all(valor is None for valor in linha):
+                continue
+            bloco.append([linha[posicao] if posicao < len(linha) else None for posicao in posicoes])
+            if len(bloco) == tamanho_bloco:
+                yield apply_schema(tabela, pd.DataFrame(bloco, columns=colunas), partial=True)[0]
+                bloco = []
+        if bloco:
+            yield apply_schema(tabela, pd.DataFrame(bloco, columns=colunas), partial=True)[0]
+    finally:
+        workbook.close()
+
+def ler_blocos(tabela, excel_file=excel_file, store_dir=colstore.STORE_DIR, tamanho_bloco=TAMANHO_BLOCO):
+    """Blocos de no máximo ``tamanho_bloco`` linhas de uma tabela, na ordem das linhas.
+
+    Com o armazenamento colunar atualizado, cada bloco é uma fatia das colunas
+    abertas com memory mapping: só as páginas do bloco são lidas do disco.
+    Sem ele, a aba é percorrida linha a linha pelo modo somente leitura do
+    openpyxl.
+    """
+    colunas = COLUNAS[tabela]
+    if colstore.is_fresh(excel_file, store_dir):
+        dados = colstore.load_table(tabela, colunas, store_dir)
+        for inicio in range(0, len(dados), tamanho_bloco):
+            yield dados.iloc[inicio:inicio + tamanho_bloco]
+        return
+
+    yield from _blocos_planilha(excel_file, tabela, colunas, tamanho_bloco)
+
+class SomaPorRotulo:
+    """Agregado parcial de uma query: soma e contagem de linhas por código do rótulo.
+
+    Os blocos são acumulados na ordem das linhas. Somas de inteiros são exatas
+    em int64. Somas de ponto flutuante guardam, além da soma, a compensação da
+    soma de Kahan de cada rótulo, e cada bloco continua a soma de onde o
+    anterior parou: o resultado é o mesmo, bit a bit, do groupby do pandas
+    sobre a tabela inteira, qualquer que seja o tamanho do bloco.
+    """
+
+    def __init__(self, tamanho):
+        self.contagens = np.zeros(tamanho, dtype=np.int64)
+        self.inteiros = np.zeros(tamanho, dtype=np.int64)
+        self.tipo_inteiro = None
+        self.somas = None
+        self.compensacoes = None
+
+    def _para_float(self):
+        """Passa a acumular em ponto flutuante (a soma de inteiros é exata em float64)"""
+        self.somas = self.inteiros.astype(np.float64).tolist()
+        self.compensacoes = [0.0] * len(self.somas)
+
+    def acumular(self, codigos, valores):
+        """Acrescenta as linhas de um bloco (códigos -1, sem rótulo, são ignorados)"""
+        presentes = codigos >= 0
+        codigos, valores = codigos[presentes], valores[presentes]
+        self.contagens += np.bincount(codigos, minlength=len(self.contagens))
+
+        if valores.dtype.kind in 'iu' and self.somas is None:
+            tipo = valores.dtype
+            self.tipo_inteiro = tipo if self.tipo_inteiro is None else np.promote_types(self.tipo_inteiro, tipo)
+            np.add.at(self.inteiros, codigos, valores.astype(np.int64))
+            return
+
+        if self.somas is None:
+            self._para_float()
+        somas, compensacoes = self.somas, self.compensacoes
+        for codigo, valor in zip(codigos.tolist(), valores.astype(np.float64).tolist()):
+            if valor != valor:
+                continue
+            y = valor - compensacoes[codigo]
+            anterior = somas[codigo]
+            soma = anterior + y
+            compensacao = (soma - anterior) - y
+            # Como no pandas: compensação indefinida (somas infinitas) volta a zero
+            compensacoes[codigo] = compensacao if compensacao == compensacao else 0.0
+            somas[codigo] = soma
+
+    def resultado(self, rotulos, nome_rotulo, nome_valor):
+        """Series por rótulo observado (``rotulos`` é o Categorical da dimensão),
+        do maior para o menor, como no groupby"""
+        observados = np.flatnonzero(self.contagens)
+        if self.somas is None:
+            somas = self.inteiros[observados]
+            # Como no groupby: o total volta ao tipo da coluna quando cabe nele
+            limites = np.iinfo(self.tipo_inteiro or np.int64)
+            if len(somas) and limites.min <= somas.min() and somas.max() <= limites.max:
+                somas = somas.astype(self.tipo_inteiro or np.int64)
+        else:
+            somas = np.array(self.somas, dtype=np.float64)[observados]
+        indice = pd.CategoricalIndex(pd.Categorical.from_codes(observados, dtype=rotulos.dtype), name=nome_rotulo)
+        serie = pd.Series(somas, index=indice, name=nome_valor)
+        return serie.sort_values(ascending=False)
+
+def _codigos_rotulo(dimensao, consulta):
+    """Rótulos da dimensão como Categorical e a busca chave -> código do rótulo"""
+    dimensao = dimensao[~dimensao[consulta.chave_dimensao].duplicated()]
+    coluna = dimensao[consulta.rotulo]
+    rotulos = coluna.array if isinstance(coluna.dtype, pd.CategoricalDtype) else pd.Categorical(coluna)
+    # Posição extra no fim para chaves sem correspondência na dimensão
+    codigos = np.append(np.asarray(rotulos.codes, dtype=np.int64), -1)
+    return rotulos, pd.Index(dimensao[consulta.chave_dimensao].to_numpy()), codigos
+
+def executar_em_blocos(excel_file=excel_file, store_dir=colstore.STORE_DIR, tamanho_bloco=TAMANHO_BLOCO):
+    """Executa as três queries lendo as tabelas fato em blocos.
+
+    As dimensões ficam inteiras na memória como tabelas de busca; cada tabela
+    fato é percorrida uma única vez e cada bloco é reduzido aos agregados
+    parciais de todas as queries que a usam. A memória de pico depende do
+    tamanho do bloco e das dimensões, não do tamanho das tabelas fato.
+    Devolve (resultados, estatísticas de linhas e tempo).
+    """
+    inicio = time.perf_counter()
+    dimensoes = carregar_tabelas(excel_file, store_dir, DIMENSOES)
+
+    buscas, parciais = {}, {}
+    for nome, consulta in CONSULTAS.items():
+        buscas[nome] = _codigos_rotulo(dimensoes[consulta.dimensao], consulta)
+        parciais[nome] = SomaPorRotulo(len(buscas[nome][0].categories))
+
+    linhas, blocos = 0, 0
+    for fato in FATOS:
+        consultas = [nome for nome, consulta in CONSULTAS.items() if consulta.fato == fato]
+        for bloco in ler_blocos(fato, excel_file, store_dir, tamanho_bloco):
+            for nome in consultas:
+                consulta = CONSULTAS[nome]
+                _, chaves, codigos = buscas[nome]
+                posicoes = chaves.get_indexer(bloco[consulta.chave].to_numpy())
+                parciais[nome].acumular(codigos[posicoes], bloco[consulta.valor].to_numpy())
+            linhas += len(bloco)
+            blocos += 1
+
+    resultados = {}
+    for nome, consulta in CONSULTAS.items():
+        rotulos = buscas[nome][0]
+        resultados[nome] = parciais[nome].resultado(rotulos, consulta.rotulo, consulta.valor)
+
+    segundos = time.perf_counter() - inicio
+    return resultados, {
+        "linhas": linhas,
+        "blocos": blocos,
+        "segundos": segundos,
+        "linhas_por_segundo": linhas / segundos if segundos else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula as queries SQL do hotel com Pandas")
+    parser.add_argument('--planilha', default=excel_file, help="Arquivo .xlsx de origem")
+    parser.add_argument('--armazenamento', default=colstore.STORE_DIR, help="Diretório do armazenamento colunar")
+    parser.add_argument('--modo', choices=('memoria', 'blocos', 'paralelo'), default='memoria',
+                        help="'memoria' carrega as tabelas inteiras; 'blocos' lê as tabelas fato em blocos; "
+                             "'paralelo' agrega partições das tabelas fato em vários processos")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO, help="Linhas por bloco no modo em blocos")
+    parser.add_argument('--processos', type=int, default=0,
+                        help="Processos do modo paralelo (padrão: número de CPUs)")
+    args = parser.parse_args()
+
+    if args.modo == 'blocos':
+        resultados, estatisticas = executar_em_blocos(args.planilha, args.armazenamento, args.tamanho_bloco)
+    else:
+        inicio = time.perf_counter()
+        tabelas = carregar_tabelas(args.planilha, args.armazenamento)
+        if args.modo == 'paralelo':
+            executor = ParallelExecutor(args.processos)
+            resultados = executar_em_paralelo(tabelas, executor)
+            executor.close()
+        else:
+            resultados = executar_em_memoria(tabelas)
+        segundos = time.perf_counter() - inicio
+        linhas = sum(len(tabelas[fato]) for fato in FATOS)
+        estatisticas = {"linhas": linhas, "segundos": segundos,
+                        "linhas_por_segundo": linhas / segundos if segundos else 0.0}
+
+    for nome, consulta in CONSULTAS.items():
+        print(f"\n--- {consulta.titulo} ---")
+        print(resultados[nome])
+
+    print(f"\n{estatisticas['linhas']} linhas das tabelas fato em {estatisticas['segundos']:.2f}s "
+          f"({estatisticas['linhas_por_segundo']:,.0f} linhas/s)")
+
+if __name__ == "__main__":
+    main()
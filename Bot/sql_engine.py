@@ -0,0 +1,132 @@
+import itertools
+import os
+import queue
+import sqlite3
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dataset_cache import DATASET
+
+# Índices nas chaves de junção. As colunas agregadas entram no índice para que
+# os JOIN + GROUP BY do catálogo sejam respondidos sem ler a tabela inteira.
+INDEXES = {
+    'purchase': [('payment_method', 'total_value'), ('product_id', 'quantity')],
+    'stay': [('pet_id', 'stay_cost'), ('payment_method', 'stay_cost')],
+    'payment_method_type': [('payment_method_type_id', 'nome')],
+    'product': [('product_id', 'name')],
+    'pet': [('pet_id', 'name')]
+}
+
+# Operações permitidas nas conexões de leitura
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION}
+
+_database_ids = itertools.count()
+
+
+def _read_only(action, arg1, arg2, db_name, trigger):
+    """Autorizador do sqlite3 que só permite leituras"""
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+class _Database:
+    """Banco SQLite em memória construído a partir de um snapshot do conjunto de dados"""
+
+    def __init__(self, snapshot, cached_statements):
+        self.version = snapshot.version
+        self.uri = f"file:hotel_{snapshot.version}_{next(_database_ids)}?mode=memory&cache=shared"
+        self.cached_statements = cached_statements
+        self._idle = queue.SimpleQueue()
+        self._closed = False
+
+        # A conexão de carga mantém o banco vivo enquanto esta versão estiver em uso
+        self._keeper = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        for sheet, df in snapshot.frames.items():
+            df.to_sql(sheet, self._keeper, index=False)
+            for position, columns in enumerate(INDEXES.get(sheet, [])):
+                column_list = ', '.join(f'"{column}"' for column in columns)
+                self._keeper.execute(f'CREATE INDEX "idx_{sheet}_{position}" ON "{sheet}" ({column_list})')
+        self._keeper.execute('ANALYZE')
+        self._keeper.commit()
+
+    def acquire(self):
+        """Pega uma conexão ociosa do pool ou abre uma nova"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False,
+                                     cached_statements=self.cached_statements)
+        connection.execute('PRAGMA query_only = ON')
+        connection.set_authorizer(_read_only)
+        return connection
+
+    def release(self, connection):
+        """Devolve a conexão (e seus statements preparados) ao pool"""
+        if self._closed:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    def close(self):
+        """Fecha as conexões ociosas; o banco é liberado quando a última fecha"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._keeper.close()
+
+
+class SQLEngine:
+    """Executa as queries SQL do chatbot sobre um SQLite em memória indexado.
+
+    O banco é reconstruído quando a versão do conjunto de dados muda. Cada
+    conexão do pool mantém seu próprio cache de statements preparados, de modo
+    que queries repetidas do catálogo não são compiladas novamente.
+    """
+
+    def __init__(self, dataset=DATASET, cached_statements=256):
+        self.dataset = dataset
+        self.cached_statements = cached_statements
+        self._database = None
+        self._lock = threading.Lock()
+
+    def _current_database(self):
+        """Devolve o banco da versão atual do conjunto de dados, construindo-o se preciso"""
+        snapshot = self.dataset.get()
+        database = self._database
+        if database is not None and database.version == snapshot.version:
+            return database
+
+        with self._lock:
+            if self._database is None or self._database.version != snapshot.version:
+                old = self._database
+                self._database = _Database(snapshot, self.cached_statements)
+                if old is not None:
+                    old.close()
+            return self._database
+
+    def execute(self, sql, params=()):
+        """Executa uma query somente leitura e devolve (colunas, linhas)"""
+        database = self._current_database()
+        connection = database.acquire()
+        try:
+            cursor = connection.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+        finally:
+            database.release(connection)
+        return columns, rows
+
+    def explain(self, sql, params=()):
+        """Plano de execução da query (usado para verificar o uso dos índices)"""
+        _, rows = self.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in rows]
+
+
+# Instância compartilhada pelo processo
+SQL_ENGINE = SQLEngine()
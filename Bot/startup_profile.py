@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Tempo máximo (segundos) entre o fim da importação do Flask e a primeira
+# resposta do /health, acima do qual o relatório aponta uma regressão
+DEFAULT_LIMIT = 0.15
+
+DEFAULT_RUNS = 5
+TOP_IMPORTS = 15
+
+# Executado em um interpretador novo a cada rodada: mede a importação do
+# framework, da aplicação e a primeira resposta de cada tipo de rota
+_PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+import flask, flask_cors
+framework = time.perf_counter()
+import chatbot_api
+imported = time.perf_counter()
+client = chatbot_api.app.test_client()
+assert client.get('/health').status_code == 200
+health = time.perf_counter()
+pandas_health = 'pandas' in sys.modules
+client.post('/chat', json={'pergunta': 'Quais são os produtos mais vendidos?'})
+chat = time.perf_counter()
+pandas_chat = 'pandas' in sys.modules
+client.post('/execute-query', json={'tipo_query': 'produtos_mais_vendidos'})
+query = time.perf_counter()
+print(json.dumps({
+    "framework_s": framework - start,
+    "importacao_app_s": imported - framework,
+    "primeiro_health_s": health - imported,
+    "primeira_resposta_saudavel_s": health - framework,
+    "primeiro_chat_s": chat - health,
+    "primeira_query_s": query - chat,
+    "pandas_apos_health": pandas_health,
+    "pandas_apos_chat": pandas_chat,
+    "pilha_dados": chatbot_api.DATA.stats()
+}))
+'''
+
+
+def _environment():
+    env = dict(os.environ, HOTEL_STARTUP='lazy')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [BOT_DIR, env.get('PYTHONPATH')]))
+    return env
+
+
+def probe():
+    """Mede o início a frio em um processo novo e devolve os tempos da rodada"""
+    output = subprocess.run([sys.executable, '-c', _PROBE], cwd=BOT_DIR, env=_environment(),
+                            capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def import_times(module='chatbot_api', top=TOP_IMPORTS):
+    """Módulos mais caros da importação (tempo acumulado, -X importtime)"""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=BOT_DIR,
+                            env=_environment(), capture_output=True, text=True, check=True)
+    times = []
+    for line in output.stderr.splitlines():
+        # Formato: "import time: <próprio us> | <acumulado us> | <módulo>"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|', 2)
+        times.append({"modulo": name.strip(), "proprio_s": int(own) / 1e6, "acumulado_s": int(cumulative) / 1e6})
+    times.sort(key=lambda item: item["acumulado_s"], reverse=True)
+    return times[:top]
+
+
+def run(runs=DEFAULT_RUNS):
+    """Relatório com a mediana e o máximo de cada medida em ``runs`` processos"""
+    rounds = [probe() for _ in range(runs)]
+    timings = {}
+    for name in rounds[0]:
+        if name.endswith('_s'):
+            values = [r[name] for r in rounds]
+            timings[name] = {"mediana_s": statistics.median(values), "maximo_s": max(values)}
+    return {
+        "python": platform.python_version(),
+        "rodadas": runs,
+        "resultados": timings,
+        "pandas_apos_health": any(r["pandas_apos_health"] for r in rounds),
+        "pandas_apos_chat": any(r["pandas_apos_chat"] for r in rounds),
+        "pilha_dados": rounds[-1]["pilha_dados"],
+        "importacoes": import_times()
+    }
+
+
+def check(report, limit=DEFAULT_LIMIT):
+    """Lista os problemas do relatório: pandas importado cedo ou /health lento"""
+    problems = []
+    if report["pandas_apos_health"] or report["pandas_apos_chat"]:
+        problems.append("pandas importado antes da primeira consulta de dados")
+    healthy = report["resultados"]["primeira_resposta_saudavel_s"]["mediana_s"]
+    if healthy > limit:
+        problems.append(f"primeira resposta do /health em {healthy * 1000:.1f} ms (limite {limit * 1000:.0f} ms)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação e de início a frio da API")
+    parser.add_argument('--rodadas', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--limite', type=float, default=DEFAULT_LIMIT,
+                        help="Segundos aceitos entre o Flask importado e a primeira resposta do /health")
+    parser.add_argument('--saida', help="Arquivo JSON com o relatório")
+    args = parser.parse_args()
+
+    report = run(args.rodadas)
+    for name, timing in report["resultados"].items():
+        print(f"{name:32s} {timing['mediana_s'] * 1000:10.2f} ms (máx. {timing['maximo_s'] * 1000:.2f} ms)")
+    print("\nImportações mais caras de chatbot_api:")
+    for item in report["importacoes"]:
+        print(f"{item['modulo']:40s} {item['acumulado_s'] * 1000:10.2f} ms")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    problems = check(report, args.limite)
+    for problem in problems:
+        print(f"PROBLEMA: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dataset_cache import SHEETS, DatasetSnapshot, _freeze_all
+from schema import apply_all
+
+# Linhas de cada tabela na escala 1 (tabelas de domínio fixas não escalam)
+ROWS_AT_SCALE_1 = {
+    'user': 20_000,
+    'seller': 50,
+    'pet_owner': 14_000,
+    'address': 16_000,
+    'pet': 20_000,
+    'product': 2_000,
+    'stay': 1_000_000,
+    'purchase': 1_000_000
+}
+
+# Mínimo de linhas por tabela, para que escalas pequenas ainda tenham variedade
+MIN_ROWS = {
+    'user': 30, 'seller': 3, 'pet_owner': 15, 'address': 10,
+    'pet': 15, 'product': 8, 'stay': 20, 'purchase': 20
+}
+
+PET_TYPES = ('Cão', 'Gato', 'Pássaro')
+PAYMENT_METHODS = ('Cartão de crédito', 'Cartão de débito', 'Pix', 'Dinheiro')
+
+# Participação de cada forma de pagamento e diária média por tipo de pet
+PAYMENT_WEIGHTS = (0.45, 0.25, 0.22, 0.08)
+DAILY_RATE = {1: 70.0, 2: 55.0, 3: 35.0}
+
+# Expoente da distribuição de Zipf: poucos produtos e pets concentram o movimento
+ZIPF_EXPONENT = 1.1
+
+START = pd.Timestamp('2025-01-01')
+PERIOD_SECONDS = 365 * 24 * 3600
+
+_FIRST_NAMES = ('Lucas', 'Mariana', 'Pedro', 'Ana', 'João', 'Beatriz', 'Rafael', 'Camila',
+                'Gustavo', 'Larissa', 'Felipe', 'Juliana', 'Bruno', 'Fernanda', 'Thiago')
+_LAST_NAMES = ('Ferreira', 'Oliveira', 'Souza', 'Lima', 'Costa', 'Almeida', 'Rocha',
+               'Martins', 'Barbosa', 'Ribeiro', 'Carvalho', 'Gomes')
+_PET_NAMES = ('Bolinha', 'Thor', 'Luna', 'Mel', 'Bob', 'Nina', 'Fred', 'Pipoca', 'Simba',
+              'Amora', 'Max', 'Belinha', 'Toby', 'Lola', 'Zeca')
+_PRODUCTS = ('Bolinha de pelúcia', 'Manta para cão', 'Arranhador', 'Ração premium',
+             'Coleira', 'Petisco', 'Caminha', 'Shampoo', 'Comedouro', 'Brinquedo de corda')
+_BRANDS = ('Hotel', 'Caes & Gatos', 'PetMais', 'Bicho Feliz', 'Patas')
+_NEIGHBORHOODS = ('Vila Marina', 'Vila Maria', 'Centro', 'Jardim Europa', 'Mooca', 'Pinheiros')
+_STREETS = ('Rua das Palmeiras', 'Avenida do Sol', 'Rua das Flores', 'Rua Augusta', 'Avenida Paulista')
+
+
+def table_rows(scale):
+    """Número de linhas de cada tabela escalável na escala pedida"""
+    return {table: max(MIN_ROWS[table], int(round(rows * scale)))
+            for table, rows in ROWS_AT_SCALE_1.items()}
+
+
+def _zipf_choice(rng, n, size):
+    """Índices de 0 a n-1 com frequência decrescente (distribuição de Zipf truncada)"""
+    weights = 1.0 / np.arange(1, n + 1) ** ZIPF_EXPONENT
+    # A ordem dos mais populares é embaralhada para não coincidir com o id
+    popularity = rng.permutation(n)
+    return popularity[rng.choice(n, size=size, p=weights / weights.sum())]
+
+
+def _timestamps(rng, size):
+    """Datas crescentes ao longo de um ano, como em uma tabela só de inserções"""
+    seconds = np.sort(rng.integers(0, PERIOD_SECONDS, size))
+    return START + pd.to_timedelta(seconds, unit='s')
+
+
+def _labels(pool, ids):
+    """Rótulos legíveis e distintos: nome do conjunto seguido do id"""
+    return [f"{pool[i % len(pool)]} {i}" for i in ids]
+
+
+def generate(scale=0.01, seed=0):
+    """Gera as dez tabelas do hotel com chaves estrangeiras consistentes.
+
+    Segue as colunas e os tipos da planilha original. As tabelas fato (stay e
+    purchase) crescem linearmente com ``scale``; produtos e pets seguem uma
+    distribuição de Zipf e as formas de pagamento têm pesos desiguais.
+    """
+    rng = np.random.default_rng(seed)
+    rows = table_rows(scale)
+    frames = {}
+
+    # Usuários: os primeiros são funcionários (vendedores), os demais clientes
+    n_users, n_sellers = rows['user'], rows['seller']
+    user_ids = np.arange(1, n_users + 1)
+    first = rng.integers(0, len(_FIRST_NAMES), n_users)
+    last = rng.integers(0, len(_LAST_NAMES), n_users)
+    names = [f"{_FIRST_NAMES[f]} {_LAST_NAMES[l]}" for f, l in zip(first, last)]
+    user_created = _timestamps(rng, n_users)
+    frames['user'] = pd.DataFrame({
+        'user_id': user_ids,
+        'name': names,
+        'email': [f"{name.lower().replace(' ', '.')}{i}@exemplo.com" for i, name in zip(user_ids, names)],
+        'type': np.where(user_ids <= n_sellers, 'EMPLOYEE', 'CONSUMER').astype(object),
+        'phone': 11_900_000_000 + rng.integers(0, 99_999_999, n_users),
+        'password': [f"senha{i:08d}" for i in user_ids],
+        'created_at': user_created,
+        'updated_at': user_created
+    })
+
+    employee_ids = user_ids[:n_sellers]
+    consumer_ids = user_ids[n_sellers:]
+
+    def audit(size, created):
+        created_by = rng.choice(employee_ids, size)
+        return {'created_at': created, 'updated_at': created,
+                'created_by': created_by, 'updated_by': created_by}
+
+    n_addresses = min(rows['address'], len(consumer_ids))
+    frames['address'] = pd.DataFrame({
+        'address_id': np.arange(1, n_addresses + 1),
+        'user_id': rng.choice(consumer_ids, n_addresses, replace=False),
+        'country': 'Brasil',
+        'state': 'São Paulo',
+        'city': 'São Paulo',
+        'postal_code': rng.integers(1_000_000, 99_999_999, n_addresses),
+        'neighborhood': np.array(_NEIGHBORHOODS, dtype=object)[rng.integers(0, len(_NEIGHBORHOODS), n_addresses)],
+        'street': np.array(_STREETS, dtype=object)[rng.integers(0, len(_STREETS), n_addresses)],
+        'number': rng.integers(1, 3000, n_addresses),
+        'complement': np.where(rng.random(n_addresses) < 0.5, np.nan, rng.integers(1, 200, n_addresses)),
+        **audit(n_addresses, _timestamps(rng, n_addresses))
+    })
+
+    genders = np.array(('masculino', 'feminino'), dtype=object)
+    birth_dates = START - pd.to_timedelta(rng.integers(18 * 365, 70 * 365, n_users), unit='D')
+    seller_created = user_created[:n_sellers]
+    frames['seller'] = pd.DataFrame({
+        'seller_id': np.arange(1, n_sellers + 1),
+        'user_id': employee_ids,
+        'hired_at': seller_created.normalize(),
+        'salary': rng.integers(1500, 4000, n_sellers),
+        'birth_date': birth_dates[:n_sellers],
+        'gender': genders[rng.integers(0, 2, n_sellers)],
+        'created_at': seller_created,
+        'updated_at': seller_created
+    })
+
+    n_owners = min(rows['pet_owner'], len(consumer_ids))
+    owner_user_ids = np.sort(rng.choice(consumer_ids, n_owners, replace=False))
+    frames['pet_owner'] = pd.DataFrame({
+        'pet_owner_id': np.arange(1, n_owners + 1),
+        'user_id': owner_user_ids,
+        'birth_date': birth_dates[owner_user_ids - 1],
+        'gender': genders[rng.integers(0, 2, n_owners)],
+        **audit(n_owners, user_created[owner_user_ids - 1])
+    })
+
+    domain_created = pd.DatetimeIndex([START] * len(PET_TYPES))
+    frames['pet_type'] = pd.DataFrame({
+        'pet_type_id': np.arange(1, len(PET_TYPES) + 1),
+        'name': list(PET_TYPES),
+        **audit(len(PET_TYPES), domain_created)
+    })
+
+    n_pets = rows['pet']
+    pet_ids = np.arange(1, n_pets + 1)
+    pet_types = rng.choice(np.arange(1, len(PET_TYPES) + 1), n_pets, p=(0.55, 0.35, 0.10))
+    frames['pet'] = pd.DataFrame({
+        'pet_id': pet_ids,
+        'user_id': rng.choice(owner_user_ids, n_pets),
+        'name': _labels(_PET_NAMES, pet_ids),
+        'weight': np.round(rng.gamma(2.0, 4.0, n_pets), 1),
+        'birth_date': START - pd.to_timedelta(rng.integers(90, 15 * 365, n_pets), unit='D'),
+        'pet_type_id': pet_types,
+        **audit(n_pets, _timestamps(rng, n_pets))
+    })
+
+    n_products = rows['product']
+    product_ids = np.arange(1, n_products + 1)
+    product_prices = np.round(rng.lognormal(3.0, 0.6, n_products), 2)
+    frames['product'] = pd.DataFrame({
+        'product_id': product_ids,
+        'name': _labels(_PRODUCTS, product_ids),
+        'brand': np.array(_BRANDS, dtype=object)[rng.integers(0, len(_BRANDS), n_products)],
+        'type': np.where(rng.random(n_products) < 0.3, 'OWN_PRODUCT', 'SUPPLIER_PRODUCT').astype(object),
+        **audit(n_products, pd.DatetimeIndex([START] * n_products))
+    })
+
+    payment_ids = np.arange(1, len(PAYMENT_METHODS) + 1)
+    frames['payment_method_type'] = pd.DataFrame({
+        'payment_method_type_id': payment_ids,
+        'nome': list(PAYMENT_METHODS),
+        **audit(len(PAYMENT_METHODS), pd.DatetimeIndex([START] * len(PAYMENT_METHODS)))
+    })
+
+    n_stays = rows['stay']
+    stay_pets = _zipf_choice(rng, n_pets, n_stays) + 1
+    stay_created = _timestamps(rng, n_stays)
+    nights = rng.geometric(0.25, n_stays)
+    daily_rate = pd.Series(DAILY_RATE).reindex(pet_types[stay_pets - 1]).to_numpy()
+    check_in = stay_created.normalize()
+    frames['stay'] = pd.DataFrame({
+        'stay_id': np.arange(1, n_stays + 1),
+        'pet_id': stay_pets,
+        'check_in_date': check_in,
+        'check_in_hour': rng.integers(6, 12, n_stays),
+        'check_out_date': check_in + pd.to_timedelta(nights, unit='D'),
+        'check_out_hour': rng.integers(8, 18, n_stays),
+        'payment_method': rng.choice(payment_ids, n_stays, p=PAYMENT_WEIGHTS),
+        'stay_cost': nights * daily_rate * rng.uniform(0.9, 1.3, n_stays),
+        **audit(n_stays, stay_created)
+    })
+
+    n_purchases = rows['purchase']
+    purchase_products = _zipf_choice(rng, n_products, n_purchases) + 1
+    price = product_prices[purchase_products - 1]
+    quantity = 1 + rng.poisson(1.5, n_purchases)
+    frames['purchase'] = pd.DataFrame({
+        'purchase_id': np.arange(1, n_purchases + 1),
+        'product_id': purchase_products,
+        'price': price,
+        'cost': price * rng.uniform(0.3, 0.9, n_purchases),
+        'quantity': quantity,
+        'total_value': price * quantity,
+        'payment_method': rng.choice(payment_ids, n_purchases, p=PAYMENT_WEIGHTS),
+        **audit(n_purchases, _timestamps(rng, n_purchases))
+    })
+
+    return {sheet: frames[sheet] for sheet in SHEETS}
+
+
+def make_snapshot(frames, scale=None, seed=None):
+    """Empacota as tabelas geradas, com os tipos do esquema, como um DatasetSnapshot somente leitura"""
+    start = time.perf_counter()
+    key = f"sintetico-{scale}-{seed}-{sum(len(df) for df in frames.values())}"
+    typed, violations = apply_all(frames.items())
+    frozen, memory = _freeze_all(typed.items())
+    return DatasetSnapshot(frozen, hashlib.sha256(key.encode()).hexdigest()[:16], time.time(),
+                           time.perf_counter() - start, memory["bytes_total"], source='sintetico',
+                           memory=memory, violations=violations)
+
+
+class SyntheticDataset:
+    """Substituto do DatasetCache com dados gerados (para benchmarks e testes)"""
+
+    def __init__(self, scale=0.01, seed=0, frames=None):
+        self.scale = scale
+        self.seed = seed
+        self._snapshot = make_snapshot(frames if frames is not None else generate(scale, seed), scale, seed)
+
+    def get(self):
+        return self._snapshot
+
+    def available(self):
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera uma planilha sintética com o esquema do hotel")
+    parser.add_argument('--escala', type=float, default=0.001,
+                        help="Fator de escala (1 = 1 milhão de compras e de estadias)")
+    parser.add_argument('--semente', type=int, default=0, help="Semente do gerador aleatório")
+    parser.add_argument('--planilha', required=True, help="Arquivo .xlsx de destino")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = generate(args.escala, args.semente)
+    with pd.ExcelWriter(args.planilha) as writer:
+        for sheet, df in frames.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+
+    print(f"Planilha gravada em {args.planilha} ({time.perf_counter() - start:.2f}s)")
+    for sheet, df in frames.items():
+        print(f"  {sheet}: {len(df)} linhas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from aggregates import AGGREGATE_SPECS, label_totals, segment_totals
+from dataset_cache import DATASET
+from filters import check_applicable
+from metrics import QUERY_STAGE_LATENCY
+
+# Coluna de tempo usada nos filtros de data de cada tabela fato
+TIME_COLUMNS = {
+    'purchase': 'created_at',
+    'stay': 'check_in_date'
+}
+
+# Coluna da tabela fato com o usuário do vendedor que registrou a linha
+SELLER_COLUMN = 'created_by'
+
+NS_PER_DAY = 86_400 * 10**9
+
+# Agregados parciais por (dia, chave): as entradas do dia ``days[i]`` ficam em
+# keys/sums/counts[offsets[i]:offsets[i + 1]]
+DayPartitions = namedtuple('DayPartitions', 'days offsets keys sums counts')
+
+
+def _read_only(values):
+    values.flags.writeable = False
+    return values
+
+
+class TimeIndex:
+    """Tabela fato ordenada pela coluna de tempo, com agregados parciais por dia.
+
+    Um intervalo de datas vira um intervalo de linhas por busca binária
+    (np.searchsorted). Os dias inteiros do intervalo são respondidos pelos
+    agregados parciais por dia; só as linhas dos dias das pontas são lidas.
+    Filtros que não se expressam pela chave do agregado (por exemplo, o
+    vendedor) leem apenas as linhas do intervalo selecionado.
+    """
+
+    def __init__(self, df, time_column, specs):
+        times = df[time_column].to_numpy().astype('datetime64[ns]')
+        positions = np.flatnonzero(~np.isnat(times))
+        order = positions[np.argsort(times[positions], kind='stable')]
+        self.times = _read_only(times[order].view(np.int64))
+
+        # Cópias ordenadas apenas das colunas usadas pelas queries e filtros
+        names = {column for spec in specs.values() for column in (spec.key, spec.value)}
+        if SELLER_COLUMN in df.columns:
+            names.add(SELLER_COLUMN)
+        self.columns = {name: _read_only(df[name].to_numpy()[order]) for name in names}
+
+        day_numbers = self.times // NS_PER_DAY
+        self.partitions = {query_type: self._partition(day_numbers, spec)
+                           for query_type, spec in specs.items()}
+
+    def _partition(self, day_numbers, spec):
+        """Soma e contagem por (dia, chave) da tabela inteira"""
+        keys, values = self.columns[spec.key], self.columns[spec.value]
+        if keys.dtype.kind == 'f':
+            present = ~np.isnan(keys)
+            keys, values, day_numbers = keys[present].astype(np.int64), values[present], day_numbers[present]
+
+        days, day_codes = np.unique(day_numbers, return_inverse=True)
+        unique_keys, key_codes = np.unique(keys, return_inverse=True)
+        width = max(len(unique_keys), 1)
+        groups, sums, counts = segment_totals(day_codes.astype(np.int64) * width + key_codes, values)
+
+        group_days = groups // width
+        return DayPartitions(days, np.searchsorted(group_days, np.arange(len(days) + 1)),
+                             unique_keys[groups % width], sums, counts)
+
+    def _row_range(self, start, end):
+        lo = 0 if start is None else int(np.searchsorted(self.times, start.value, 'left'))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, end.value, 'left'))
+        return lo, max(lo, hi)
+
+    def _scan(self, spec, lo, hi, row_filters):
+        """Reduz as linhas [lo, hi) que passam pelos filtros"""
+        keys = self.columns[spec.key][lo:hi]
+        values = self.columns[spec.value][lo:hi]
+        if row_filters:
+            mask = np.ones(hi - lo, dtype=bool)
+            for column, allowed in row_filters:
+                mask &= np.isin(self.columns[column][lo:hi], allowed)
+            keys, values = keys[mask], values[mask]
+        return segment_totals(keys, values)[:2]
+
+    def totals(self, query_type, spec, start=None, end=None, row_filters=()):
+        """Totais por chave no intervalo [start, end) com os filtros de linha.
+
+        ``row_filters`` é uma lista de (coluna da tabela fato, valores aceitos).
+        Devolve uma Series indexada pela chave do agregado.
+        """
+        lo, hi = self._row_range(start, end)
+        key_filters = [allowed for column, allowed in row_filters if column == spec.key]
+        pieces = []
+
+        partitions = self.partitions[query_type]
+        if len(key_filters) < len(row_filters) or not len(partitions.days):
+            pieces.append(self._scan(spec, lo, hi, row_filters))
+        else:
+            # Dias inteiros dentro do intervalo: [first_day, end_day)
+            first_day = partitions.days[0] if start is None else -(-start.value // NS_PER_DAY)
+            end_day = partitions.days[-1] + 1 if end is None else end.value // NS_PER_DAY
+
+            if first_day >= end_day:
+                pieces.append(self._scan(spec, lo, hi, row_filters))
+            else:
+                row_a = max(lo, int(np.searchsorted(self.times, first_day * NS_PER_DAY, 'left')))
+                row_b = min(hi, int(np.searchsorted(self.times, end_day * NS_PER_DAY, 'left')))
+                day_lo, day_hi = np.searchsorted(partitions.days, (first_day, end_day), 'left')
+                part_lo, part_hi = partitions.offsets[day_lo], partitions.offsets[day_hi]
+
+                pieces.append(self._scan(spec, lo, row_a, row_filters))
+                pieces.append((partitions.keys[part_lo:part_hi], partitions.sums[part_lo:part_hi]))
+                pieces.append(self._scan(spec, row_b, hi, row_filters))
+
+        keys = np.concatenate([piece[0] for piece in pieces])
+        sums = np.concatenate([piece[1] for piece in pieces])
+        for allowed in key_filters:
+            selected = np.isin(keys, allowed)
+            keys, sums = keys[selected], sums[selected]
+
+        unique_keys, totals, _ = segment_totals(keys, sums)
+        value_kind = self.columns[spec.value].dtype.kind
+        return pd.Series(totals, index=unique_keys, dtype=np.int64 if value_kind in 'iub' else np.float64)
+
+
+def dimension_filters(snapshot, filters):
+    """Traduz os filtros de dimensão em (coluna da tabela fato, valores aceitos)"""
+    row_filters = []
+
+    if 'vendedor' in filters:
+        seller = snapshot['seller']
+        users = seller.loc[seller['seller_id'].isin(filters['vendedor']), 'user_id']
+        row_filters.append((SELLER_COLUMN, users.to_numpy()))
+
+    if 'tipo_pet' in filters:
+        pet_type = snapshot['pet_type']
+        wanted = {value.casefold() for value in filters['tipo_pet']}
+        selected = (pet_type['pet_type_id'].astype(str).isin(wanted)
+                    | pet_type['name'].astype(str).str.casefold().isin(wanted))
+        pet = snapshot['pet']
+        pets = pet.loc[pet['pet_type_id'].isin(pet_type.loc[selected, 'pet_type_id']), 'pet_id']
+        row_filters.append(('pet_id', pets.to_numpy()))
+
+    if 'marca' in filters:
+        product = snapshot['product']
+        wanted = {value.casefold() for value in filters['marca']}
+        products = product.loc[product['brand'].astype(str).str.casefold().isin(wanted), 'product_id']
+        row_filters.append(('product_id', products.to_numpy()))
+
+    return row_filters
+
+
+class FilteredAggregates:
+    """Agregados com filtros de data e de dimensão.
+
+    Os índices por tempo de cada tabela fato são construídos no primeiro uso
+    de cada versão do conjunto de dados e reaproveitados até a próxima versão.
+    """
+
+    def __init__(self, dataset=DATASET):
+        self.dataset = dataset
+        self._version = None
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def index(self, snapshot, fact):
+        """Índice por tempo da tabela fato para a versão do snapshot"""
+        with self._lock:
+            if self._version != snapshot.version:
+                self._version = snapshot.version
+                self._indexes = {}
+
+            index = self._indexes.get(fact)
+            if index is None:
+                specs = {query_type: spec for query_type, spec in AGGREGATE_SPECS.items() if spec.fact == fact}
+                with QUERY_STAGE_LATENCY.time('indice_tempo'):
+                    index = TimeIndex(snapshot[fact], TIME_COLUMNS[fact], specs)
+                self._indexes[fact] = index
+            return index
+
+    def result(self, query_type, filters, snapshot=None):
+        """Totais por rótulo, do maior para o menor, restritos aos filtros"""
+        spec = AGGREGATE_SPECS[query_type]
+        check_applicable(filters, spec.fact)
+        snapshot = snapshot or self.dataset.get()
+
+        index = self.index(snapshot, spec.fact)
+        with QUERY_STAGE_LATENCY.time('filtro'):
+            totals = index.totals(query_type, spec, filters.get('inicio'), filters.get('fim'),
+                                  dimension_filters(snapshot, filters))
+        return label_totals(snapshot, spec, totals)
+
+
+# Instância compartilhada pelo processo
+FILTERED_AGGREGATES = FilteredAggregates()
@@ -0,0 +1,31 @@
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import CATALOG
+from chatbot_api import app
+from datastack import DATA, STARTUP_MODE
+
+
+def preload():
+    """Carrega catálogo, planilha e agregados antes do fork dos workers.
+
+    Os workers herdam essas páginas de memória do processo mestre e as
+    compartilham por copy-on-write. O gc.freeze() move os objetos já criados
+    para uma geração permanente, evitando que a coleta de lixo nos workers
+    toque (e copie) essas páginas.
+
+    Nos modos ``lazy`` e ``background`` (HOTEL_STARTUP) só o catálogo é
+    carregado aqui; pandas e os dados ficam para a primeira consulta ou para
+    o aquecimento iniciado em cada worker.
+    """
+    CATALOG.current()
+    if STARTUP_MODE == 'preload':
+        DATA.preload()
+    gc.freeze()
+
+
+# Ponto de entrada WSGI para servidores de produção (gunicorn)
+application = app
@@ -173,8 +173,8 @@ async function sendMessage() {
     try {
         const startTime = Date.now();
         
-        // Enviar para API com retry
-        const response = await fetchWithRetry(`${CONFIG.API_BASE_URL}/chat`, {
+        // Enviar para API com retry (intenção e dados resolvidos no servidor)
+        const response = await fetchWithRetry(`${CONFIG.API_BASE_URL}/ask`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -192,9 +192,9 @@ async function sendMessage() {
             handleSuccessResponse(data);
             state.answeredQuestions++;
             
-            if (data.query) {
-                state.executedQueries++;
-                await executeQuery(data);
+            if (data.query && data.resultado) {
+                if (!data.resultado.erro) state.executedQueries++;
+                displayQueryResults(data.resultado, data.tipo_query);
             }
             
             showToast('Pergunta processada com sucesso! ✅', 'success');
@@ -256,51 +256,20 @@ function handleErrorResponse(data) {
     addMessage(errorText, 'assistant', true);
 }
 
-// Executar query para mostrar resultados
-async function executeQuery(chatData) {
-    try {
-        let queryType = determineQueryType(chatData.pergunta_do_usuario);
-        
-        if (queryType) {
-            const response = await fetchWithRetry(`${CONFIG.API_BASE_URL}/execute-query`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ tipo_query: queryType })
-            });
-            
-            const data = await response.json();
-            
-            if (data.status === 'sucesso' && data.resultado) {
-                displayQueryResults(data.resultado, queryType);
-            }
-        }
-    } catch (error) {
-        console.error('Erro ao executar query:', error);
-    }
-}
-
-// Determinar tipo de query
-function determineQueryType(pergunta) {
-    const perguntaLower = pergunta.toLowerCase();
-    
-    if (perguntaLower.includes('vendas') && perguntaLower.includes('pagamento')) {
-        return 'vendas_por_pagamento';
-    } else if (perguntaLower.includes('produtos') && perguntaLower.includes('vendidos')) {
-        return 'produtos_mais_vendidos';
-    } else if (perguntaLower.includes('estadias') && perguntaLower.includes('pet')) {
-        return 'estadias_por_pet';
-    }
-    
-    return null;
-}
-
 // Exibir resultados da query
 function displayQueryResults(results, queryType) {
+    // A intenção foi encontrada, mas a execução da query falhou no servidor
+    if (results.erro) {
+        addMessage(`Não foi possível obter os resultados: ${results.erro}`, 'assistant', true);
+        return;
+    }
+    
     let resultText = `\n\n**📊 Resultados:**\n\n`;
     
-    const entries = Object.entries(results);
+    // Intenções sem agregado próprio chegam como colunas/linhas do motor SQL
+    const entries = Array.isArray(results.linhas)
+        ? results.linhas.map(linha => [linha[0], linha.slice(1).join(', ')])
+        : Object.entries(results);
     if (entries.length > 0) {
         entries.slice(0, 5).forEach(([key, value]) => {
             if (queryType === 'vendas_por_pagamento') {
@@ -309,6 +278,8 @@ function displayQueryResults(results, queryType) {
                 resultText += `📦 **${key}:** ${value} unidades\n`;
             } else if (queryType === 'estadias_por_pet') {
                 resultText += `🐾 **${key}:** R$ ${value.toFixed(2)}\n`;
+            } else {
+                resultText += `• **${key}:** ${value}\n`;
             }
         });
         